@@ -50,6 +50,12 @@ def parse_input_args(input_args):
         action='store_true',
         help='Skip long migrations on start',
     )
+    root_parser.add_argument(
+        '--profile-startup',
+        dest='profile_startup',
+        action='store_true',
+        help='Report import time per module and app and duration of startup stages',
+    )
     root_parser.add_argument('--ml-backends', dest='ml_backends', nargs='+', help='Machine learning backends URLs')
     root_parser.add_argument(
         '--sampling',
@@ -145,6 +151,13 @@ def parse_input_args(input_args):
 
     subparsers.add_parser('shell', help='Run django shell', parents=[root_parser])
 
+    worker = subparsers.add_parser(
+        'worker', help='Run background job workers for the database job queue', parents=[root_parser]
+    )
+    worker.add_argument('queues', nargs='*', help='Queues in priority order, all queues by default')
+    worker.add_argument('--concurrency', type=int, default=None, help='Number of worker processes')
+    worker.add_argument('--burst', default=False, action='store_true', help='Exit when queues are empty')
+
     calculate_stats_all_orgs = subparsers.add_parser(
         'calculate_stats_all_orgs', help='Calculate task counters and statistics', parents=[root_parser]
     )
@@ -1,3 +1,4 @@
+import logging
 from threading import local
 from typing import Any
 
@@ -5,6 +6,8 @@ from django.core.signals import request_finished
 from django.dispatch import receiver
 from django.middleware.common import CommonMiddleware
 
+logger = logging.getLogger(__name__)
+
 _thread_locals = local()
 
 
@@ -28,6 +31,7 @@ class CurrentContext:
     @classmethod
     def set_request(cls, request):
         _thread_locals.request = request
+        cls.start_flags_cache()
         if request.user:
             cls.set_user(request.user)
 
@@ -128,11 +132,31 @@ class CurrentContext:
         """
         return getattr(_thread_locals, 'job_data', {})
 
+    @classmethod
+    def start_flags_cache(cls) -> None:
+        """Memoize feature flag values until clear(), it's called at the start of a request or job"""
+        _thread_locals.flags_cache = {}
+        _thread_locals.flags_stats = {'evaluations': 0, 'cached': 0, 'time': 0.0}
+
+    @classmethod
+    def get_flags_cache(cls):
+        """Feature flag cache of the current request or job, None outside of them"""
+        return getattr(_thread_locals, 'flags_cache', None)
+
+    @classmethod
+    def get_flags_stats(cls) -> dict:
+        """Number of flag_set() calls, how many of them were cached and evaluation time in seconds"""
+        return getattr(_thread_locals, 'flags_stats', {'evaluations': 0, 'cached': 0, 'time': 0.0})
+
     @classmethod
     def clear(cls) -> None:
         if hasattr(_thread_locals, 'data'):
             delattr(_thread_locals, 'data')
 
+        if hasattr(_thread_locals, 'flags_cache'):
+            del _thread_locals.flags_cache
+            del _thread_locals.flags_stats
+
         if hasattr(_thread_locals, 'job_data'):
             delattr(_thread_locals, 'job_data')
 
@@ -154,6 +178,15 @@ class ThreadLocalMiddleware(CommonMiddleware):
     def process_request(self, request):
         CurrentContext.set_request(request)
 
+    def process_response(self, request, response):
+        stats = CurrentContext.get_flags_stats()
+        if stats['evaluations']:
+            logger.debug(
+                f'Feature flags for {request.method} {request.path}: {stats["evaluations"]} checks, '
+                f'{stats["cached"]} cached, {stats["time"] * 1000:.2f} ms'
+            )
+        return super().process_response(request, response)
+
 
 @receiver(request_finished)
 def clean_request(sender, **kwargs):
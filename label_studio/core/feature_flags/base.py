@@ -1,4 +1,6 @@
 import logging
+import threading
+import time
 
 import ldclient
 from django.conf import settings
@@ -7,7 +9,7 @@ from ldclient.config import Config, HTTPConfig
 from ldclient.feature_store import CacheConfig
 from ldclient.integrations import Files, Redis
 
-from label_studio.core.current_request import get_current_request
+from label_studio.core.current_request import CurrentContext, get_current_request
 from label_studio.core.utils.common import load_func
 from label_studio.core.utils.io import find_node
 from label_studio.core.utils.params import get_all_env_with_prefix, get_bool_env
@@ -28,46 +30,60 @@ def get_feature_file_path():
         return find_node(package_name, settings.FEATURE_FLAGS_FILE, 'file')
 
 
-if settings.FEATURE_FLAGS_FROM_FILE:
-    # Feature flags from file
-    if not settings.FEATURE_FLAGS_FILE:
-        raise ValueError(
-            'When "FEATURE_FLAGS_FROM_FILE" is set, you have to specify a valid path for feature flags file, e.g.'
-            'FEATURE_FLAGS_FILE=my_flags.yml'
-        )
+# LaunchDarkly client is created on the first flag check, it connects to LaunchDarkly or Redis on init
+client = None
+_client_lock = threading.Lock()
+
+
+def _init_client():
+    if settings.FEATURE_FLAGS_FROM_FILE:
+        # Feature flags from file
+        if not settings.FEATURE_FLAGS_FILE:
+            raise ValueError(
+                'When "FEATURE_FLAGS_FROM_FILE" is set, you have to specify a valid path for feature flags file, e.g.'
+                'FEATURE_FLAGS_FILE=my_flags.yml'
+            )
 
-    feature_flags_file = get_feature_file_path()
-
-    logger.info(f'Read flags from file {feature_flags_file}')
-    data_source = Files.new_data_source(paths=[feature_flags_file])
-    config = Config(
-        sdk_key=settings.FEATURE_FLAGS_API_KEY or 'whatever', update_processor_class=data_source, send_events=False
-    )
-    ldclient.set_config(config)
-    client = ldclient.get()
-elif settings.FEATURE_FLAGS_OFFLINE:
-    # On-prem usage, without feature flags file
-    ldclient.set_config(Config(settings.FEATURE_FLAGS_API_KEY or 'whatever', offline=True))
-    client = ldclient.get()
-else:
-    # Production usage
-    if hasattr(settings, 'REDIS_LOCATION'):
-        logger.debug(f'Set LaunchDarkly config with Redis feature store at {settings.REDIS_LOCATION}')
-        store_kwargs = {
-            'url': settings.REDIS_LOCATION,
-            'prefix': 'feature-flags',
-            'caching': CacheConfig(expiration=30),
-        }
-        if settings.REDIS_LOCATION.startswith('rediss'):
-            store_kwargs['redis_opts'] = settings.REDIS_SSL_SETTINGS
-        store = Redis.new_feature_store(**store_kwargs)
-        ldclient.set_config(
-            Config(settings.FEATURE_FLAGS_API_KEY, feature_store=store, http=HTTPConfig(connect_timeout=5))
+        feature_flags_file = get_feature_file_path()
+
+        logger.info(f'Read flags from file {feature_flags_file}')
+        data_source = Files.new_data_source(paths=[feature_flags_file])
+        config = Config(
+            sdk_key=settings.FEATURE_FLAGS_API_KEY or 'whatever', update_processor_class=data_source, send_events=False
         )
+        ldclient.set_config(config)
+    elif settings.FEATURE_FLAGS_OFFLINE:
+        # On-prem usage, without feature flags file
+        ldclient.set_config(Config(settings.FEATURE_FLAGS_API_KEY or 'whatever', offline=True))
     else:
-        logger.debug('Set LaunchDarkly config without Redis...')
-        ldclient.set_config(Config(settings.FEATURE_FLAGS_API_KEY, http=HTTPConfig(connect_timeout=5)))
-    client = ldclient.get()
+        # Production usage
+        if hasattr(settings, 'REDIS_LOCATION'):
+            logger.debug(f'Set LaunchDarkly config with Redis feature store at {settings.REDIS_LOCATION}')
+            store_kwargs = {
+                'url': settings.REDIS_LOCATION,
+                'prefix': 'feature-flags',
+                'caching': CacheConfig(expiration=30),
+            }
+            if settings.REDIS_LOCATION.startswith('rediss'):
+                store_kwargs['redis_opts'] = settings.REDIS_SSL_SETTINGS
+            store = Redis.new_feature_store(**store_kwargs)
+            ldclient.set_config(
+                Config(settings.FEATURE_FLAGS_API_KEY, feature_store=store, http=HTTPConfig(connect_timeout=5))
+            )
+        else:
+            logger.debug('Set LaunchDarkly config without Redis...')
+            ldclient.set_config(Config(settings.FEATURE_FLAGS_API_KEY, http=HTTPConfig(connect_timeout=5)))
+    return ldclient.get()
+
+
+def get_client():
+    global client
+
+    if client is None:
+        with _client_lock:
+            if client is None:
+                client = _init_client()
+    return client
 
 
 def flag_set(feature_flag, user=None, override_system_default=None, organization=None):
@@ -90,6 +106,36 @@ def flag_set(feature_flag, user=None, override_system_default=None, organization
     if feature_flag in STALE_FEATURE_FLAGS:
         return STALE_FEATURE_FLAGS[feature_flag]
 
+    cache = CurrentContext.get_flags_cache()
+    if cache is None:
+        return _evaluate_flag(feature_flag, user, override_system_default, organization)
+
+    stats = CurrentContext.get_flags_stats()
+    stats['evaluations'] += 1
+    start = time.perf_counter()
+    key = (feature_flag, _get_context_key(user, organization), override_system_default)
+    if key in cache:
+        stats['cached'] += 1
+        value = cache[key]
+    else:
+        value = cache[key] = _evaluate_flag(feature_flag, user, override_system_default, organization)
+    stats['time'] += time.perf_counter() - start
+    return value
+
+
+def _get_context_key(user, organization):
+    """Flag values depend on user or organization only, see get_user_repr()"""
+    if organization is not None:
+        return 'organization', organization.id
+    if user == 'auto':
+        user = getattr(get_current_request(), 'user', None)
+    # AnonymousUser class is passed as is, its is_authenticated is a property object
+    if getattr(user, 'is_authenticated', False) is True:
+        return 'user', user.pk, getattr(user, 'active_organization_id', None)
+    return ('anonymous',)
+
+
+def _evaluate_flag(feature_flag, user, override_system_default, organization):
     if user is None:
         user = AnonymousUser
     elif user == 'auto':
@@ -110,7 +156,7 @@ def flag_set(feature_flag, user=None, override_system_default=None, organization
         system_default = override_system_default
     else:
         system_default = settings.FEATURE_FLAGS_DEFAULT_VALUE
-    return client.variation(feature_flag, user_dict, system_default)
+    return get_client().variation(feature_flag, user_dict, system_default)
 
 
 def all_flags(user):
@@ -120,7 +166,7 @@ def all_flags(user):
     """
     user_dict = get_user_repr(user)
     logger.debug(f'Resolve all flags state for user {user_dict}')
-    state = client.all_flags_state(user_dict)
+    state = get_client().all_flags_state(user_dict)
     flags = state.to_json_dict()
 
     env_ff = get_all_env_with_prefix('ff_', is_bool=True)
@@ -1,3 +1,8 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import AnonymousUser
+
+from label_studio.core.current_request import CurrentContext
 from label_studio.core.feature_flags.base import flag_set
 from label_studio.core.feature_flags.utils import get_user_repr_from_organization
 
@@ -47,3 +52,26 @@ def test_flag_set_with_organization_context_env_override(monkeypatch, settings):
     # Unset env should fall back to override_system_default=False
     monkeypatch.delenv('fflag_feat_test_org_targeting', raising=False)
     assert flag_set('fflag_feat_test_org_targeting', organization=org, override_system_default=False) is False
+
+
+def test_flag_set_is_memoized_per_request():
+    request = type('Request', (), {'user': AnonymousUser()})()
+    with patch('label_studio.core.feature_flags.base.client') as client:
+        client.variation.return_value = True
+        CurrentContext.set_request(request)
+        try:
+            client.variation.reset_mock()
+            stats = dict(CurrentContext.get_flags_stats())
+            assert flag_set('fflag_test_memoized', user='auto') is True
+            assert flag_set('fflag_test_memoized', user='auto') is True
+            assert flag_set('fflag_test_memoized', user=None) is True
+            assert client.variation.call_count == 1
+            assert CurrentContext.get_flags_stats()['evaluations'] == stats['evaluations'] + 3
+            assert CurrentContext.get_flags_stats()['cached'] == stats['cached'] + 2
+        finally:
+            CurrentContext.clear()
+
+        # cache is dropped at the end of the request
+        assert CurrentContext.get_flags_cache() is None
+        flag_set('fflag_test_memoized', user='auto')
+        assert client.variation.call_count == 2
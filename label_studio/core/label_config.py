@@ -22,15 +22,23 @@ logger = logging.getLogger(__name__)
 
 
 _DATA_EXAMPLES = None
+_LABEL_CONFIG_SCHEMA_DATA = None
 _LABEL_TAGS = {'Label', 'Choice', 'Relation'}
 SINGLE_VALUED_TAGS = {'choices': str, 'rating': int, 'number': float, 'textarea': str}
 _NOT_CONTROL_TAGS = {
     'Filter',
 }
-# TODO: move configs in right place
-_LABEL_CONFIG_SCHEMA = find_file('label_config_schema.json')
-with open(_LABEL_CONFIG_SCHEMA) as f:
-    _LABEL_CONFIG_SCHEMA_DATA = json.load(f)
+
+
+def label_config_schema():
+    """JSON schema of labeling configs, loaded on the first validation"""
+    global _LABEL_CONFIG_SCHEMA_DATA
+
+    if _LABEL_CONFIG_SCHEMA_DATA is None:
+        # TODO: move configs in right place
+        with open(find_file('label_config_schema.json')) as f:
+            _LABEL_CONFIG_SCHEMA_DATA = json.load(f)
+    return _LABEL_CONFIG_SCHEMA_DATA
 
 
 def parse_config(config_string):
@@ -106,7 +114,7 @@ def validate_label_config(config_string: Union[str, None]) -> None:
     # xml and schema
     try:
         config, cleaned_config_string = parse_config_to_json(config_string)
-        jsonschema.validate(config, _LABEL_CONFIG_SCHEMA_DATA)
+        jsonschema.validate(config, label_config_schema())
     except (etree.ParseError, ValueError) as exc:
         raise ValidationError(str(exc))
     except jsonschema.exceptions.ValidationError as exc:
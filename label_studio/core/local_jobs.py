@@ -0,0 +1,210 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+
+Database-backed job queue for deployments without Redis.
+
+start_job_async_or_sync() puts jobs into the LocalJob table when LOCAL_JOB_QUEUE_ENABLED is set
+and Redis is not connected, `label-studio worker` drains them. Queue names, job_timeout,
+on_failure and meta have the same meaning as for RQ.
+"""
+import logging
+import multiprocessing
+import os
+import pickle
+import signal
+import socket
+import sys
+import threading
+import time
+import traceback
+from datetime import timedelta
+
+from core.current_request import CurrentContext
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+from rq.timeouts import JobTimeoutException, UnixSignalDeathPenalty
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_local_job(job, *args, queue_name='default', job_timeout=None, in_seconds=0, **kwargs):
+    """Save job to LocalJob table, it will be executed by `label-studio worker`"""
+    from core.models import LocalJob
+
+    meta = kwargs.pop('meta', None) or {}
+    on_failure = kwargs.pop('on_failure', None)
+    return LocalJob.objects.create(
+        queue_name=queue_name,
+        func_name=f'{job.__module__}.{job.__qualname__}',
+        payload=pickle.dumps((job, args, kwargs, on_failure)),
+        meta=meta,
+        job_timeout=job_timeout,
+        scheduled_at=timezone.now() + timedelta(seconds=in_seconds),
+    )
+
+
+def is_local_job_active(func_name, meta):
+    """Checks if a queued or started local job of func_name has all the meta values, see is_job_in_queue()"""
+    from core.models import LocalJob
+
+    jobs = LocalJob.objects.filter(
+        status__in=[LocalJob.STATUS_QUEUED, LocalJob.STATUS_STARTED], func_name__endswith=f'.{func_name}'
+    )
+    for job_meta in jobs.values_list('meta', flat=True):
+        if all((job_meta or {}).get(key) == value for key, value in meta.items()):
+            return True
+    return False
+
+
+def get_default_timeout(queue_name):
+    return settings.RQ_QUEUES.get(queue_name, {}).get('DEFAULT_TIMEOUT', 180)
+
+
+class LocalJobWorker:
+    """Takes queued LocalJobs one by one, queues are checked in the given order (priority)"""
+
+    def __init__(self, queues=None, poll_interval=None, name=None):
+        self.queues = list(queues or settings.RQ_QUEUES)
+        self.poll_interval = poll_interval or settings.LOCAL_JOB_QUEUE_POLL_INTERVAL
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopped = False
+
+    def claim(self):
+        """Take the next queued job, status update is conditional, so concurrent workers never take the same job"""
+        from core.models import LocalJob
+
+        now = timezone.now()
+        for queue_name in self.queues:
+            candidates = LocalJob.objects.filter(
+                status=LocalJob.STATUS_QUEUED, queue_name=queue_name, scheduled_at__lte=now
+            ).order_by('scheduled_at', 'id')
+            for job_id in candidates.values_list('id', flat=True)[:10]:
+                claimed = LocalJob.objects.filter(id=job_id, status=LocalJob.STATUS_QUEUED).update(
+                    status=LocalJob.STATUS_STARTED, started_at=now, worker=self.name
+                )
+                if claimed:
+                    return LocalJob.objects.get(id=job_id)
+        return None
+
+    def perform(self, job):
+        """Run a claimed job, finished jobs are deleted, failed ones are kept for RQ_FAILED_JOB_TTL"""
+        from core.models import LocalJob
+
+        func, args, kwargs, on_failure = job._load()
+        timeout = job.job_timeout or get_default_timeout(job.queue_name)
+        logger.info(f'Local worker {self.name} started job {job}')
+        CurrentContext.start_flags_cache()
+        self.restore_context(job.meta or {})
+        try:
+            # job_timeout=-1 means no timeout as in RQ
+            use_alarm = hasattr(signal, 'SIGALRM') and threading.current_thread() is threading.main_thread()
+            if timeout > 0 and use_alarm:
+                with UnixSignalDeathPenalty(timeout, JobTimeoutException, job_id=job.id):
+                    func(*args, **kwargs)
+            else:
+                func(*args, **kwargs)
+        except Exception as exc:
+            logger.error(f'Local job {job} failed: {exc}', exc_info=True)
+            exc_info = sys.exc_info()
+            LocalJob.objects.filter(id=job.id).update(
+                status=LocalJob.STATUS_FAILED, error=traceback.format_exc(), finished_at=timezone.now()
+            )
+            if on_failure:
+                try:
+                    on_failure(job, None, *exc_info)
+                except Exception as e:
+                    logger.error(f'on_failure callback for local job {job} failed: {e}', exc_info=True)
+            return False
+        else:
+            LocalJob.objects.filter(id=job.id).delete()
+            logger.info(f'Local job {job} finished')
+            return True
+        finally:
+            CurrentContext.clear()
+            close_old_connections()
+
+    @staticmethod
+    def restore_context(meta):
+        """Context captured by start_job_async_or_sync() for the job"""
+        for key, value in meta.items():
+            CurrentContext.set(key, value)
+        if user_id := meta.get('user_id'):
+            from users.models import User
+
+            if user := User.objects.filter(id=user_id).first():
+                CurrentContext.set_user(user)
+            if organization_id := meta.get('organization_id'):
+                CurrentContext.set_organization_id(organization_id)
+
+    def fail_stale_jobs(self):
+        """Jobs of killed workers stay started forever, fail them when their timeout is over"""
+        from core.models import LocalJob
+
+        now = timezone.now()
+        for job in LocalJob.objects.filter(status=LocalJob.STATUS_STARTED).only(
+            'id', 'queue_name', 'job_timeout', 'started_at'
+        ):
+            timeout = job.job_timeout or get_default_timeout(job.queue_name)
+            # leave the worker some time to report the timeout itself
+            if job.started_at and job.started_at + timedelta(seconds=timeout + 60) < now:
+                LocalJob.objects.filter(id=job.id, status=LocalJob.STATUS_STARTED).update(
+                    status=LocalJob.STATUS_FAILED, error='Worker was lost', finished_at=now
+                )
+        LocalJob.objects.filter(
+            status=LocalJob.STATUS_FAILED, finished_at__lt=now - timedelta(seconds=settings.RQ_FAILED_JOB_TTL)
+        ).delete()
+
+    def work(self, burst=False):
+        """Process jobs until stopped, in burst mode stop when queues are empty"""
+        logger.info(f'Local worker {self.name} is listening on queues: {", ".join(self.queues)}')
+        last_cleanup = 0
+        while not self.stopped:
+            if time.monotonic() - last_cleanup > 60:
+                self.fail_stale_jobs()
+                last_cleanup = time.monotonic()
+
+            job = self.claim()
+            if job is not None:
+                self.perform(job)
+                continue
+            if burst:
+                break
+            close_old_connections()
+            time.sleep(self.poll_interval)
+
+    def stop(self, *args):
+        self.stopped = True
+
+
+def _work_in_process(queues, poll_interval, burst):
+    worker = LocalJobWorker(queues, poll_interval)
+    # finish the current job and exit
+    signal.signal(signal.SIGTERM, worker.stop)
+    signal.signal(signal.SIGINT, worker.stop)
+    worker.work(burst=burst)
+
+
+def run_workers(queues=None, concurrency=None, burst=False, poll_interval=None):
+    """Run `concurrency` worker processes, every process takes one job at a time like an RQ worker"""
+    concurrency = concurrency or settings.LOCAL_JOB_QUEUE_CONCURRENCY
+    if concurrency <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        return _work_in_process(queues, poll_interval, burst)
+
+    # forked processes must not share database connections of the parent
+    connections.close_all()
+    context = multiprocessing.get_context('fork')
+    processes = [
+        context.Process(target=_work_in_process, args=(queues, poll_interval, burst), daemon=False)
+        for _ in range(concurrency)
+    ]
+    for process in processes:
+        process.start()
+
+    def _terminate(*args):
+        for process in processes:
+            process.terminate()
+
+    signal.signal(signal.SIGTERM, _terminate)
+    signal.signal(signal.SIGINT, _terminate)
+    for process in processes:
+        process.join()
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from projects.template_catalog import TemplateCatalog
+
+
+class Command(BaseCommand):
+    help = 'Parse annotation templates and save them to the manifest used by the templates API'
+
+    def handle(self, *args, **options):
+        catalog = TemplateCatalog()
+        manifest = catalog.build_manifest()
+        catalog.write_manifest(manifest)
+        self.stdout.write(f'{len(manifest["templates"])} templates saved to {catalog.manifest_path}')
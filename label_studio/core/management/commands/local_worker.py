@@ -0,0 +1,18 @@
+import logging
+
+from core.local_jobs import run_workers
+from django.core.management.base import BaseCommand
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run workers for background jobs queued in the database (LOCAL_JOB_QUEUE_ENABLED)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('queues', nargs='*', help='Queues in priority order, all queues by default')
+        parser.add_argument('-c', '--concurrency', type=int, default=None, help='Number of worker processes')
+        parser.add_argument('-b', '--burst', action='store_true', help='Exit when queues are empty')
+
+    def handle(self, *args, **options):
+        run_workers(options['queues'] or None, concurrency=options['concurrency'], burst=options['burst'])
@@ -0,0 +1,96 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0003_asyncmigrationstatus_add_scheduled_status"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LocalJob",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("queue_name", models.CharField(default="default", max_length=64)),
+                (
+                    "func_name",
+                    models.CharField(
+                        help_text="Dotted path of the job function, for info only",
+                        max_length=256,
+                    ),
+                ),
+                (
+                    "payload",
+                    models.BinaryField(
+                        help_text="Pickled job function, args and kwargs"
+                    ),
+                ),
+                (
+                    "meta",
+                    models.JSONField(default=dict, null=True, verbose_name="meta"),
+                ),
+                (
+                    "job_timeout",
+                    models.IntegerField(
+                        default=None, help_text="Timeout in seconds", null=True
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "Job is waiting for a worker"),
+                            ("started", "Job is running on a worker"),
+                            ("failed", "Job failed, check error"),
+                        ],
+                        default="queued",
+                        max_length=16,
+                    ),
+                ),
+                ("error", models.TextField(blank=True, null=True)),
+                ("worker", models.CharField(blank=True, max_length=256, null=True)),
+                (
+                    "scheduled_at",
+                    models.DateTimeField(
+                        help_text="Job is not started before this time",
+                        verbose_name="scheduled at",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="created at"),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        default=None, null=True, verbose_name="started at"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        default=None, null=True, verbose_name="finished at"
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["status", "queue_name", "scheduled_at"],
+                        name="core_localj_status_a8f251_idx",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,5 +1,6 @@
 import json
 import logging
+import pickle
 
 from django.core import serializers
 from django.db import models
@@ -82,3 +83,55 @@ class DeletedRow(models.Model):
             row_id = int(data['pk'])
             bulk_objects.append(cls(model=model, row_id=row_id, data=data, **kwargs))
         return cls.objects.bulk_create(bulk_objects)
+
+
+class LocalJob(models.Model):
+    """Background job stored in the database when Redis is not available, see core.local_jobs"""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_STARTED = 'started'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = (
+        (STATUS_QUEUED, 'Job is waiting for a worker'),
+        (STATUS_STARTED, 'Job is running on a worker'),
+        (STATUS_FAILED, 'Job failed, check error'),
+    )
+
+    queue_name = models.CharField(max_length=64, default='default')
+    func_name = models.CharField(max_length=256, help_text='Dotted path of the job function, for info only')
+    payload = models.BinaryField(help_text='Pickled job function, args and kwargs')
+    meta = JSONField('meta', null=True, default=dict)
+    job_timeout = models.IntegerField(null=True, default=None, help_text='Timeout in seconds')
+    status = models.CharField(max_length=16, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    error = models.TextField(null=True, blank=True)
+    worker = models.CharField(max_length=256, null=True, blank=True)
+
+    scheduled_at = models.DateTimeField(_('scheduled at'), help_text='Job is not started before this time')
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    started_at = models.DateTimeField(_('started at'), null=True, default=None)
+    finished_at = models.DateTimeField(_('finished at'), null=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'queue_name', 'scheduled_at']),
+        ]
+
+    def __str__(self):
+        return f'(id={self.id}) {self.func_name} on {self.queue_name} [{self.status}]'
+
+    @property
+    def func(self):
+        return self._load()[0]
+
+    @property
+    def args(self):
+        return self._load()[1]
+
+    @property
+    def kwargs(self):
+        return self._load()[2]
+
+    def _load(self):
+        if not hasattr(self, '_payload'):
+            self._payload = pickle.loads(bytes(self.payload))
+        return self._payload
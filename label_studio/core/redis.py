@@ -84,6 +84,11 @@ def redis_connected():
     return False
 
 
+def job_queue_available():
+    """Jobs started by start_job_async_or_sync() are queued: Redis is connected or local job queue is enabled"""
+    return redis_connected() or settings.LOCAL_JOB_QUEUE_ENABLED
+
+
 def _is_serializable(value: Any) -> bool:
     """Check if a value can be serialized for job context."""
     return isinstance(value, (str, int, float, bool, list, dict, type(None)))
@@ -151,6 +156,7 @@ def redis_delete(key):
 def start_job_async_or_sync(job, *args, in_seconds=0, **kwargs):
     """
     Start job async with redis or sync if redis is not connected.
+    Without redis jobs are saved to the local database queue if LOCAL_JOB_QUEUE_ENABLED is set.
     Automatically preserves context for async jobs and clears it after completion.
 
     :param job: Job function
@@ -160,7 +166,9 @@ def start_job_async_or_sync(job, *args, in_seconds=0, **kwargs):
     :return: Job or function result
     """
 
-    redis = redis_connected() and kwargs.get('redis', True)
+    use_queue = kwargs.get('redis', True)
+    redis = redis_connected() and use_queue
+    local_queue = not redis and use_queue and settings.LOCAL_JOB_QUEUE_ENABLED
     queue_name = kwargs.get('queue_name', 'default')
 
     if 'queue_name' in kwargs:
@@ -173,8 +181,8 @@ def start_job_async_or_sync(job, *args, in_seconds=0, **kwargs):
         job_timeout = kwargs['job_timeout']
         del kwargs['job_timeout']
 
-    if redis:
-        # Async execution with Redis - wrap job for context management
+    if redis or local_queue:
+        # Async execution - wrap job for context management
         try:
             context_data = _capture_context()
 
@@ -191,6 +199,14 @@ def start_job_async_or_sync(job, *args, in_seconds=0, **kwargs):
             logger.info(f'Start async job {job.__name__} on queue {queue_name} with {args_info}.')
         except Exception:
             logger.info(f'Start async job {job.__name__} on queue {queue_name}.')
+
+        if local_queue:
+            from core.local_jobs import enqueue_local_job
+
+            return enqueue_local_job(
+                job, *args, queue_name=queue_name, job_timeout=job_timeout, in_seconds=in_seconds, **kwargs
+            )
+
         queue = django_rq.get_queue(queue_name)
         enqueue_method = queue.enqueue
         if in_seconds > 0:
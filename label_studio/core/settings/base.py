@@ -184,6 +184,9 @@ DATABASES_ALL = {
         'NAME': get_env('POSTGRE_NAME', 'postgres'),
         'HOST': get_env('POSTGRE_HOST', 'net-power.9free.com.cn'),
         'PORT': int(get_env('POSTGRE_PORT', '28198')),
+        # seconds to keep a connection open between requests, 0 closes it after every request
+        'CONN_MAX_AGE': int(get_env('POSTGRE_CONN_MAX_AGE', 0)),
+        'CONN_HEALTH_CHECKS': get_bool_env('POSTGRE_CONN_HEALTH_CHECKS', False),
     },
     DJANGO_DB_MYSQL: {
         'ENGINE': 'django.db.backends.mysql',
@@ -201,6 +204,28 @@ DATABASES_ALL = {
         },
     },
 }
+
+# Connection pool per web or RQ worker process, requires psycopg[pool]
+POSTGRE_POOL_ENABLED = get_bool_env('POSTGRE_POOL_ENABLED', False)
+if POSTGRE_POOL_ENABLED:
+    try:
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        logger.warning('POSTGRE_POOL_ENABLED is set, but psycopg_pool is not installed: pip install "psycopg[pool]"')
+        POSTGRE_POOL_ENABLED = False
+if POSTGRE_POOL_ENABLED:
+    # the pool manages connection lifetime, Django doesn't support it together with persistent connections
+    DATABASES_ALL[DJANGO_DB_POSTGRESQL]['CONN_MAX_AGE'] = 0
+    DATABASES_ALL[DJANGO_DB_POSTGRESQL]['OPTIONS'] = {
+        'pool': {
+            'min_size': int(get_env('POSTGRE_POOL_MIN_SIZE', 2)),
+            'max_size': int(get_env('POSTGRE_POOL_MAX_SIZE', 10)),
+            # seconds to wait for a free connection before OperationalError
+            'timeout': float(get_env('POSTGRE_POOL_TIMEOUT', 30)),
+            'max_idle': float(get_env('POSTGRE_POOL_MAX_IDLE', 600)),
+            'max_lifetime': float(get_env('POSTGRE_POOL_MAX_LIFETIME', 3600)),
+        }
+    }
 DATABASES_ALL['default'] = DATABASES_ALL[DJANGO_DB_POSTGRESQL]
 DATABASES = {'default': DATABASES_ALL.get(get_env('DJANGO_DB', 'default'))}
 
@@ -403,6 +428,12 @@ RQ_QUEUES = {
 # How long to keep failed RQ jobs (in seconds); default is 30 days
 RQ_FAILED_JOB_TTL = int(get_env('RQ_FAILED_JOB_TTL', 30 * 24 * 60 * 60))
 
+# Without Redis, keep background jobs in the database queue drained by `label-studio worker`
+# instead of running them inside web requests
+LOCAL_JOB_QUEUE_ENABLED = get_bool_env('LOCAL_JOB_QUEUE_ENABLED', False)
+LOCAL_JOB_QUEUE_CONCURRENCY = int(get_env('LOCAL_JOB_QUEUE_CONCURRENCY', 2))
+LOCAL_JOB_QUEUE_POLL_INTERVAL = float(get_env('LOCAL_JOB_QUEUE_POLL_INTERVAL', 1))
+
 # drf-spectacular settings for OpenAPI 3.0 schema generation
 SPECTACULAR_SETTINGS = {
     'TITLE': 'Label Studio API',
@@ -553,6 +584,11 @@ os.makedirs(EXPORT_DIR, exist_ok=True)
 DELAYED_EXPORT_DIR = 'export'
 os.makedirs(os.path.join(BASE_DATA_DIR, MEDIA_ROOT, DELAYED_EXPORT_DIR), exist_ok=True)
 
+# annotation templates parsed at runtime when the manifest built with `manage.py build_templates_manifest` is stale
+TEMPLATES_MANIFEST_CACHE_PATH = get_env(
+    'TEMPLATES_MANIFEST_CACHE_PATH', os.path.join(BASE_DATA_DIR, 'templates_manifest.json')
+)
+
 # file / task size limits
 DATA_UPLOAD_MAX_MEMORY_SIZE = int(get_env('DATA_UPLOAD_MAX_MEMORY_SIZE', 250 * 1024 * 1024))
 DATA_UPLOAD_MAX_NUMBER_FILES = int(get_env('DATA_UPLOAD_MAX_NUMBER_FILES', 100))
@@ -566,6 +602,9 @@ LABEL_STREAM_HISTORY_LIMIT = int(get_env('LABEL_STREAM_HISTORY_LIMIT', default=1
 RANDOM_NEXT_TASK_SAMPLE_SIZE = int(get_env('RANDOM_NEXT_TASK_SAMPLE_SIZE', 50))
 
 TASK_API_PAGE_SIZE_MAX = int(get_env('TASK_API_PAGE_SIZE_MAX', 0)) or None
+# Tasks API in cursor mode: totals are cached per user and refreshed by the first request after TTL seconds
+TASK_API_TOTALS_CACHE_TTL = int(get_env('TASK_API_TOTALS_CACHE_TTL', 60))
+TASK_API_TOTALS_CACHE_STALE_TTL = int(get_env('TASK_API_TOTALS_CACHE_STALE_TTL', 3600))
 
 # Email backend
 FROM_EMAIL = get_env('FROM_EMAIL', 'Label Studio <hello@labelstud.io>')
@@ -590,6 +629,10 @@ REACT_APP_ROOT = os.path.join(BASE_DIR, '../../web/dist/apps/labelstudio')
 
 # per project settings
 BATCH_SIZE = 1000
+# Stream task ids for snapshot exports from a server-side cursor on PostgreSQL instead of keyset pagination
+EXPORT_SERVER_SIDE_CURSOR = get_bool_env('EXPORT_SERVER_SIDE_CURSOR', False)
+# Number of processes serializing task batches for snapshot exports, 1 means serialization in the export job itself
+EXPORT_SERIALIZATION_WORKERS = int(get_env('EXPORT_SERIALIZATION_WORKERS', 1))
 # Maximum number of tasks to process in a single batch during export operations
 MAX_TASK_BATCH_SIZE = int(get_env('MAX_TASK_BATCH_SIZE', 1000))
 # Total size of task data (in bytes) to process per batch - used to calculate dynamic batch sizes
@@ -599,6 +642,33 @@ TASK_DATA_PER_BATCH = int(get_env('TASK_DATA_PER_BATCH', 50 * 1024 * 1024))  # 5
 REIMPORT_BATCH_SIZE = int(get_env('REIMPORT_BATCH_SIZE', 1000))
 # Batch size for streaming import operations to reduce memory usage
 IMPORT_BATCH_SIZE = int(get_env('IMPORT_BATCH_SIZE', 500))
+
+# CSGHub 二开：数据集快照本地共享缓存，按 dataset/branch/commit 复用已下载的文件
+CSGHUB_SNAPSHOT_CACHE_ENABLED = get_bool_env('CSGHUB_SNAPSHOT_CACHE_ENABLED', True)
+CSGHUB_SNAPSHOT_CACHE_DIR = get_env('CSGHUB_SNAPSHOT_CACHE_DIR', os.path.join(BASE_DATA_DIR, 'csghub_cache'))
+# disk quota in bytes, least recently used snapshots are evicted when it's exceeded
+CSGHUB_SNAPSHOT_CACHE_QUOTA = int(get_env('CSGHUB_SNAPSHOT_CACHE_QUOTA', 20 * 1024**3))
+# max time to wait for a concurrent download of the same snapshot, in seconds
+CSGHUB_SNAPSHOT_CACHE_LOCK_TIMEOUT = int(get_env('CSGHUB_SNAPSHOT_CACHE_LOCK_TIMEOUT', 3600))
+
+# CSGHub 二开：数据集/组织列表代理接口的连接池与缓存
+CSGHUB_API_TIMEOUT = int(get_env('CSGHUB_API_TIMEOUT', 30))
+CSGHUB_API_POOL_SIZE = int(get_env('CSGHUB_API_POOL_SIZE', 10))
+CSGHUB_API_PAGE_SIZE = int(get_env('CSGHUB_API_PAGE_SIZE', 100))
+CSGHUB_API_MAX_PAGES = int(get_env('CSGHUB_API_MAX_PAGES', 100))
+# responses are fresh for CSGHUB_API_CACHE_TTL seconds, then served stale while refreshing in background
+# for CSGHUB_API_CACHE_STALE_TTL more seconds; set CSGHUB_API_CACHE_TTL=0 to disable the cache
+CSGHUB_API_CACHE_TTL = int(get_env('CSGHUB_API_CACHE_TTL', 60))
+CSGHUB_API_CACHE_STALE_TTL = int(get_env('CSGHUB_API_CACHE_STALE_TTL', 300))
+CSGHUB_API_CACHE_MAX_ENTRIES = int(get_env('CSGHUB_API_CACHE_MAX_ENTRIES', 10000))
+
+# CSGHub 二开：导出上传到 CSGHub 的后台任务
+CSGHUB_EXPORT_UPLOAD_WORKERS = int(get_env('CSGHUB_EXPORT_UPLOAD_WORKERS', 4))
+# staging folders per target dataset/branch, the upload cache in them is kept to resume failed uploads
+CSGHUB_EXPORT_UPLOAD_DIR = get_env('CSGHUB_EXPORT_UPLOAD_DIR', os.path.join(EXPORT_DIR, 'csghub_upload'))
+# how often the upload progress is written to the export counters, in seconds
+CSGHUB_EXPORT_UPLOAD_PROGRESS_INTERVAL = int(get_env('CSGHUB_EXPORT_UPLOAD_PROGRESS_INTERVAL', 5))
+
 # Batch size for processing prediction imports to avoid memory issues with large datasets
 PREDICTION_IMPORT_BATCH_SIZE = int(get_env('PREDICTION_IMPORT_BATCH_SIZE', 500))
 PROJECT_TITLE_MIN_LEN = 3
@@ -748,6 +818,11 @@ COLLECT_ANALYTICS = get_bool_env('COLLECT_ANALYTICS', get_bool_env('collect_anal
 SVG_SECURITY_CLEANUP = get_bool_env('SVG_SECURITY_CLEANUP', False)
 
 ML_BLOCK_LOCAL_IP = get_bool_env('ML_BLOCK_LOCAL_IP', False)
+# Tasks per ML backend /predict request and max concurrent requests when retrieving predictions for many tasks
+ML_PREDICT_BATCH_SIZE = int(get_env('ML_PREDICT_BATCH_SIZE', 100))
+ML_PREDICT_CONCURRENCY = int(get_env('ML_PREDICT_CONCURRENCY', 4))
+# Seconds before training triggered by `min_annotations_to_start_training` starts, triggers in between are merged
+ML_TRAINING_DEBOUNCE = int(get_env('ML_TRAINING_DEBOUNCE', 10))
 
 RQ_LONG_JOB_TIMEOUT = int(get_env('RQ_LONG_JOB_TIMEOUT', 36000))
 
@@ -761,6 +836,11 @@ STORAGE_IN_PROGRESS_TIMER = float(get_env('STORAGE_IN_PROGRESS_TIMER', 5.0))
 STORAGE_EXPORT_CHUNK_SIZE = int(get_env('STORAGE_EXPORT_CHUNK_SIZE', 100))
 DEFAULT_STORAGE_LIST_LIMIT = int(get_env('DEFAULT_STORAGE_LIST_LIMIT', 100))
 STORAGE_EXISTED_COUNT_BATCH_SIZE = int(get_env('STORAGE_EXISTED_COUNT_BATCH_SIZE', 1000))
+# Number of tasks written in one transaction during import storage sync, 1 means task by task (legacy mode)
+STORAGE_IMPORT_BATCH_SIZE = int(get_env('STORAGE_IMPORT_BATCH_SIZE', 1))
+# Number of threads that download and parse storage objects ahead of DB writes during import storage sync,
+# 1 disables prefetching, it can be enabled per storage with ImportStorage.prefetch_workers
+STORAGE_IMPORT_PREFETCH_WORKERS = int(get_env('STORAGE_IMPORT_PREFETCH_WORKERS', 1))
 
 USE_NGINX_FOR_EXPORT_DOWNLOADS = get_bool_env('USE_NGINX_FOR_EXPORT_DOWNLOADS', False)
 USE_NGINX_FOR_UPLOADS = get_bool_env('USE_NGINX_FOR_UPLOADS', True)
@@ -850,6 +930,17 @@ DATA_MANAGER_FILTER_ALLOWLIST = list(
         + ['updated_by__active_organization', 'annotations__completed_by']
     )
 )
+# Read annotators, results, model versions and completed_at data manager columns from a table maintained on updates,
+# fill it with `label-studio rebuild_dm_columns` before enabling
+DATA_MANAGER_MATERIALIZED_COLUMNS = get_bool_env('DATA_MANAGER_MATERIALIZED_COLUMNS', False)
+# Compiled data manager filters kept in memory per (project, filters), 0 disables the cache
+DATA_MANAGER_FILTER_PLAN_CACHE_SIZE = int(get_env('DATA_MANAGER_FILTER_PLAN_CACHE_SIZE', 512))
+# Tasks after the current page queued for ML predictions when a job queue is available (otherwise only the page is
+# predicted inside the request), and seconds before the same task can be queued again
+DATA_MANAGER_PREDICTIONS_PREFETCH_LOOKAHEAD = int(get_env('DATA_MANAGER_PREDICTIONS_PREFETCH_LOOKAHEAD', 100))
+DATA_MANAGER_PREDICTIONS_PREFETCH_TTL = int(get_env('DATA_MANAGER_PREDICTIONS_PREFETCH_TTL', 300))
+# Rows per key for pending project summary label counters written on annotation save, 0 updates summary JSON in place
+PROJECT_SUMMARY_COUNTER_SHARDS = int(get_env('PROJECT_SUMMARY_COUNTER_SHARDS', 8))
 
 if ENABLE_CSP := get_bool_env('ENABLE_CSP', True):
     CSP_DEFAULT_SRC = (
@@ -930,6 +1021,14 @@ RESOLVER_PROXY_GCS_DOWNLOAD_URL = get_env(
 RESOLVER_PROXY_GCS_HTTP_TIMEOUT = int(get_env('RESOLVER_PROXY_GCS_HTTP_TIMEOUT', 5))
 RESOLVER_PROXY_ENABLE_ETAG_CACHE = get_bool_env('RESOLVER_PROXY_ENABLE_ETAG_CACHE', True)
 RESOLVER_PROXY_CACHE_TIMEOUT = int(get_env('RESOLVER_PROXY_CACHE_TIMEOUT', 3600))
+# Local disk LRU cache for ranged requests proxied from storages with presign=False
+RESOLVER_PROXY_CHUNK_CACHE_ENABLED = get_bool_env('RESOLVER_PROXY_CHUNK_CACHE_ENABLED', False)
+RESOLVER_PROXY_CHUNK_CACHE_DIR = get_env('RESOLVER_PROXY_CHUNK_CACHE_DIR', os.path.join(BASE_DATA_DIR, 'proxy_cache'))
+RESOLVER_PROXY_CHUNK_CACHE_SIZE = int(get_env('RESOLVER_PROXY_CHUNK_CACHE_SIZE', 1024 * 1024 * 1024))
+RESOLVER_PROXY_CHUNK_CACHE_CHUNK_SIZE = int(get_env('RESOLVER_PROXY_CHUNK_CACHE_CHUNK_SIZE', 1024 * 1024))
+RESOLVER_PROXY_CHUNK_CACHE_META_TTL = int(get_env('RESOLVER_PROXY_CHUNK_CACHE_META_TTL', 60))
+# Reuse presigned storage URLs for a half of storage presign_ttl
+PRESIGNED_URL_CACHE_ENABLED = get_bool_env('PRESIGNED_URL_CACHE_ENABLED', True)
 
 # Advanced validator for ImportStorageSerializer in enterprise
 IMPORT_STORAGE_SERIALIZER_VALIDATE = None
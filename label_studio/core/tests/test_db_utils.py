@@ -136,3 +136,59 @@ class TestBatchDelete:
 
         # Assert: All users were deleted
         assert User.objects.count() == 0
+
+
+class _FakeWrapper:
+    _connection_pools = {}
+
+    def __init__(self, alias, pool=None):
+        self.alias = alias
+        self.connection = object()
+        if pool:
+            self._connection_pools[alias] = pool
+
+
+class _FakeConnections:
+    def __init__(self, *wrappers):
+        self.wrappers = wrappers
+
+    def all(self, initialized_only=False):
+        return list(self.wrappers)
+
+
+class _FakePool:
+    def get_stats(self):
+        return {
+            'pool_size': 4,
+            'pool_max': 10,
+            'pool_available': 1,
+            'requests_waiting': 2,
+            'requests_num': 10,
+            'requests_wait_ms': 50,
+        }
+
+
+def test_discard_connections_after_fork(monkeypatch):
+    """Forked process gets new connections and never closes the parent ones"""
+    pool = _FakePool()
+    wrapper = _FakeWrapper('default', pool)
+    inherited = wrapper.connection
+    monkeypatch.setattr(db_utils, 'connections', _FakeConnections(wrapper))
+    monkeypatch.setattr(db_utils, '_inherited_connections', [])
+
+    db_utils.discard_connections_after_fork()
+
+    assert wrapper.connection is None
+    assert _FakeWrapper._connection_pools == {}
+    assert db_utils._inherited_connections == [inherited, pool]
+
+
+def test_connection_pool_stats(monkeypatch):
+    monkeypatch.setattr(db_utils, 'connections', _FakeConnections(_FakeWrapper('default', _FakePool())))
+
+    stats = db_utils.get_connection_pool_stats()['default']
+
+    assert stats['in_use'] == 3
+    assert stats['waiting'] == 2
+    assert stats['checkout_latency_ms'] == 5
+    _FakeWrapper._connection_pools.clear()
@@ -0,0 +1,91 @@
+import pytest
+from core.local_jobs import LocalJobWorker
+from core.models import LocalJob
+from core.redis import start_job_async_or_sync
+
+pytestmark = pytest.mark.django_db
+
+calls = []
+
+
+def remember_job(value, **kwargs):
+    calls.append(value)
+
+
+def failing_job(value, **kwargs):
+    raise ValueError(f'failed {value}')
+
+
+def remember_failure(job, connection, type, value, traceback):
+    calls.append((job.args[0], str(value)))
+
+
+@pytest.fixture
+def local_queue(settings):
+    settings.LOCAL_JOB_QUEUE_ENABLED = True
+    calls.clear()
+
+
+def test_jobs_are_queued_and_run_by_worker(local_queue):
+    job = start_job_async_or_sync(remember_job, 1, queue_name='low', meta={'key': 'value'})
+    start_job_async_or_sync(remember_job, 2, queue_name='high')
+    delayed = start_job_async_or_sync(remember_job, 3, in_seconds=600)
+    assert calls == []
+    assert job.meta == {'key': 'value'}
+
+    LocalJobWorker(queues=['high', 'default', 'low']).work(burst=True)
+
+    # queue priority is respected, delayed job waits
+    assert calls == [2, 1]
+    assert list(LocalJob.objects.values_list('id', flat=True)) == [delayed.id]
+
+
+def test_failed_job_calls_on_failure(local_queue):
+    job = start_job_async_or_sync(failing_job, 5, job_timeout=10, on_failure=remember_failure)
+
+    LocalJobWorker().work(burst=True)
+
+    job.refresh_from_db()
+    assert job.status == LocalJob.STATUS_FAILED
+    assert 'failed 5' in job.error
+    assert calls == [(5, 'failed 5')]
+
+
+def test_sync_run_without_local_queue(settings):
+    settings.LOCAL_JOB_QUEUE_ENABLED = False
+    calls.clear()
+    start_job_async_or_sync(remember_job, 7)
+    assert calls == [7]
+    assert not LocalJob.objects.exists()
+
+
+def test_storage_sync_is_queued_once(local_queue, settings, tmp_path):
+    from io_storages.localfiles.models import LocalFilesExportStorage, LocalFilesImportStorage
+    from projects.tests.factories import ProjectFactory
+
+    settings.LOCAL_FILES_DOCUMENT_ROOT = str(tmp_path)
+    settings.LOCAL_FILES_SERVING_ENABLED = True
+    (tmp_path / 'image.jpg').write_bytes(b'jpg')
+    project = ProjectFactory()
+    storage = LocalFilesImportStorage.objects.create(project=project, path=str(tmp_path), use_blob_urls=True)
+    export_storage = LocalFilesExportStorage.objects.create(project=project, path=str(tmp_path))
+
+    storage.sync()
+    storage.sync()
+    export_storage.sync()
+
+    storage_jobs = LocalJob.objects.filter(func_name__startswith='io_storages.')
+    assert sorted(storage_jobs.values_list('func_name', flat=True)) == [
+        'io_storages.base_models.export_sync_background',
+        'io_storages.base_models.import_sync_background',
+    ]
+    storage.refresh_from_db()
+    assert storage.status == storage.Status.QUEUED
+    assert project.tasks.count() == 0
+
+    LocalJobWorker(queues=['low']).work(burst=True)
+
+    storage.refresh_from_db()
+    assert storage.status == storage.Status.COMPLETED
+    assert project.tasks.count() == 1
+    assert not storage_jobs.exists()
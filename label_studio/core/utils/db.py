@@ -1,9 +1,10 @@
 import itertools
 import logging
+import os
 import time
 from typing import Dict, Optional, TypeVar
 
-from django.db import OperationalError, connection, models, transaction
+from django.db import OperationalError, connection, connections, models, transaction
 from django.db.models import Model, QuerySet, Subquery
 from django.db.models.signals import post_migrate
 from django.db.utils import DatabaseError, ProgrammingError
@@ -201,3 +202,50 @@ def signal_clear_column_presence_cache(**_kwargs):
     so that the next migration can introspect the new column using has_column_cached()."""
     logger.debug('Clearing column presence cache in post_migrate signal')
     _column_presence_cache.clear()
+
+
+# connections inherited from the parent process, see discard_connections_after_fork()
+_inherited_connections = []
+
+
+def discard_connections_after_fork():
+    """Forget database connections and pools inherited by a forked process (RQ work horse, local worker, etc).
+
+    The parent keeps using the same sockets, so the child must neither use nor close them:
+    old objects are kept referenced to never run their finalizers, new connections are opened on demand.
+    """
+    for conn in connections.all(initialized_only=True):
+        if conn.connection is not None:
+            _inherited_connections.append(conn.connection)
+            conn.connection = None
+        pools = getattr(type(conn), '_connection_pools', None)
+        if pools:
+            _inherited_connections.extend(pools.values())
+            pools.clear()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=discard_connections_after_fork)
+
+
+def get_connection_pool_stats() -> Dict[str, dict]:
+    """Connection pool metrics of the current process per database alias (POSTGRE_POOL_ENABLED)"""
+    stats = {}
+    for conn in connections.all():
+        pool = getattr(type(conn), '_connection_pools', {}).get(conn.alias)
+        if pool is None:
+            continue
+        pool_stats = pool.get_stats()
+        size = pool_stats.get('pool_size', 0)
+        checkouts = pool_stats.get('requests_num', 0)
+        stats[conn.alias] = {
+            'size': size,
+            'max_size': pool_stats.get('pool_max', 0),
+            'in_use': size - pool_stats.get('pool_available', 0),
+            'waiting': pool_stats.get('requests_waiting', 0),
+            'checkouts': checkouts,
+            'checkout_timeouts': pool_stats.get('requests_errors', 0),
+            'checkout_latency_ms': pool_stats.get('requests_wait_ms', 0) / checkouts if checkouts else 0,
+            'connections_lost': pool_stats.get('connections_lost', 0),
+        }
+    return stats
@@ -0,0 +1,116 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+
+Startup profiler for `label-studio --profile-startup`: import time per module and package,
+models import and ready() time per Django app and duration of startup stages.
+"""
+import sys
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class _TimingFinder:
+    """Meta path finder wrapping exec_module() of found loaders to measure module execution time"""
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, 'find_spec'):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            loader = spec.loader
+            # builtin and frozen importers are classes shared by all modules, leave them as is
+            if loader is not None and not isinstance(loader, type) and hasattr(loader, 'exec_module'):
+                loader.exec_module = self.profiler.wrap(fullname, 'modules', loader.exec_module)
+            return spec
+        return None
+
+
+class StartupProfiler:
+    def __init__(self):
+        self.timings = {'modules': {}, 'apps': defaultdict(float), 'stages': {}}
+        self._local = threading.local()
+        self._finder = _TimingFinder(self)
+        self._create_app_config = None
+
+    def start(self):
+        sys.meta_path.insert(0, self._finder)
+        self._patch_app_configs()
+
+    def stop(self):
+        if self._finder in sys.meta_path:
+            sys.meta_path.remove(self._finder)
+        if self._create_app_config is not None:
+            from django.apps import AppConfig
+
+            AppConfig.create = self._create_app_config
+            self._create_app_config = None
+
+    def wrap(self, name, kind, func):
+        """Measure total and self (without nested measured calls) time of func"""
+
+        def wrapper(*args, **kwargs):
+            stack = self._local.__dict__.setdefault('stack', [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                total = time.perf_counter() - start
+                nested = stack.pop()
+                if stack:
+                    stack[-1] += total
+                if kind == 'modules':
+                    self.timings['modules'][name] = (total, total - nested)
+                else:
+                    self.timings['apps'][name] += total
+
+        return wrapper
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings['stages'][name] = time.perf_counter() - start
+
+    def _patch_app_configs(self):
+        """Time import_models() and ready() of every app created by apps.populate()"""
+        from django.apps import AppConfig
+
+        create = self._create_app_config = AppConfig.__dict__['create']
+        profiler = self
+
+        def create_app_config(cls, entry):
+            app_config = create.__func__(cls, entry)
+            app_config.import_models = profiler.wrap(app_config.label, 'apps', app_config.import_models)
+            app_config.ready = profiler.wrap(app_config.label, 'apps', app_config.ready)
+            return app_config
+
+        AppConfig.create = classmethod(create_app_config)
+
+    def packages(self):
+        """Self time of modules summed by top level package"""
+        packages = defaultdict(float)
+        for name, (_, self_time) in self.timings['modules'].items():
+            packages[name.split('.')[0]] += self_time
+        return packages
+
+    def report(self, limit=25):
+        def rows(title, items):
+            items = sorted(items, key=lambda item: item[1], reverse=True)[:limit]
+            return [f'\n{title}'] + [f'  {seconds * 1000:10.1f} ms  {name}' for name, seconds in items]
+
+        modules = self.timings['modules']
+        lines = ['Startup profile', f'  {len(modules)} modules imported']
+        lines += rows('Stages:', list(self.timings['stages'].items()))
+        lines += rows('Packages (self import time):', list(self.packages().items()))
+        lines += rows('Modules (cumulative import time):', [(name, t[0]) for name, t in modules.items()])
+        lines += rows('Apps (models import and ready()):', list(self.timings['apps'].items()))
+        return '\n'.join(lines)
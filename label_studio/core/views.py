@@ -12,6 +12,7 @@ from core import utils
 from core.feature_flags import all_flags, flag_set, get_feature_file_path
 from core.label_config import generate_time_series_json
 from core.utils.common import collect_versions
+from core.utils.db import get_connection_pool_stats
 from core.utils.io import find_file
 from django.conf import settings
 from django.contrib.auth import logout
@@ -125,7 +126,9 @@ def health(request):
 
 
 def metrics(request):
-    """Empty page for metrics evaluation"""
+    """Empty page for metrics evaluation, database pool stats are shown to superusers"""
+    if settings.POSTGRE_POOL_ENABLED and request.user.is_superuser:
+        return JsonResponse({'database_pool': get_connection_pool_stats()})
     return HttpResponse('')
 
 
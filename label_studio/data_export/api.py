@@ -222,18 +222,30 @@ class ExportAPI(generics.RetrieveAPIView):
         if only_finished:
             query = query.filter(annotations__isnull=False).distinct()
 
-        task_ids = query.values_list('id', flat=True)
-
-        logger.debug('Serialize tasks for export')
-        tasks = []
-        for _task_ids in batch(task_ids, 1000):
-            tasks += ExportDataSerializer(
-                self.get_task_queryset(query.filter(id__in=_task_ids)),
-                many=True,
-                expand=['drafts'],
-                context={'interpolate_key_frames': interpolate_key_frames},
-            ).data
-        logger.debug('Prepare export files')
+        task_ids = list(query.values_list('id', flat=True))
+
+        def iter_tasks():
+            # tasks are serialized batch by batch while the export file is written,
+            # so only one batch is kept in memory
+            for _task_ids in batch(task_ids, 1000):
+                yield from ExportDataSerializer(
+                    self.get_task_queryset(Task.objects.filter(id__in=_task_ids)),
+                    many=True,
+                    expand=['drafts'],
+                    context={'interpolate_key_frames': interpolate_key_frames},
+                ).data
+
+        logger.debug('Serialize tasks and prepare export files')
+        tasks = iter_tasks()
+
+        # CSGHub 上传在后台任务中进行，进度和状态记录在 Export 中
+        csghub_export = None
+        if target_dataset and target_branch and getattr(request.user, 'user_token', None):
+            csghub_export = Export.objects.create(
+                project=project,
+                created_by=request.user,
+                title=f'CSGHub: {target_dataset}@{target_branch}',
+            )
 
         export_file, content_type, filename = DataExport.generate_export_file(
             project,
@@ -242,17 +254,21 @@ class ExportAPI(generics.RetrieveAPIView):
             download_resources,
             request.GET,
             hostname=request.build_absolute_uri('/'),
-            request=request,
+            csghub_export=csghub_export,
             target_dataset=target_dataset,
             target_branch=target_branch,
         )
 
-        # 已上传到 CSGHub 时返回 JSON，前端不触发本地下载
-        if target_dataset and target_branch and getattr(request.user, 'user_token', None):
-            if hasattr(export_file, 'close'):
-                export_file.close()
+        # 上传到 CSGHub 时返回 JSON，前端不触发本地下载
+        if csghub_export is not None:
+            csghub_export.refresh_from_db()
             return Response(
-                {'exported_to_csghub': True, 'detail': 'Export completed successfully'},
+                {
+                    'exported_to_csghub': True,
+                    'export_id': csghub_export.id,
+                    'status': csghub_export.status,
+                    'detail': 'Export upload to CSGHub started',
+                },
                 status=status.HTTP_200_OK,
             )
 
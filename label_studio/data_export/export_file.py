@@ -1,47 +1,165 @@
 # CSGHub 二开：导出结果上传到 CSGHub
 
+import hashlib
+import logging
 import os
 import shutil
+import threading
 from pathlib import Path
 
 from django.conf import settings
+from django.utils import timezone
+from lockfile import LockFile
 
+logger = logging.getLogger(__name__)
 
-def upload_without_cache_check(request, target_dataset, target_branch, local_folder):
-    """将本地导出目录上传到 CSGHub 数据集。 """
-    try:
-        from pycsghub.upload_large_folder.main import upload_large_folder_internal
-    except ImportError:
-        raise RuntimeError('CSGHub 导出需要安装 pycsghub: pip install csghub-sdk')
 
-    token = getattr(request.user, 'user_token', None) or ''
+def get_csghub_upload_params(user, target_dataset, target_branch):
+    """Validate upload target and return (endpoint, revision)"""
     endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
-
     if not endpoint:
         raise ValueError('未配置 CSGHUB_ENDPOINT')
     if not target_dataset:
         raise ValueError('未指定目标数据集')
     if not target_branch:
         raise ValueError('未指定目标分支')
-
-    cache_dir = Path(local_folder) / '.cache'
-    if cache_dir.exists():
-        shutil.rmtree(cache_dir)
-    cache_dir.mkdir(parents=True, exist_ok=True)
+    if not getattr(user, 'user_token', None):
+        raise ValueError('当前用户未设置 user_token')
 
     # 使用用户指定的分支，添加 _label 后缀
-    revision_label = f"{target_branch}_label"
-
-    upload_large_folder_internal(
-        repo_id=target_dataset,
-        local_path=local_folder,
-        repo_type='dataset',
-        revision=revision_label,
-        endpoint=endpoint.rstrip('/'),
-        token=token,
-        num_workers=1,
-        print_report=False,
-        print_report_every=5,
-        allow_patterns=['*'],
-        ignore_patterns=['.cache/*'],
-    )
+    return endpoint.rstrip('/'), f'{target_branch}_label'
+
+
+def get_csghub_upload_folder(endpoint, target_dataset, revision):
+    """Folder for one target dataset/revision, uploads to the target are serialized by its LockFile"""
+    key = hashlib.sha256(f'{endpoint}|{target_dataset}|{revision}'.encode()).hexdigest()[:32]
+    folder = os.path.join(settings.CSGHUB_EXPORT_UPLOAD_DIR, key)
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def get_csghub_export_folder(export_id, endpoint, target_dataset, revision):
+    """Staging folder of one export inside the target folder.
+
+    Files are staged without the target lock, so every export has its own folder and staging never touches
+    files of an upload in progress. pycsghub keeps the upload state of the files in <folder>/.cache,
+    so a restarted upload job of the export resumes from the last uploaded part.
+    """
+    folder = os.path.join(get_csghub_upload_folder(endpoint, target_dataset, revision), f'export_{export_id}')
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def stage_file(src, folder, name, move=False):
+    """Put file into the upload folder without copying its content when possible"""
+    dst = os.path.join(folder, name)
+    if os.path.exists(dst):
+        os.remove(dst)
+    if move:
+        shutil.move(src, dst)
+        return dst
+    try:
+        os.link(src, dst)
+    except OSError:
+        # another filesystem or links are not supported
+        shutil.copyfile(src, dst)
+    return dst
+
+
+def upload_folder_to_csghub(
+    local_folder, target_dataset, revision, endpoint, token, num_workers=None, progress_callback=None
+):
+    """Upload folder to CSGHub dataset with pycsghub upload_large_folder,
+    progress_callback(progress_dict) is called periodically while it runs.
+    """
+    try:
+        from pycsghub.cli import upload_large_folder
+        from pycsghub.cmd.repo_types import RepoType
+    except ImportError:
+        raise RuntimeError('CSGHub 导出需要安装 pycsghub: pip install csghub-sdk')
+
+    errors = []
+
+    def upload():
+        try:
+            upload_large_folder(
+                repo_id=target_dataset,
+                local_path=local_folder,
+                repo_type=RepoType.DATASET,
+                revision=revision,
+                endpoint=endpoint,
+                token=token,
+                num_workers=num_workers or settings.CSGHUB_EXPORT_UPLOAD_WORKERS,
+            )
+        except BaseException as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=upload, daemon=True)
+    thread.start()
+    while thread.is_alive():
+        thread.join(settings.CSGHUB_EXPORT_UPLOAD_PROGRESS_INTERVAL)
+        if progress_callback and thread.is_alive():
+            progress_callback(_upload_progress(local_folder))
+    if errors:
+        raise errors[0]
+
+    progress = _upload_progress(local_folder)
+    if progress_callback:
+        progress_callback(progress)
+    return progress
+
+
+def _upload_progress(folder):
+    """Staged files and bytes, committed ones are taken from pycsghub upload state in <folder>/.cache"""
+    files = [path for path in Path(folder).iterdir() if path.is_file()]
+    progress = {'files_total': len(files), 'bytes_total': sum(path.stat().st_size for path in files)}
+    try:
+        from pycsghub.upload_large_folder.local_folder import read_upload_metadata
+
+        committed = [path for path in files if read_upload_metadata(Path(folder), path.name).is_committed]
+    except Exception as e:
+        # progress is informational, the upload doesn't depend on it
+        logger.debug(f"Can't read CSGHub upload state in {folder}: {e}")
+        return progress
+    progress['files_committed'] = len(committed)
+    progress['bytes_committed'] = sum(path.stat().st_size for path in committed)
+    return progress
+
+
+def async_upload_export_to_csghub(export_id, user_id, target_dataset, target_branch, **kwargs):
+    """RQ job: upload staged export files to CSGHub and report progress in Export.status/counters"""
+    from data_export.models import Export
+    from users.models import User
+
+    export = Export.objects.get(id=export_id)
+    user = User.objects.get(id=user_id)
+    endpoint, revision = get_csghub_upload_params(user, target_dataset, target_branch)
+    folder = get_csghub_export_folder(export_id, endpoint, target_dataset, revision)
+    counters = dict(export.counters or {})
+
+    def save_progress(progress):
+        counters['csghub_upload'] = {**counters.get('csghub_upload', {}), **progress}
+        Export.objects.filter(id=export_id).update(counters=counters)
+
+    Export.objects.filter(id=export_id).update(status=Export.Status.IN_PROGRESS)
+    # only one upload per target dataset/revision at a time
+    lock = LockFile(get_csghub_upload_folder(endpoint, target_dataset, revision))
+    try:
+        lock.acquire(timeout=settings.RQ_LONG_JOB_TIMEOUT)
+        upload_folder_to_csghub(
+            folder, target_dataset, revision, endpoint, user.user_token, progress_callback=save_progress
+        )
+    except Exception as e:
+        logger.exception('CSGHub 上传失败: %s', e)
+        counters['csghub_upload'] = {**counters.get('csghub_upload', {}), 'error': str(e)}
+        Export.objects.filter(id=export_id).update(
+            status=Export.Status.FAILED, finished_at=timezone.now(), counters=counters
+        )
+        raise
+    else:
+        # all files are committed, the export folder with its upload state isn't needed anymore
+        shutil.rmtree(folder, ignore_errors=True)
+        Export.objects.filter(id=export_id).update(status=Export.Status.COMPLETED, finished_at=timezone.now())
+    finally:
+        if lock.i_am_locking():
+            lock.release()
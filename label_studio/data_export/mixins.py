@@ -1,16 +1,17 @@
+import collections
 import hashlib
 import io
 import json
 import logging
 import pathlib
 import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from functools import reduce
 
-import django_rq
 from core.feature_flags import flag_set
-from core.redis import redis_connected
-from core.utils.common import batch
+from core.redis import job_queue_available, start_job_async_or_sync
+from core.utils.common import batched_iterator
 from core.utils.io import (
     SerializableGenerator,
     get_all_dirs_from_dir,
@@ -21,8 +22,8 @@ from data_manager.models import View
 from django.conf import settings
 from django.core.files import File
 from django.core.files import temp as tempfile
-from django.db import transaction
-from django.db.models import Prefetch
+from django.db import connection, connections, transaction
+from django.db.models import Exists, OuterRef, Prefetch
 from django.db.models.query_utils import Q
 from django.utils import dateformat, timezone
 from label_studio_sdk.converter import Converter
@@ -209,8 +210,6 @@ class ExportMixin:
                 })
         })
         """
-        from .serializers import ExportDataSerializer
-
         logger.debug('Run get_task_queryset')
 
         start = datetime.now()
@@ -218,44 +217,64 @@ class ExportMixin:
             # TODO: make counters from queryset
             # counters = Project.objects.with_counts().filter(id=self.project.id)[0].get_counters()
             self.counters = {'task_number': 0}
-            all_tasks = self.project.tasks
             logger.debug('Tasks filtration')
-            task_ids = list(
-                self._get_filtered_tasks(all_tasks, task_filter_options=task_filter_options)
-                .distinct()
-                .values_list('id', flat=True)
-            )
-            base_export_serializer_option = self._get_export_serializer_option(serialization_options)
-            i = 0
+            tasks_qs = self._get_export_tasks_queryset(task_filter_options)
+            BATCH_SIZE = self._get_export_batch_size()
 
-            if flag_set('fflag_fix_back_plt_807_batch_size_26062025_short', self.project.organization.created_by):
-                BATCH_SIZE = self.project.get_task_batch_size()
-            else:
-                BATCH_SIZE = settings.BATCH_SIZE
-
-            for ids in batch(task_ids, BATCH_SIZE):
-                i += 1
-                tasks = list(self.get_task_queryset(ids, annotation_filter_options))
+            for i, ids in enumerate(self._iter_task_id_batches(tasks_qs, BATCH_SIZE), start=1):
                 logger.debug(f'Batch: {i*BATCH_SIZE}')
-                if isinstance(task_filter_options, dict) and task_filter_options.get('only_with_annotations'):
-                    tasks = [task for task in tasks if task.annotations.exists()]
-
-                if serialization_options and serialization_options.get('include_annotation_history') is True:
-                    task_ids = [task.id for task in tasks]
-                    annotation_ids = Annotation.objects.filter(task_id__in=task_ids).values_list('id', flat=True)
-                    base_export_serializer_option = self.update_export_serializer_option(
-                        base_export_serializer_option, annotation_ids
-                    )
-
-                serializer = ExportDataSerializer(tasks, many=True, **base_export_serializer_option)
-                self.counters['task_number'] += len(tasks)
-                for task in serializer.data:
+                data = self._serialize_tasks_batch(ids, annotation_filter_options, serialization_options)
+                self.counters['task_number'] += len(data)
+                for task in data:
                     yield task
         duration = datetime.now() - start
         logger.info(
             f'{self.counters["task_number"]} tasks from project {self.project_id} exported in {duration.total_seconds():.2f} seconds'
         )
 
+    def _get_export_tasks_queryset(self, task_filter_options=None):
+        tasks_qs = self._get_filtered_tasks(self.project.tasks, task_filter_options=task_filter_options)
+        if isinstance(task_filter_options, dict) and task_filter_options.get('only_with_annotations'):
+            tasks_qs = tasks_qs.filter(Exists(Annotation.objects.filter(task_id=OuterRef('id'))))
+        return tasks_qs
+
+    def _get_export_batch_size(self):
+        if flag_set('fflag_fix_back_plt_807_batch_size_26062025_short', self.project.organization.created_by):
+            return self.project.get_task_batch_size()
+        return settings.BATCH_SIZE
+
+    def _serialize_tasks_batch(self, ids, annotation_filter_options=None, serialization_options=None):
+        """Serialize tasks with given ids ordered by id"""
+        from .serializers import ExportDataSerializer
+
+        tasks = list(self.get_task_queryset(ids, annotation_filter_options).order_by('id'))
+        export_serializer_option = self._get_export_serializer_option(serialization_options)
+        if serialization_options and serialization_options.get('include_annotation_history') is True:
+            annotation_ids = Annotation.objects.filter(task_id__in=ids).values_list('id', flat=True)
+            export_serializer_option = self.update_export_serializer_option(export_serializer_option, annotation_ids)
+        return ExportDataSerializer(tasks, many=True, **export_serializer_option).data
+
+    @staticmethod
+    def _iter_task_id_batches(tasks_qs, batch_size, server_side_cursor=True):
+        """Yield lists of task ids ordered by id without loading all ids into memory.
+
+        Uses keyset pagination (id > last id) by default; on PostgreSQL with EXPORT_SERVER_SIDE_CURSOR
+        enabled ids are streamed from one server-side cursor instead of running a query per batch.
+        """
+        ids_qs = tasks_qs.order_by('id').values_list('id', flat=True).distinct()
+        if server_side_cursor and settings.EXPORT_SERVER_SIDE_CURSOR and connection.vendor == 'postgresql':
+            yield from batched_iterator(ids_qs.iterator(chunk_size=batch_size), batch_size)
+            return
+
+        last_id = None
+        while True:
+            page_qs = ids_qs if last_id is None else ids_qs.filter(id__gt=last_id)
+            ids = list(page_qs[:batch_size])
+            if not ids:
+                return
+            last_id = ids[-1]
+            yield ids
+
     def update_export_serializer_option(self, base_export_serializer_option, annotation_ids):
         return base_export_serializer_option
 
@@ -287,23 +306,33 @@ class ExportMixin:
             f'serialization_options: {serialization_options}\n'
         )
         try:
-            iter_json = json.JSONEncoder(ensure_ascii=False).iterencode(
-                SerializableGenerator(
-                    self.get_export_data(
-                        task_filter_options=task_filter_options,
-                        annotation_filter_options=annotation_filter_options,
-                        serialization_options=serialization_options,
+            workers = settings.EXPORT_SERIALIZATION_WORKERS
+            # workers read committed data with their own connections, so there must be no open transaction
+            if workers > 1 and not connection.in_atomic_block:
+                chunks = self._iter_json_chunks_parallel(
+                    workers, task_filter_options, annotation_filter_options, serialization_options
+                )
+            else:
+                chunks = (
+                    chunk.encode('utf-8')
+                    for chunk in json.JSONEncoder(ensure_ascii=False).iterencode(
+                        SerializableGenerator(
+                            self.get_export_data(
+                                task_filter_options=task_filter_options,
+                                annotation_filter_options=annotation_filter_options,
+                                serialization_options=serialization_options,
+                            )
+                        )
                     )
                 )
-            )
+
             with tempfile.NamedTemporaryFile(suffix='.export.json', dir=settings.FILE_UPLOAD_TEMP_DIR) as file:
-                for chunk in iter_json:
-                    encoded_chunk = chunk.encode('utf-8')
-                    file.write(encoded_chunk)
+                md5_object = hashlib.md5()   # nosec
+                for chunk in chunks:
+                    file.write(chunk)
+                    md5_object.update(chunk)
                 file.seek(0)
-
-                md5 = self.eval_md5(file)
-                self.save_file(file, md5)
+                self.save_file(file, md5_object.hexdigest())
 
             self.status = self.Status.COMPLETED
             self.save(update_fields=['status'])
@@ -316,6 +345,59 @@ class ExportMixin:
             self.finished_at = datetime.now()
             self.save(update_fields=['finished_at'])
 
+    def _iter_json_chunks_parallel(
+        self, workers, task_filter_options=None, annotation_filter_options=None, serialization_options=None
+    ):
+        """Serialize and JSON-encode task batches in a process pool, yield encoded chunks in the task order.
+
+        The output is byte-identical to the single-process export. At most workers * 2 batches are
+        in flight, so memory usage is bounded while the pool is kept busy.
+        """
+        start = datetime.now()
+        self.counters = {'task_number': 0}
+        tasks_qs = self._get_export_tasks_queryset(task_filter_options)
+        batch_size = self._get_export_batch_size()
+
+        executor = None
+        in_flight = collections.deque()
+        first = True
+
+        def drain(keep):
+            nonlocal first
+            while len(in_flight) > keep or (in_flight and in_flight[0].done()):
+                chunk, count = in_flight.popleft().result()
+                if count:
+                    yield chunk if first else b', ' + chunk
+                    first = False
+                    self.counters['task_number'] += count
+
+        try:
+            yield b'['
+            # ids are fetched with keyset queries, a server-side cursor can't survive closing the connection below
+            for ids in self._iter_task_id_batches(tasks_qs, batch_size, server_side_cursor=False):
+                if executor is None:
+                    # workers are forked on the first submit, they must not inherit the parent's
+                    # database connections, so close them, each side will open its own
+                    connections.close_all()
+                    executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker)
+                in_flight.append(
+                    executor.submit(
+                        serialize_export_batch, self.id, ids, annotation_filter_options, serialization_options
+                    )
+                )
+                yield from drain(keep=workers * 2 - 1)
+            yield from drain(keep=0)
+            yield b']'
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+        duration = datetime.now() - start
+        logger.info(
+            f'{self.counters["task_number"]} tasks from project {self.project_id} exported '
+            f'by {workers} workers in {duration.total_seconds():.2f} seconds'
+        )
+
     def run_file_exporting(self, task_filter_options=None, annotation_filter_options=None, serialization_options=None):
         if self.status == self.Status.IN_PROGRESS:
             logger.warning('Try to export with in progress stage')
@@ -324,16 +406,15 @@ class ExportMixin:
         self.status = self.Status.IN_PROGRESS
         self.save(update_fields=['status'])
 
-        if redis_connected():
-            queue = django_rq.get_queue('default')
-            queue.enqueue(
+        if job_queue_available():
+            start_job_async_or_sync(
                 export_background,
                 self.id,
                 task_filter_options,
                 annotation_filter_options,
                 serialization_options,
                 on_failure=set_export_background_failure,
-                job_timeout='3h',  # 3 hours
+                job_timeout=3 * 60 * 60,  # 3 hours
             )
         else:
             self.export_to_file(
@@ -386,6 +467,22 @@ class ExportMixin:
                 )
 
 
+def _init_export_worker():
+    import django
+
+    django.setup()
+
+
+def serialize_export_batch(export_id, ids, annotation_filter_options, serialization_options):
+    """Process pool job: serialize one batch of tasks and encode it as comma-separated JSON objects"""
+    from data_export.models import Export
+
+    export = Export.objects.get(id=export_id)
+    data = export._serialize_tasks_batch(ids, annotation_filter_options, serialization_options)
+    chunk = ', '.join(json.dumps(task, ensure_ascii=False) for task in data).encode('utf-8')
+    return chunk, len(data)
+
+
 def export_background(
     export_id, task_filter_options, annotation_filter_options, serialization_options, *args, **kwargs
 ):
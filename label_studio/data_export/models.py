@@ -4,12 +4,14 @@ import hashlib
 import logging
 import os
 import shutil
+import tempfile
 from copy import deepcopy
 from datetime import datetime
 
 import ujson as json
 from core import version
 from core.feature_flags import flag_set
+from core.redis import start_job_async_or_sync
 from core.utils.common import load_func
 from core.utils.io import get_all_files_from_dir, get_temp_dir, path_to_open_binary_file
 from django.conf import settings
@@ -18,9 +20,13 @@ from django.db.models.signals import post_save
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from label_studio_sdk.converter import Converter
-from tasks.models import Annotation
 
-from .export_file import upload_without_cache_check
+from .export_file import (
+    async_upload_export_to_csghub,
+    get_csghub_export_folder,
+    get_csghub_upload_params,
+    stage_file,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -94,25 +100,58 @@ def set_export_default_name(sender, instance, created, **kwargs):
 
 
 class DataExport(object):
-    # TODO: deprecated
     @staticmethod
-    def save_export_files(project, now, get_args, data, md5, name):
-        """Generate two files: meta info and result file and store them locally for logging"""
+    def stream_export_files(project, now, get_args, tasks):
+        """Write tasks to the result file one by one and store meta info near it.
+
+        md5 and task/annotation counters are computed in the same pass, so memory usage doesn't depend
+        on the number of tasks, and `tasks` can be any iterable, e.g. a generator over queryset batches.
+        Returns (result filename, md5, export name).
+        """
+        md5_object = hashlib.md5()   # nosec
+        task_number, annotation_number = 0, 0
+        with tempfile.NamedTemporaryFile('wb', suffix='.part', dir=settings.EXPORT_DIR, delete=False) as f:
+            try:
+                f.write(b'[')
+                md5_object.update(b'[')
+                for task in tasks:
+                    chunk = json.dumps(task, ensure_ascii=False).encode('utf-8')
+                    if task_number:
+                        chunk = b',' + chunk
+                    f.write(chunk)
+                    md5_object.update(chunk)
+                    task_number += 1
+                    annotation_number += len(task.get('annotations') or [])
+                f.write(b']')
+                md5_object.update(b']')
+            except BaseException:
+                f.close()
+                os.remove(f.name)
+                raise
+
+        md5 = md5_object.hexdigest()
+        name = 'project-' + str(project.id) + '-at-' + now.strftime('%Y-%m-%d-%H-%M') + f'-{md5[0:8]}'
+        filename_results = os.path.join(settings.EXPORT_DIR, name + '.json')
+        os.replace(f.name, filename_results)
+        DataExport.save_export_info(project, now, get_args, md5, name, task_number, annotation_number)
+        return filename_results, md5, name
+
+    @staticmethod
+    def save_export_info(project, now, get_args, md5, name, task_number, annotation_number):
         filename_results = os.path.join(settings.EXPORT_DIR, name + '.json')
         filename_info = os.path.join(settings.EXPORT_DIR, name + '-info.json')
-        annotation_number = Annotation.objects.filter(project=project).count()
         try:
             platform_version = version.get_git_version()
         except:  # noqa: E722
             platform_version = 'none'
-            logger.error('Version is not detected in save_export_files()')
+            logger.error('Version is not detected in save_export_info()')
         info = {
             'project': {
                 'title': project.title,
                 'id': project.id,
                 'created_at': project.created_at.strftime('%Y-%m-%dT%H:%M:%SZ'),
                 'created_by': project.created_by.email,
-                'task_number': project.tasks.count(),
+                'task_number': task_number,
                 'annotation_number': annotation_number,
             },
             'platform': {'version': platform_version},
@@ -123,12 +162,8 @@ class DataExport(object):
                 'md5': md5,
             },
         }
-
-        with open(filename_results, 'w', encoding='utf-8') as f:
-            f.write(data)
         with open(filename_info, 'w', encoding='utf-8') as f:
             json.dump(info, f, ensure_ascii=False)
-        return filename_results
 
     @staticmethod
     def get_export_formats(project):
@@ -144,14 +179,24 @@ class DataExport(object):
         return sorted(formats, key=lambda f: f.get('disabled', False))
 
     @staticmethod
-    def generate_export_file(project, tasks, output_format, download_resources, get_args, hostname=None, request=None, target_dataset='', target_branch=''):
-        """Generate export file and return it as an open file object. request 可选，用于 CSGHub 上传。target_dataset 和 target_branch 为用户指定的目标数据集和分支。"""
+    def generate_export_file(
+        project,
+        tasks,
+        output_format,
+        download_resources,
+        get_args,
+        hostname=None,
+        csghub_export=None,
+        target_dataset='',
+        target_branch='',
+    ):
+        """Generate export file and return it as an open file object.
+        tasks can be a list or any iterable of serialized tasks, they are streamed to disk in one pass.
+        csghub_export 可选：用于跟踪 CSGHub 上传进度的 Export，target_dataset 和 target_branch 为用户指定的目标数据集和分支。
+        上传到 CSGHub 时文件交给上传任务（任务完成后删除），返回的文件对象为 None。
+        """
         now = datetime.now()
-        data = json.dumps(tasks, ensure_ascii=False)
-        md5 = hashlib.md5(json.dumps(data).encode('utf-8')).hexdigest()   # nosec
-        name = 'project-' + str(project.id) + '-at-' + now.strftime('%Y-%m-%d-%H-%M') + f'-{md5[0:8]}'
-
-        input_json = DataExport.save_export_files(project, now, get_args, data, md5, name)
+        input_json, _, name = DataExport.stream_export_files(project, now, get_args, tasks)
 
         created_by = getattr(project.organization, 'created_by', None)
         access_token = (created_by.get_token().key if (created_by and hasattr(created_by, 'get_token')) else '')
@@ -170,38 +215,56 @@ class DataExport(object):
                 output_file = files[0]
                 ext = os.path.splitext(output_file)[-1]
                 filename = name + os.path.splitext(output_file)[-1]
-                # CSGHub 上传：使用用户指定的目标数据集和分支
-                if request and target_dataset and target_branch and getattr(request.user, 'user_token', None):
-                    target_dir = os.path.join(settings.EXPORT_DIR, f'project_{project.id}')
-                    os.makedirs(target_dir, exist_ok=True)
-                    shutil.copy2(output_file, os.path.join(target_dir, filename))
-                    # 复制 result json 和 info json 到 target_dir，确保 CSGHub 上传包含完整文件
-                    shutil.copy2(input_json, os.path.join(target_dir, name + '.json'))
-                    shutil.copy2(os.path.join(settings.EXPORT_DIR, name + '-info.json'), os.path.join(target_dir, name + '-info.json'))
-                    try:
-                        upload_without_cache_check(request, target_dataset, target_branch, target_dir)
-                    except Exception as e:
-                        logger.exception('CSGHub 上传失败: %s', e)
-                out = path_to_open_binary_file(output_file)
-                return out, f'application/{ext}', filename
+                content_type = f'application/{ext}'
+            else:
+                zip_base = os.path.join(os.path.dirname(tmp_dir), name)
+                output_file = shutil.make_archive(zip_base, 'zip', tmp_dir)
+                filename = name + '.zip'
+                content_type = 'application/zip'
+
+            # CSGHub 上传：使用用户指定的目标数据集和分支，上传在后台任务中进行
+            if csghub_export is not None and target_dataset and target_branch:
+                DataExport.start_csghub_upload(
+                    csghub_export, name, input_json, output_file, filename, target_dataset, target_branch
+                )
+                return None, content_type, filename
+            out = path_to_open_binary_file(output_file)
+            return out, content_type, filename
+
+    @staticmethod
+    def start_csghub_upload(export, name, input_json, output_file, filename, target_dataset, target_branch):
+        """Stage converted file, result json and info json for upload and start the upload job.
+        Files are moved or hard-linked into the export staging folder, so no extra copies are made.
+        The staged files belong to the upload job, it removes the folder after the upload.
+        """
+        endpoint, revision = get_csghub_upload_params(export.created_by, target_dataset, target_branch)
+        folder = get_csghub_export_folder(export.id, endpoint, target_dataset, revision)
 
-            zip_base = os.path.join(os.path.dirname(tmp_dir), name)
-            zip_path = shutil.make_archive(zip_base, 'zip', tmp_dir)
-            filename = name + '.zip'
-            # CSGHub 上传：使用用户指定的目标数据集和分支
-            if request and target_dataset and target_branch and getattr(request.user, 'user_token', None):
-                target_dir = os.path.join(settings.EXPORT_DIR, f'project_{project.id}')
-                os.makedirs(target_dir, exist_ok=True)
-                shutil.copy2(zip_path, os.path.join(target_dir, filename))
-                # 复制 result json 和 info json 到 target_dir，确保 CSGHub 上传包含完整文件
-                shutil.copy2(input_json, os.path.join(target_dir, name + '.json'))
-                shutil.copy2(os.path.join(settings.EXPORT_DIR, name + '-info.json'), os.path.join(target_dir, name + '-info.json'))
-                try:
-                    upload_without_cache_check(request, target_dataset, target_branch, target_dir)
-                except Exception as e:
-                    logger.exception('CSGHub 上传失败: %s', e)
-            out = path_to_open_binary_file(zip_path)
-            return out, 'application/zip', filename
+        # the converted file is a temporary one, so it's moved, other files stay in EXPORT_DIR and are linked
+        stage_file(output_file, folder, filename, move=True)
+        file_names = [filename]
+        for file_name in [name + '.json', name + '-info.json']:
+            if file_name not in file_names:
+                stage_file(os.path.join(settings.EXPORT_DIR, file_name), folder, file_name)
+                file_names.append(file_name)
+
+        export.counters = {
+            **(export.counters or {}),
+            'csghub_upload': {'target_dataset': target_dataset, 'revision': revision, 'files': file_names},
+        }
+        export.save(update_fields=['counters'])
+        try:
+            start_job_async_or_sync(
+                async_upload_export_to_csghub,
+                export.id,
+                export.created_by_id,
+                target_dataset,
+                target_branch,
+                job_timeout=settings.RQ_LONG_JOB_TIMEOUT,
+            )
+        except Exception as e:
+            # without redis the job runs inline, its failure is already saved to the export status
+            logger.exception('CSGHub 上传失败: %s', e)
 
 
 class ConvertedFormat(models.Model):
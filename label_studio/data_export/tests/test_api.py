@@ -1,9 +1,15 @@
+import hashlib
+import os
+from datetime import datetime
 from unittest.mock import ANY, patch
 
+import ujson
 from data_export.api import async_convert
-from data_export.models import ConvertedFormat, Export
+from data_export.models import ConvertedFormat, DataExport, Export
+from django.conf import settings
 from projects.tests.factories import ProjectFactory
 from rest_framework.test import APITestCase
+from tasks.models import Annotation, Task
 
 
 @patch('data_export.api.start_job_async_or_sync')
@@ -68,3 +74,43 @@ class TestExportConvertAPI(APITestCase):
             download_resources=False,
             on_failure=ANY,
         )
+
+
+class TestExportAPI(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectFactory()
+        cls.user = cls.project.created_by
+        for i in range(3):
+            task = Task.objects.create(project=cls.project, data={'text': f'text {i}'})
+            Annotation.objects.create(task=task, project=cls.project, result=[], completed_by=cls.user)
+
+    def test_download_is_streamed_to_file(self):
+        self.client.force_authenticate(user=self.user)
+        with patch('data_export.models.json.dumps', wraps=ujson.dumps) as dumps:
+            response = self.client.get(
+                f'/api/projects/{self.project.id}/export', {'exportType': 'JSON', 'download_all_tasks': 'true'}
+            )
+        assert response.status_code == 200
+        # each task is encoded separately, the whole export is never built in memory
+        assert dumps.call_count == 3
+
+        name = os.path.splitext(response['filename'])[0]
+        with open(os.path.join(settings.EXPORT_DIR, name + '.json'), 'rb') as f:
+            content = f.read()
+        with open(os.path.join(settings.EXPORT_DIR, name + '-info.json')) as f:
+            info = ujson.load(f)
+
+        tasks = ujson.loads(content)
+        assert [task['data']['text'] for task in tasks] == ['text 0', 'text 1', 'text 2']
+        assert info['download']['md5'] == hashlib.md5(content).hexdigest()
+        assert name.endswith(info['download']['md5'][:8])
+        assert (info['project']['task_number'], info['project']['annotation_number']) == (3, 3)
+
+    def test_stream_export_files_with_generator(self):
+        tasks = ({'id': i, 'annotations': [], 'data': {'text': 'ü'}} for i in range(2))
+        filename, md5, _ = DataExport.stream_export_files(self.project, datetime.now(), {}, tasks)
+        with open(filename, 'rb') as f:
+            content = f.read()
+        assert ujson.loads(content) == [{'id': i, 'annotations': [], 'data': {'text': 'ü'}} for i in range(2)]
+        assert md5 == hashlib.md5(content).hexdigest()
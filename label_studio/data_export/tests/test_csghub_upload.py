@@ -0,0 +1,160 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import ANY, patch
+
+import pytest
+from data_export.export_file import async_upload_export_to_csghub, get_csghub_export_folder, upload_folder_to_csghub
+from data_export.models import Export
+from django.conf import settings
+from django.test import override_settings
+from lockfile import LockTimeout
+from projects.tests.factories import ProjectFactory
+from rest_framework.test import APITestCase
+from tasks.models import Task
+
+
+class TestCSGHubExportUpload(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectFactory()
+        cls.user = cls.project.created_by
+        cls.user.user_token = 'token'
+        cls.user.save()
+        Task.objects.create(project=cls.project, data={'text': 'hello'})
+
+    def setUp(self):
+        upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, upload_dir, True)
+        settings_override = override_settings(CSGHUB_EXPORT_UPLOAD_DIR=upload_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    @patch('data_export.models.start_job_async_or_sync')
+    def test_export_starts_upload_job(self, mock_start_job):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            f'/api/projects/{self.project.id}/export',
+            {'exportType': 'JSON', 'download_all_tasks': 'true', 'target_dataset': 'ns/ds', 'target_branch': 'main'},
+        )
+        assert response.status_code == 200
+        assert response.json()['exported_to_csghub'] is True
+
+        export = Export.objects.get(id=response.json()['export_id'])
+        upload = export.counters['csghub_upload']
+        assert upload['revision'] == 'main_label'
+        mock_start_job.assert_called_once_with(
+            async_upload_export_to_csghub,
+            export.id,
+            self.user.id,
+            'ns/ds',
+            'main',
+            job_timeout=ANY,
+        )
+
+        # staged files are links to the export files, not copies, every export has its own folder
+        folder = get_csghub_export_folder(export.id, 'http://net-power.9free.com.cn:58120', 'ns/ds', 'main_label')
+        assert sorted(os.listdir(folder)) == sorted(upload['files'])
+        info_name = next(name for name in upload['files'] if name.endswith('-info.json'))
+        assert os.path.samefile(os.path.join(folder, info_name), os.path.join(settings.EXPORT_DIR, info_name))
+
+    @override_settings(LOCAL_JOB_QUEUE_ENABLED=False)
+    @patch('core.redis.redis_connected', return_value=False)
+    def test_export_with_inline_upload_job(self, _):
+        uploaded = []
+
+        def fake_upload(folder, *args, **kwargs):
+            uploaded.extend(os.listdir(folder))
+
+        self.client.force_authenticate(user=self.user)
+        with patch('data_export.export_file.upload_folder_to_csghub', side_effect=fake_upload):
+            response = self.client.get(
+                f'/api/projects/{self.project.id}/export',
+                {
+                    'exportType': 'JSON',
+                    'download_all_tasks': 'true',
+                    'target_dataset': 'ns/ds',
+                    'target_branch': 'main',
+                },
+            )
+        assert response.status_code == 200
+        assert response.json()['status'] == Export.Status.COMPLETED
+
+        export = Export.objects.get(id=response.json()['export_id'])
+        assert sorted(uploaded) == sorted(export.counters['csghub_upload']['files'])
+        # the job has removed the export folder, the response doesn't depend on it
+        (folder,) = os.listdir(settings.CSGHUB_EXPORT_UPLOAD_DIR)
+        assert os.listdir(os.path.join(settings.CSGHUB_EXPORT_UPLOAD_DIR, folder)) == []
+
+    def test_upload_job_reports_progress(self):
+        export = Export.objects.create(project=self.project, created_by=self.user, title='csghub')
+        progress = {'files_total': 1, 'files_committed': 1, 'bytes_total': 5, 'bytes_committed': 5}
+
+        def fake_upload(folder, *args, progress_callback, **kwargs):
+            assert os.listdir(folder) == ['result.json']
+            progress_callback(progress)
+
+        folder = get_csghub_export_folder(export.id, 'http://net-power.9free.com.cn:58120', 'ns/ds', 'main_label')
+        with open(os.path.join(folder, 'result.json'), 'w') as f:
+            f.write('[{}]')
+
+        with patch('data_export.export_file.upload_folder_to_csghub', side_effect=fake_upload):
+            async_upload_export_to_csghub(export.id, self.user.id, 'ns/ds', 'main')
+
+        export.refresh_from_db()
+        assert export.status == Export.Status.COMPLETED
+        assert export.counters['csghub_upload'] == progress
+        # the staging folder of the uploaded export is removed
+        assert not os.path.exists(folder)
+
+    def test_upload_job_failure(self):
+        export = Export.objects.create(project=self.project, created_by=self.user, title='csghub')
+        with patch('data_export.export_file.upload_folder_to_csghub', side_effect=RuntimeError('boom')):
+            with pytest.raises(RuntimeError):
+                async_upload_export_to_csghub(export.id, self.user.id, 'ns/ds', 'main')
+
+        export.refresh_from_db()
+        assert export.status == Export.Status.FAILED
+        assert export.counters['csghub_upload']['error'] == 'boom'
+
+    def test_upload_job_lock_timeout(self):
+        export = Export.objects.create(project=self.project, created_by=self.user, title='csghub')
+        with patch('data_export.export_file.LockFile') as lock_file:
+            lock_file.return_value.acquire.side_effect = LockTimeout('locked')
+            lock_file.return_value.i_am_locking.return_value = False
+            with pytest.raises(LockTimeout):
+                async_upload_export_to_csghub(export.id, self.user.id, 'ns/ds', 'main')
+
+        lock_file.return_value.release.assert_not_called()
+        export.refresh_from_db()
+        assert export.status == Export.Status.FAILED
+        assert export.counters['csghub_upload']['error'] == 'locked'
+
+    def test_upload_folder_with_upload_large_folder(self):
+        folder = get_csghub_export_folder(1, 'http://csghub', 'ns/ds', 'main_label')
+        with open(os.path.join(folder, 'result.json'), 'w') as f:
+            f.write('[{}]')
+        reports = []
+
+        with patch('pycsghub.cli.upload_large_folder') as upload_large_folder:
+            progress = upload_folder_to_csghub(
+                folder,
+                'ns/ds',
+                'main_label',
+                'http://csghub',
+                'token',
+                num_workers=2,
+                progress_callback=reports.append,
+            )
+
+        kwargs = upload_large_folder.call_args.kwargs
+        assert (kwargs['repo_id'], kwargs['local_path'], kwargs['revision']) == ('ns/ds', folder, 'main_label')
+        assert (kwargs['endpoint'], kwargs['token'], kwargs['num_workers']) == ('http://csghub', 'token', 2)
+        assert progress['files_total'] == 1 and progress['bytes_total'] == 4
+        assert reports[-1] == progress
+
+    def test_upload_folder_error_is_raised(self):
+        folder = get_csghub_export_folder(1, 'http://csghub', 'ns/ds', 'main_label')
+        with patch('pycsghub.cli.upload_large_folder', side_effect=RuntimeError('upload failed')):
+            with pytest.raises(RuntimeError, match='upload failed'):
+                upload_folder_to_csghub(folder, 'ns/ds', 'main_label', 'http://csghub', 'token')
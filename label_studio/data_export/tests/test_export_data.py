@@ -0,0 +1,74 @@
+import hashlib
+import re
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+from data_export.models import Export
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from projects.tests.factories import ProjectFactory
+from rest_framework.test import APITestCase
+from tasks.models import Annotation, Task
+
+
+class TestGetExportData(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = ProjectFactory()
+        cls.user = cls.project.created_by
+        cls.tasks = [Task.objects.create(project=cls.project, data={'text': f'text {i}'}) for i in range(7)]
+        for task in cls.tasks[::2]:
+            Annotation.objects.create(task=task, project=cls.project, result=[], completed_by=cls.user)
+        cls.export = Export.objects.create(project=cls.project, created_by=cls.user)
+
+    def test_keyset_batches(self):
+        batches = list(Export._iter_task_id_batches(self.project.tasks.all(), 3))
+        ids = [task.id for task in self.tasks]
+        assert batches == [ids[0:3], ids[3:6], ids[6:7]]
+
+    def test_keyset_batches_with_join_filter(self):
+        # filters with joins produce duplicates, they must not break pagination
+        tasks_qs = self.project.tasks.filter(annotations__was_cancelled=False)
+        batches = list(Export._iter_task_id_batches(tasks_qs, 2))
+        assert sum(batches, []) == [task.id for task in self.tasks[::2]]
+
+    def test_only_with_annotations_in_sql(self, batch_size=2):
+        with self.settings(BATCH_SIZE=batch_size), CaptureQueriesContext(connection) as queries:
+            data = list(self.export.get_export_data(task_filter_options={'only_with_annotations': True}))
+
+        assert [task['id'] for task in data] == [task.id for task in self.tasks[::2]]
+        assert self.export.counters['task_number'] == 4
+        # no per-task annotation queries
+        assert not [q for q in queries if re.search(r'"task_completion"\."task_id" = \d+', q['sql'])]
+
+    def test_all_tasks(self):
+        data = list(self.export.get_export_data())
+        assert [task['id'] for task in data] == [task.id for task in self.tasks]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_export_is_identical(settings):
+    project = ProjectFactory()
+    for i in range(5):
+        task = Task.objects.create(project=project, data={'text': f'текст {i}'})
+        Annotation.objects.create(task=task, project=project, result=[], completed_by=project.created_by)
+    settings.BATCH_SIZE = 2
+
+    def export_file(workers):
+        settings.EXPORT_SERIALIZATION_WORKERS = workers
+        export = Export.objects.create(project=project, created_by=project.created_by)
+        export.export_to_file()
+        export.refresh_from_db()
+        assert export.status == Export.Status.COMPLETED
+        with export.file.open('rb') as f:
+            return f.read(), export
+
+    content, export = export_file(1)
+    # threads instead of processes: the in-memory test database isn't visible to forked processes
+    with mock.patch('data_export.mixins.ProcessPoolExecutor', ThreadPoolExecutor):
+        parallel_content, parallel_export = export_file(3)
+
+    assert parallel_content == content
+    assert parallel_export.md5 == export.md5 == hashlib.md5(content).hexdigest()
+    assert parallel_export.counters == {'task_number': 5}
@@ -3,7 +3,6 @@
 import json
 import logging
 import mimetypes
-import os
 import time
 from urllib.parse import unquote, urlparse
 
@@ -40,6 +39,7 @@ from webhooks.utils import emit_webhooks_for_instance
 
 from label_studio.core.utils.common import load_func
 
+from .csghub_client import get_csghub_client, get_csghub_endpoint
 from .functions import (
     async_import_background,
     async_reimport_background,
@@ -59,6 +59,17 @@ ProjectImportPermission = load_func(settings.PROJECT_IMPORT_PERMISSION)
 # ---------- CSGHub 二开 ----------
 
 
+def _csghub_client_or_error():
+    endpoint = get_csghub_endpoint()
+    if not endpoint:
+        return None, Response({"error": "未配置 CSGHUB_ENDPOINT"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return get_csghub_client(endpoint), None
+
+
+def _csghub_error_response(e):
+    return Response({"error": f"调用 CSGHub API 失败: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
+
+
 @method_decorator(name='get', decorator=extend_schema(exclude=True))
 class PublicListAPI(APIView):
     permission_classes = [IsAuthenticated]
@@ -68,18 +79,13 @@ class PublicListAPI(APIView):
         authorization = getattr(request.user, 'authorization', None) or ''
         if not user_name:
             return Response({"error": "当前用户未设置 user_name"}, status=status.HTTP_400_BAD_REQUEST)
-        endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
-        if not endpoint:
-            return Response({"error": "未配置 CSGHUB_ENDPOINT"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        url = f"{endpoint.rstrip('/')}/api/v1/user/{user_name}/datasets?per=50&page=1"
+        client, error = _csghub_client_or_error()
+        if error:
+            return error
         try:
-            resp = requests.get(url, headers={"Authorization": authorization}, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            paths = [item.get('path', '') for item in (data.get('data') or []) if item and item.get('path')]
-            return Response(paths)
+            return Response(client.user_datasets(user_name, authorization))
         except requests.RequestException as e:
-            return Response({"error": f"调用 CSGHub API 失败: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
+            return _csghub_error_response(e)
 
 
 @method_decorator(name='get', decorator=extend_schema(exclude=True))
@@ -91,18 +97,13 @@ class DatasetBranchesAPI(APIView):
         if not repo_id:
             return Response({"error": "缺少 repo_id 参数"}, status=status.HTTP_400_BAD_REQUEST)
         authorization = getattr(request.user, 'authorization', None) or ''
-        endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
-        if not endpoint:
-            return Response({"error": "未配置 CSGHUB_ENDPOINT"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        url = f"{endpoint.rstrip('/')}/api/v1/datasets/{repo_id}/branches"
+        client, error = _csghub_client_or_error()
+        if error:
+            return error
         try:
-            resp = requests.get(url, headers={"Authorization": authorization}, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            names = [item.get('name', '') for item in (data.get('data') or []) if item and item.get('name')]
-            return Response(names)
+            return Response(client.dataset_branches(repo_id, authorization))
         except requests.RequestException as e:
-            return Response({"error": f"调用 CSGHub API 失败: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
+            return _csghub_error_response(e)
 
 
 @method_decorator(name='get', decorator=extend_schema(exclude=True))
@@ -120,39 +121,36 @@ class OrganizationListAPI(APIView):
         authorization = getattr(request.user, 'authorization', None) or ''
         if not user_name:
             return Response({"error": "当前用户未设置 user_name"}, status=status.HTTP_400_BAD_REQUEST)
-        endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
-        if not endpoint:
-            return Response({"error": "未配置 CSGHUB_ENDPOINT"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        url = f"{endpoint.rstrip('/')}/api/v1/user/{user_name}"
+        client, error = _csghub_client_or_error()
+        if error:
+            return error
         try:
-            resp = requests.get(url, headers={"Authorization": authorization, "User-Token": authorization}, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            d = data.get('data', {}) or {}
-            result = []
-            # 个人（数据所有者本人）
-            personal_path = d.get('username', '') or ''
-            if personal_path:
-                result.append({
-                    'path': personal_path,
-                    'name': d.get('nickname', '') or personal_path,
-                    'type': 'user',
-                    'uuid': d.get('uuid', ''),
-                })
-            # 组织列表（用户加入的全部组织）
-            for org in d.get('orgs', []) or []:
-                org_path = org.get('path', '')
-                if not org_path:
-                    continue
-                result.append({
-                    'path': org_path,
-                    'name': org.get('name', '') or org_path,
-                    'type': 'organization',
-                    'uuid': org.get('uuid', ''),
-                })
-            return Response(result)
+            d = client.user_info(user_name, authorization)
         except requests.RequestException as e:
-            return Response({"error": f"调用 CSGHub API 失败: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
+            return _csghub_error_response(e)
+
+        result = []
+        # 个人（数据所有者本人）
+        personal_path = d.get('username', '') or ''
+        if personal_path:
+            result.append({
+                'path': personal_path,
+                'name': d.get('nickname', '') or personal_path,
+                'type': 'user',
+                'uuid': d.get('uuid', ''),
+            })
+        # 组织列表（用户加入的全部组织）
+        for org in d.get('orgs', []) or []:
+            org_path = org.get('path', '')
+            if not org_path:
+                continue
+            result.append({
+                'path': org_path,
+                'name': org.get('name', '') or org_path,
+                'type': 'organization',
+                'uuid': org.get('uuid', ''),
+            })
+        return Response(result)
 
 
 @method_decorator(name='get', decorator=extend_schema(exclude=True))
@@ -165,18 +163,13 @@ class OrganizationDatasetsAPI(APIView):
             return Response({"error": "缺少 org_name 参数"}, status=status.HTTP_400_BAD_REQUEST)
         user_name = getattr(request.user, 'user_name', None) or ''
         authorization = getattr(request.user, 'authorization', None) or ''
-        endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
-        if not endpoint:
-            return Response({"error": "未配置 CSGHUB_ENDPOINT"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        url = f"{endpoint.rstrip('/')}/api/v1/organization/{org_name}/datasets?current_user={user_name}&per=50"
+        client, error = _csghub_client_or_error()
+        if error:
+            return error
         try:
-            resp = requests.get(url, headers={"Authorization": authorization}, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            paths = [item.get('path', '') for item in (data.get('data') or []) if item and item.get('path')]
-            return Response(paths)
+            return Response(client.organization_datasets(org_name, user_name, authorization))
         except requests.RequestException as e:
-            return Response({"error": f"调用 CSGHub API 失败: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
+            return _csghub_error_response(e)
 
 
 @method_decorator(name='get', decorator=extend_schema(exclude=True))
@@ -192,24 +185,21 @@ class UserNamespacesAPI(APIView):
         authorization = getattr(request.user, 'authorization', None) or ''
         if not user_name:
             return Response({"error": "当前用户未设置 user_name"}, status=status.HTTP_400_BAD_REQUEST)
-        endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
-        if not endpoint:
-            return Response({"error": "未配置 CSGHUB_ENDPOINT"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-        url = f"{endpoint.rstrip('/')}/api/v1/user/{user_name}"
+        client, error = _csghub_client_or_error()
+        if error:
+            return error
         try:
-            resp = requests.get(url, headers={"Authorization": authorization, "User-Token": authorization}, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-            namespaces = data.get('data', {}).get('namespaces', []) or []
-            result = []
-            for ns in namespaces:
-                path = ns.get('Path', '')
-                ns_type = ns.get('Type', '')
-                if path:
-                    result.append({'path': path, 'type': ns_type})
-            return Response(result)
+            namespaces = client.user_info(user_name, authorization).get('namespaces', []) or []
         except requests.RequestException as e:
-            return Response({"error": f"调用 CSGHub API 失败: {str(e)}"}, status=status.HTTP_502_BAD_GATEWAY)
+            return _csghub_error_response(e)
+
+        result = []
+        for ns in namespaces:
+            path = ns.get('Path', '')
+            ns_type = ns.get('Type', '')
+            if path:
+                result.append({'path': path, 'type': ns_type})
+        return Response(result)
 
 
 task_create_response_scheme = {
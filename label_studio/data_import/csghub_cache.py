@@ -0,0 +1,220 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+"""
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from lockfile import LockError, LockTimeout
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+COMPLETE_MARKER = '.complete'
+STATS_FILE = 'stats.json'
+
+
+class CSGHubSnapshotCache:
+    """Shared local cache of CSGHub dataset snapshots
+
+    Snapshots are keyed by (endpoint, dataset, revision, commit sha), so a new commit in the branch
+    produces a new cache entry. Entries are evicted in LRU order when the total size exceeds the quota.
+    A file lock per entry guarantees that concurrent imports of the same revision download it only once.
+    Locks are held by the OS on an open file, so a lock of a crashed process is released automatically
+    and a lock is never broken while its owner is still downloading or importing the snapshot.
+
+    Layout:
+        <root>/<key>/snapshot/...   downloaded files
+        <root>/<key>/.complete      json with entry info, its mtime is the last access time
+        <root>/<key>.lock           lock for the entry
+        <root>/stats.json           hit/miss counters shared between processes
+    """
+
+    def __init__(self, root=None, quota=None, lock_timeout=None):
+        self.root = root or settings.CSGHUB_SNAPSHOT_CACHE_DIR
+        self.quota = settings.CSGHUB_SNAPSHOT_CACHE_QUOTA if quota is None else quota
+        self.lock_timeout = settings.CSGHUB_SNAPSHOT_CACHE_LOCK_TIMEOUT if lock_timeout is None else lock_timeout
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def make_key(endpoint, dataset, revision, commit):
+        raw = f'{endpoint}|{dataset}|{revision}|{commit}'
+        return hashlib.sha256(raw.encode()).hexdigest()[:32]
+
+    def _entry_dir(self, key):
+        return os.path.join(self.root, key)
+
+    def _lock(self, name):
+        return _FileLock(os.path.join(self.root, name))
+
+    def _acquire(self, lock, timeout):
+        lock.acquire(timeout=timeout)
+
+    @contextmanager
+    def snapshot(self, key, download_func):
+        """Yield directory with snapshot files, download_func(target_dir) is called only on cache miss.
+
+        The entry is locked while the caller works with the files, so it can't be evicted in the middle
+        of the import, and concurrent imports of the same snapshot wait for the first download.
+        """
+        entry_dir = self._entry_dir(key)
+        snapshot_dir = os.path.join(entry_dir, 'snapshot')
+        marker = os.path.join(entry_dir, COMPLETE_MARKER)
+
+        lock = self._lock(key)
+        self._acquire(lock, self.lock_timeout)
+        try:
+            if os.path.exists(marker):
+                os.utime(marker)
+                self._update_stats('hits')
+                logger.info(f'CSGHub snapshot cache hit: {key}')
+            else:
+                self._update_stats('misses')
+                logger.info(f'CSGHub snapshot cache miss: {key}')
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                os.makedirs(snapshot_dir)
+                start = time.time()
+                try:
+                    download_func(snapshot_dir)
+                except Exception:
+                    shutil.rmtree(entry_dir, ignore_errors=True)
+                    raise
+
+                size = _folder_size(snapshot_dir)
+                with open(marker, 'w') as f:
+                    json.dump({'key': key, 'size': size, 'download_time': time.time() - start}, f)
+                self._update_stats('downloaded_bytes', size)
+
+            yield snapshot_dir
+        finally:
+            lock.release()
+
+        self.evict(keep={key})
+
+    def entries(self):
+        """List of (key, size, last access time) for complete entries"""
+        result = []
+        for key in os.listdir(self.root):
+            marker = os.path.join(self._entry_dir(key), COMPLETE_MARKER)
+            if not os.path.isfile(marker):
+                continue
+            try:
+                with open(marker) as f:
+                    size = json.load(f).get('size', 0)
+                result.append((key, size, os.path.getmtime(marker)))
+            except (OSError, ValueError):
+                logger.warning(f'CSGHub snapshot cache: broken entry {key}', exc_info=True)
+        return result
+
+    def evict(self, keep=()):
+        """Remove least recently used entries until the total size fits the quota"""
+        entries = sorted(self.entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.quota:
+                break
+            if key in keep:
+                continue
+            lock = self._lock(key)
+            try:
+                # entry is being used by another import right now, skip it
+                lock.acquire(timeout=0)
+            except LockError:
+                continue
+            try:
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            finally:
+                lock.release()
+            total -= size
+            self._update_stats('evictions')
+            logger.info(f'CSGHub snapshot cache: evicted {key} ({size} bytes)')
+
+    def _update_stats(self, counter, value=1):
+        lock = self._lock(STATS_FILE)
+        try:
+            self._acquire(lock, 10)
+            stats = self.get_stats()
+            stats[counter] = stats.get(counter, 0) + value
+            with open(os.path.join(self.root, STATS_FILE), 'w') as f:
+                json.dump(stats, f)
+        except Exception:
+            # stats must never break the import
+            logger.warning('CSGHub snapshot cache: failed to update stats', exc_info=True)
+        finally:
+            if lock.i_am_locking():
+                lock.release()
+
+    def get_stats(self):
+        try:
+            with open(os.path.join(self.root, STATS_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+
+class _FileLock:
+    """Exclusive lock on <path>.lock, flock() on Unix and msvcrt.locking() on Windows"""
+
+    poll_interval = 0.1
+
+    def __init__(self, path):
+        self.path = path + '.lock'
+        self._fd = None
+
+    def acquire(self, timeout=None):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                _lock_fd(fd)
+                self._fd = fd
+                return
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise LockTimeout(f'Timeout waiting to acquire lock for {self.path}')
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        fd, self._fd = self._fd, None
+        try:
+            _unlock_fd(fd)
+        finally:
+            os.close(fd)
+
+    def i_am_locking(self):
+        return self._fd is not None
+
+
+def _lock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+
+
+def _unlock_fd(fd):
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+def _folder_size(path):
+    total = 0
+    for root, _dirs, files in os.walk(path):
+        for filename in files:
+            file_path = os.path.join(root, filename)
+            if not os.path.islink(file_path):
+                total += os.path.getsize(file_path)
+    return total
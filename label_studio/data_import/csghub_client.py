@@ -0,0 +1,213 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CSGHUB_ENDPOINT = 'http://net-power.9free.com.cn:58120'
+
+
+class CSGHubClient:
+    """Client for CSGHub API used by the data import proxy endpoints
+
+    * all requests go through one pooled requests.Session, so TCP/TLS connections are reused
+    * list endpoints are fetched page by page and merged, the caller always gets the full list
+    * responses are cached per user (authorization) for `ttl` seconds; after that the stale value is
+      returned for `stale_ttl` more seconds while it's refreshed in background
+    * concurrent identical requests are coalesced into one upstream call
+    """
+
+    def __init__(
+        self,
+        endpoint,
+        timeout=None,
+        pool_size=None,
+        page_size=None,
+        max_pages=None,
+        ttl=None,
+        stale_ttl=None,
+        max_entries=None,
+    ):
+        self.endpoint = endpoint.rstrip('/')
+        self.timeout = settings.CSGHUB_API_TIMEOUT if timeout is None else timeout
+        self.page_size = settings.CSGHUB_API_PAGE_SIZE if page_size is None else page_size
+        self.max_pages = settings.CSGHUB_API_MAX_PAGES if max_pages is None else max_pages
+        self.ttl = settings.CSGHUB_API_CACHE_TTL if ttl is None else ttl
+        self.stale_ttl = settings.CSGHUB_API_CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self.max_entries = settings.CSGHUB_API_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        pool_size = settings.CSGHUB_API_POOL_SIZE if pool_size is None else pool_size
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self._lock = threading.Lock()
+        self._cache = {}  # key => (timestamp, value)
+        self._inflight = {}  # key => Future
+        self._refresh_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='csghub-refresh')
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'coalesced': 0, 'requests': 0}
+
+    # ---------- API methods ----------
+
+    def user_datasets(self, user_name, authorization):
+        """Paths of datasets owned by the user"""
+        return self._cached(
+            ('user_datasets', user_name),
+            authorization,
+            lambda: _paths(self.get_all_pages(f'/api/v1/user/{user_name}/datasets', authorization), field='path'),
+        )
+
+    def organization_datasets(self, org_name, user_name, authorization):
+        """Paths of organization datasets visible for the user"""
+        return self._cached(
+            ('organization_datasets', org_name, user_name),
+            authorization,
+            lambda: _paths(
+                self.get_all_pages(
+                    f'/api/v1/organization/{org_name}/datasets', authorization, params={'current_user': user_name}
+                ),
+                field='path',
+            ),
+        )
+
+    def dataset_branches(self, repo_id, authorization):
+        """Branch names of the dataset"""
+        return self._cached(
+            ('dataset_branches', repo_id),
+            authorization,
+            lambda: _paths(self.get(f'/api/v1/datasets/{repo_id}/branches', authorization).get('data'), field='name'),
+        )
+
+    def user_info(self, user_name, authorization):
+        """User profile with orgs and namespaces"""
+        return self._cached(
+            ('user_info', user_name),
+            authorization,
+            lambda: self.get(f'/api/v1/user/{user_name}', authorization, user_token=True).get('data') or {},
+        )
+
+    # ---------- HTTP ----------
+
+    def get(self, path, authorization, params=None, user_token=False):
+        headers = {'Authorization': authorization}
+        if user_token:
+            headers['User-Token'] = authorization
+        with self._lock:
+            self.stats['requests'] += 1
+        resp = self.session.get(self.endpoint + path, headers=headers, params=params, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.json()
+
+    def get_all_pages(self, path, authorization, params=None):
+        """Fetch all pages of a list endpoint and merge their `data` items"""
+        items = []
+        for page in range(1, self.max_pages + 1):
+            data = self.get(path, authorization, params={**(params or {}), 'per': self.page_size, 'page': page})
+            page_items = data.get('data') or []
+            items.extend(page_items)
+            total = data.get('total')
+            if len(page_items) < self.page_size or (total is not None and len(items) >= total):
+                return items
+        logger.warning(f'CSGHub API {path}: stopped after {self.max_pages} pages, the list may be incomplete')
+        return items
+
+    # ---------- cache ----------
+
+    def _cached(self, name, authorization, fetch):
+        if self.ttl <= 0:
+            return fetch()
+
+        # the cache is per user, the token itself is not kept in memory as a key
+        key = name + (hashlib.sha256(authorization.encode()).hexdigest(),)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self.stats['hits'] += 1
+                    return entry[1]
+                if age < self.ttl + self.stale_ttl:
+                    self.stats['stale_hits'] += 1
+                    if key not in self._inflight:
+                        self._refresh_executor.submit(self._fetch_coalesced, key, fetch, True)
+                    return entry[1]
+            self.stats['misses'] += 1
+        return self._fetch_coalesced(key, fetch)
+
+    def _fetch_coalesced(self, key, fetch, background=False):
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not owner:
+            return future.result()
+
+        try:
+            value = fetch()
+        except Exception as exc:
+            future.set_exception(exc)
+            if background:
+                logger.warning(f'CSGHub API: background refresh of {key[:-1]} failed', exc_info=True)
+                return None
+            raise
+        else:
+            future.set_result(value)
+            with self._lock:
+                self._store(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _store(self, key, value):
+        if len(self._cache) >= self.max_entries:
+            now = time.monotonic()
+            expired = [k for k, (ts, _) in self._cache.items() if now - ts >= self.ttl + self.stale_ttl]
+            for k in expired:
+                del self._cache[k]
+            if len(self._cache) >= self.max_entries:
+                # drop the oldest entry, dicts keep insertion order
+                self._cache.pop(next(iter(self._cache)))
+        self._cache.pop(key, None)
+        self._cache[key] = (time.monotonic(), value)
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+def _paths(items, field):
+    return [item.get(field, '') for item in (items or []) if item and item.get(field)]
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_csghub_endpoint():
+    return os.environ.get('CSGHUB_ENDPOINT', DEFAULT_CSGHUB_ENDPOINT)
+
+
+def get_csghub_client(endpoint=None):
+    """Shared client per endpoint, so the connection pool and cache live for the whole process"""
+    endpoint = (endpoint or get_csghub_endpoint()).rstrip('/')
+    with _clients_lock:
+        client = _clients.get(endpoint)
+        if client is None:
+            client = _clients[endpoint] = CSGHubClient(endpoint)
+        return client
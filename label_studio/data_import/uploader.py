@@ -16,11 +16,14 @@ except:  # noqa: E722
 from core.utils.common import timeit
 from core.utils.io import ssrf_safe_get
 from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from rest_framework.exceptions import ValidationError
 from urllib.parse import parse_qs
 
-from .models import FileUpload
+from .csghub_cache import CSGHubSnapshotCache
+from .models import FileUpload, upload_name_generator
 
 logger = logging.getLogger(__name__)
 csv.field_size_limit(131072 * 10)
@@ -139,66 +142,146 @@ def _clear_folder(folder_path):
             logger.warning("clear_folder: %s %s", item_path, e)
 
 
-def tasks_from_url(file_upload_ids, project, user, url, could_be_tasks_list):
-    """Download file using URL and read tasks from it. 支持 CSGHub：url 为 dataset=xxx&datasetBranches=yyy 时从 CSGHub 下载。"""
-    if 'dataset=' in url and 'datasetBranches=' in url:
-        try:
-            from pycsghub.snapshot_download import snapshot_download
-        except ImportError:
-            raise ValidationError('CSGHub 导入需要安装 pycsghub: pip install csghub-sdk')
-        parsed = parse_qs(url)
-        dataset = (parsed.get('dataset') or [''])[0]
-        dataset_branches = (parsed.get('datasetBranches') or [''])[0]
-        if not dataset or not dataset_branches:
-            raise ValidationError('CSGHub 导入缺少 dataset 或 datasetBranches')
-        project.dataset = dataset
-        project.datasetBranches = dataset_branches
-        project.save(update_fields=['dataset', 'datasetBranches'])
-        token = getattr(user, 'user_token', None) or ''
-        endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
-        if not endpoint:
-            raise ValidationError('未配置 CSGHUB_ENDPOINT')
+def is_csghub_url(url):
+    """CSGHub 数据集导入的 url 格式为 dataset=xxx&datasetBranches=yyy"""
+    return 'dataset=' in url and 'datasetBranches=' in url
+
+
+def create_file_upload_in_place(user, project, file_path, filename, keep_source=False):
+    """Register already downloaded file as FileUpload without reading it into memory.
+
+    For the local file system storage the file is moved into the upload directory
+    (or hard-linked if keep_source=True, e.g. when it belongs to the shared snapshot cache),
+    other storages receive the file as a stream and save it by chunks.
+    """
+    instance = FileUpload(user=user, project=project)
+    storage = instance.file.storage
+    _, ext = os.path.splitext(filename)
+    svg_cleanup = settings.SVG_SECURITY_CLEANUP and ext.lower() == '.svg'
+
+    if isinstance(storage, FileSystemStorage) and not svg_cleanup:
+        name = upload_name_generator(instance, filename)
+        target_path = storage.path(name)
+        if keep_source:
+            try:
+                os.link(file_path, target_path)
+            except OSError:
+                # hard links are not supported or the cache is on another device
+                shutil.copyfile(file_path, target_path)
+        else:
+            shutil.move(file_path, target_path)
+        instance.file.name = name
+        instance.save()
+        return instance
+
+    with open(file_path, 'rb') as f:
+        return create_file_upload(user, project, File(f, name=filename))
+
+
+def _register_downloaded_files(user, project, folder, file_upload_ids, could_be_tasks_list, keep_source=False):
+    for root, _dirs, files in os.walk(folder):
+        for filename in files:
+            if not filename.strip():
+                continue
+            file_path = os.path.join(root, filename)
+            if not os.path.isfile(file_path):
+                continue
+            _, ext = os.path.splitext(filename)
+            if ext.lower() not in settings.SUPPORTED_EXTENSIONS:
+                continue
+            relative_path = os.path.relpath(file_path, folder)
+            sanitized_name = relative_path.replace('/', '_').replace('\\', '_').replace(':', '-')
+            if not sanitized_name.strip():
+                sanitized_name = f"auto-file-{uuid.uuid4().hex[:10]}"
+            file_upload = create_file_upload_in_place(user, project, file_path, sanitized_name, keep_source)
+            if file_upload.format_could_be_tasks_list:
+                could_be_tasks_list = True
+            file_upload_ids.append(file_upload.id)
+    return file_upload_ids, could_be_tasks_list
+
+
+def csghub_file_uploads_from_url(file_upload_ids, project, user, url, could_be_tasks_list):
+    """从 CSGHub 下载数据集，并将下载的文件原地登记为 FileUpload（不在内存中读取和复制文件内容）"""
+    try:
+        from pycsghub.snapshot_download import snapshot_download
+    except ImportError:
+        raise ValidationError('CSGHub 导入需要安装 pycsghub: pip install csghub-sdk')
+    parsed = parse_qs(url)
+    dataset = (parsed.get('dataset') or [''])[0]
+    dataset_branches = (parsed.get('datasetBranches') or [''])[0]
+    if not dataset or not dataset_branches:
+        raise ValidationError('CSGHub 导入缺少 dataset 或 datasetBranches')
+    project.dataset = dataset
+    project.datasetBranches = dataset_branches
+    project.save(update_fields=['dataset', 'datasetBranches'])
+    token = getattr(user, 'user_token', None) or ''
+    endpoint = os.environ.get('CSGHUB_ENDPOINT', 'http://net-power.9free.com.cn:58120')
+    if not endpoint:
+        raise ValidationError('未配置 CSGHUB_ENDPOINT')
+    endpoint = endpoint.rstrip('/')
+
+    def download(cache_dir, revision=dataset_branches):
+        snapshot_download(
+            dataset, repo_type='dataset', cache_dir=cache_dir,
+            endpoint=endpoint, token=token, revision=revision,
+        )
+
+    if settings.CSGHUB_SNAPSHOT_CACHE_ENABLED:
+        # 共享快照缓存：同一数据集、分支和 commit 只下载一次，多个项目复用同一份文件。
+        # 按 commit sha 下载，而不是按分支：分支在获取 sha 之后可能前进，缓存条目内容必须与 key 一致
+        commit = _csghub_dataset_commit(dataset, dataset_branches, endpoint, token)
+        cache = CSGHubSnapshotCache()
+        key = cache.make_key(endpoint, dataset, dataset_branches, commit)
+        with cache.snapshot(key, lambda cache_dir: download(cache_dir, revision=commit)) as snapshot_folder:
+            file_upload_ids, could_be_tasks_list = _register_downloaded_files(
+                user, project, snapshot_folder, file_upload_ids, could_be_tasks_list, keep_source=True
+            )
+    else:
         # 按项目 id 隔离下载目录，避免多个项目并发导入时缓存位置冲突；
         # 下载前清空该项目目录，防止上一次导入的旧文件残留。
         local_folder = os.path.join(os.path.dirname(__file__), 'Downloads', str(project.id))
         os.makedirs(local_folder, exist_ok=True)
         _clear_folder(local_folder)
         try:
-            snapshot_download(
-                dataset, repo_type='dataset', cache_dir=local_folder,
-                endpoint=endpoint.rstrip('/'), token=token, revision=dataset_branches,
+            download(local_folder)
+            file_upload_ids, could_be_tasks_list = _register_downloaded_files(
+                user, project, local_folder, file_upload_ids, could_be_tasks_list
             )
         finally:
-            pass
-        for root, _dirs, files in os.walk(local_folder):
-            for filename in files:
-                if not filename.strip():
-                    continue
-                file_path = os.path.join(root, filename)
-                if not os.path.isfile(file_path):
-                    continue
-                _, ext = os.path.splitext(filename)
-                if ext.lower() not in settings.SUPPORTED_EXTENSIONS:
-                    continue
-                with open(file_path, 'rb') as f:
-                    file_content = f.read()
-                relative_path = os.path.relpath(file_path, local_folder)
-                sanitized_name = relative_path.replace('/', '_').replace('\\', '_').replace(':', '-')
-                if not sanitized_name.strip():
-                    sanitized_name = f"auto-file-{uuid.uuid4().hex[:10]}"
-                file_upload = create_file_upload(user, project, SimpleUploadedFile(sanitized_name, file_content))
-                if file_upload.format_could_be_tasks_list:
-                    could_be_tasks_list = True
-                file_upload_ids.append(file_upload.id)
-        # 数据集中所有文件都因扩展名不受支持被跳过：给出明确、可被前端识别的错误，
-        # 而不是笼统的 "No tasks added"。
-        if not file_upload_ids:
-            raise ValidationError(
-                'NoSupportedFilesToAnnotate: no files with a supported extension were found in the '
-                'dataset; all files were skipped'
-            )
+            # 文件已移动到上传目录，这里只剩下 pycsghub 的缓存元数据
+            _clear_folder(local_folder)
+    # 数据集中所有文件都因扩展名不受支持被跳过：给出明确、可被前端识别的错误，
+    # 而不是笼统的 "No tasks added"。
+    if not file_upload_ids:
+        raise ValidationError(
+            'NoSupportedFilesToAnnotate: no files with a supported extension were found in the '
+            'dataset; all files were skipped'
+        )
+    return file_upload_ids, could_be_tasks_list
+
+
+def _csghub_dataset_commit(dataset, revision, endpoint, token):
+    """获取分支当前的 commit sha，作为快照缓存 key 的一部分"""
+    from pycsghub.utils import dataset_info, get_endpoint
+
+    try:
+        info = dataset_info(
+            dataset, revision=revision, token=token, endpoint=get_endpoint(endpoint=endpoint), timeout=30
+        )
+    except Exception as e:
+        raise ValidationError(f'CSGHub 获取数据集信息失败: {e}')
+    if not info.sha:
+        raise ValidationError('CSGHub 数据集信息中缺少 commit sha')
+    return info.sha
+
+
+def tasks_from_url(file_upload_ids, project, user, url, could_be_tasks_list):
+    """Download file using URL and read tasks from it. 支持 CSGHub：url 为 dataset=xxx&datasetBranches=yyy 时从 CSGHub 下载。"""
+    if is_csghub_url(url):
+        file_upload_ids, could_be_tasks_list = csghub_file_uploads_from_url(
+            file_upload_ids, project, user, url, could_be_tasks_list
+        )
         tasks, found_formats, data_keys = FileUpload.load_tasks_from_uploaded_files(project, file_upload_ids)
-        _clear_folder(local_folder)
         return data_keys, found_formats, tasks, file_upload_ids, could_be_tasks_list
 
     try:
@@ -348,6 +431,27 @@ def load_tasks_for_async_import_streaming(project_import, user, batch_size=1000)
             check_max_task_number(batch_tasks)
             yield batch_tasks, file_upload_ids, batch_formats, list(batch_data_keys)
 
+    elif project_import.url and is_csghub_url(project_import.url):
+        # CSGHub 数据集：文件原地登记为 FileUpload，然后像普通上传文件一样按批流式读取任务
+        file_upload_ids, could_be_tasks_list = csghub_file_uploads_from_url(
+            [], project_import.project, user, project_import.url, False
+        )
+        if could_be_tasks_list:
+            project_import.could_be_tasks_list = True
+            project_import.save(update_fields=['could_be_tasks_list'])
+        all_file_upload_ids = file_upload_ids.copy()
+
+        for batch_tasks, batch_formats, batch_data_keys in FileUpload.load_tasks_from_uploaded_files_streaming(
+            project_import.project, file_upload_ids, batch_size=batch_size
+        ):
+            all_found_formats.update(batch_formats)
+            all_data_keys.update(batch_data_keys)
+            if not batch_tasks:
+                continue
+
+            check_max_task_number(batch_tasks)
+            yield batch_tasks, file_upload_ids, batch_formats, list(batch_data_keys)
+
     elif project_import.url:
         # For URL imports, we still need to load everything at once
         # since we don't have streaming support for URL-based imports yet
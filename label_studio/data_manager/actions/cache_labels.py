@@ -54,8 +54,9 @@ def cache_labels_job(project, queryset, **kwargs):
         # no counters
         else:
             task.data[column_name] = ', '.join(sorted(list(set(task_labels))))
+        task.data_hash = Task.get_data_hash(task.data, project)
 
-    Task.objects.bulk_update(tasks, fields=['data'], batch_size=1000)
+    Task.objects.bulk_update(tasks, fields=['data', 'data_hash'], batch_size=1000)
     first_task = Task.objects.get(id=queryset.first().id)
     project.summary.update_data_columns([first_task])
     return {'response_code': 200, 'detail': f'Updated {len(tasks)} tasks'}
@@ -10,6 +10,7 @@ from core.utils.db import fast_first
 from data_manager.actions import DataManagerAction
 from data_manager.functions import DataManagerException
 from django.conf import settings
+from ml.functions import count_annotations_for_training
 from rest_framework.exceptions import ValidationError
 from tasks.models import Annotation, Task
 from tasks.serializers import TaskSerializerBulk
@@ -51,6 +52,7 @@ def propagate_annotations(project, queryset, **kwargs):
     TaskSerializerBulk.post_process_annotations(user, db_annotations, 'propagated_annotation')
     # Update counters for tasks and is_labeled. It should be a single operation as counters affect bulk is_labeled update
     project.update_tasks_counters_and_is_labeled(tasks_queryset=Task.objects.filter(id__in=tasks))
+    count_annotations_for_training(project, len(db_annotations))
     return {
         'response_code': 200,
         'detail': f'Created {len(db_annotations)} annotations',
@@ -170,7 +172,7 @@ def add_data_field(project, queryset, **kwargs):
     value = cast[value_type](value)
 
     if value_type == 'Expression':
-        add_expression(queryset, size, value, value_name)
+        add_expression(project, queryset, size, value, value_name)
 
     else:
 
@@ -179,7 +181,8 @@ def add_data_field(project, queryset, **kwargs):
             tasks = list(queryset.only('data'))
             for task in tasks:
                 task.data[value_name] = value
-            Task.objects.bulk_update(tasks, fields=['data'], batch_size=1000)
+                task.data_hash = Task.get_data_hash(task.data, project)
+            Task.objects.bulk_update(tasks, fields=['data', 'data_hash'], batch_size=1000)
 
         # postgres and other DB
         else:
@@ -189,7 +192,9 @@ def add_data_field(project, queryset, **kwargs):
                     Value([value_name]),
                     Value(value, JSONField()),
                     function='jsonb_set',
-                )
+                ),
+                # hashes are recomputed by the next remove duplicates run
+                data_hash=None,
             )
 
     project.summary.update_data_columns([queryset.first()])
@@ -214,7 +219,7 @@ add_data_field_examples = (
 )
 
 
-def add_expression(queryset, size, value, value_name):
+def add_expression(project, queryset, size, value, value_name):
     # simple parsing
     command, args = value.split('(')
     args = process_arrays(args)
@@ -269,7 +274,9 @@ def add_expression(queryset, size, value, value_name):
     else:
         raise ValidationError('Undefined expression, you can use: ' + add_data_field_examples)
 
-    Task.objects.bulk_update(tasks, fields=['data'], batch_size=1000)
+    for task in tasks:
+        task.data_hash = Task.get_data_hash(task.data, project)
+    Task.objects.bulk_update(tasks, fields=['data', 'data_hash'], batch_size=1000)
 
 
 def add_data_field_form(user, project):
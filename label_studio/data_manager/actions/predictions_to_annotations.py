@@ -5,6 +5,7 @@ import logging
 from core.permissions import AllPermissions
 from data_manager.actions import DataManagerAction
 from django.utils.timezone import now
+from ml.functions import count_annotations_for_training
 from tasks.models import Annotation, Prediction, Task
 from tasks.serializers import TaskSerializerBulk
 from webhooks.models import WebhookAction
@@ -59,6 +60,8 @@ def predictions_to_annotations(project, queryset, **kwargs):
         )
         # Update counters for tasks and is_labeled. It should be a single operation as counters affect bulk is_labeled update
         project.update_tasks_counters_and_is_labeled(Task.objects.filter(id__in=tasks_ids))
+        # bulk_create doesn't send post_save, so training triggers are counted here
+        count_annotations_for_training(project, len(db_annotations))
 
         try:
             from stats.functions.stats import recalculate_stats_async_or_sync
@@ -4,12 +4,12 @@
 import logging
 from collections import defaultdict
 
-import ujson as json
-from core.label_config import replace_task_data_undefined_with_config_field
 from core.permissions import AllPermissions
 from core.redis import start_job_async_or_sync
 from data_manager.actions import DataManagerAction
 from data_manager.actions.basic import delete_tasks
+from django.conf import settings
+from django.db.models import Count
 from io_storages.azure_blob.models import AzureBlobImportStorageLink
 from io_storages.gcs.models import GCSImportStorageLink
 from io_storages.localfiles.models import LocalFilesImportStorageLink
@@ -38,10 +38,10 @@ def remove_duplicates(project, queryset, **kwargs):
 
 def remove_duplicates_job(project, queryset, **kwargs):
     """Job for start_job_async_or_sync"""
-    duplicates = find_duplicated_tasks_by_data(project, queryset)
-    restore_storage_links_for_duplicated_tasks(duplicates)
-    move_annotations(duplicates)
-    remove_duplicated_tasks(duplicates, project, queryset)
+    for duplicates in iter_duplicated_tasks_by_data(project, queryset):
+        restore_storage_links_for_duplicated_tasks(duplicates)
+        move_annotations(duplicates)
+        remove_duplicated_tasks(duplicates, project, queryset)
 
     # totally update tasks counters
     project._update_tasks_counters_and_task_states(
@@ -187,8 +187,28 @@ def restore_storage_links_for_duplicated_tasks(duplicates) -> None:
     logger.info(f'Restored {total_restored_links} storage links for duplicated tasks')
 
 
-def find_duplicated_tasks_by_data(project, queryset):
-    """Find duplicated tasks by `task.data` and return them as a dict"""
+def backfill_data_hashes(project, queryset, batch_size=None):
+    """Compute Task.data_hash for tasks which were created before it was stored"""
+    batch_size = batch_size or settings.BATCH_SIZE
+    tasks = Task.objects.filter(id__in=queryset.values('id'), data_hash__isnull=True).order_by('id')
+    total, last_id = 0, 0
+    while batch := list(tasks.filter(id__gt=last_id).only('id', 'data')[:batch_size]):
+        for task in batch:
+            task.data_hash = Task.get_data_hash(task.data, project)
+        Task.objects.bulk_update(batch, ['data_hash'], batch_size=batch_size)
+        total += len(batch)
+        last_id = batch[-1].id
+    if total:
+        logger.info(f'Backfilled data hashes for {total} tasks')
+
+
+def iter_duplicated_tasks_by_data(project, queryset, batch_size=None):
+    """Find duplicated tasks by `task.data` and yield them as dicts {data_hash: [task, ...]}
+
+    Tasks are grouped by Task.data_hash in the database, every dict holds at most batch_size hashes
+    """
+    batch_size = batch_size or settings.BATCH_SIZE
+    backfill_data_hashes(project, queryset, batch_size)
 
     # get io_storage_* links for tasks, we need to copy them
     storages = []
@@ -196,21 +216,37 @@ def find_duplicated_tasks_by_data(project, queryset):
         if field.startswith('io_storages_'):
             storages += [field]
 
-    groups = defaultdict(list)
-    tasks = list(queryset.values('data', 'id', 'total_annotations', 'cancelled_annotations', *storages))
-    logger.info(f'Retrieved {len(tasks)} tasks from queryset')
+    tasks = Task.objects.filter(id__in=queryset.values('id'))
+    hashes = (
+        tasks.order_by()
+        .values('data_hash')
+        .annotate(count=Count('id'))
+        .filter(count__gt=1)
+        .order_by('data_hash')
+        .values_list('data_hash', flat=True)
+    )
+    total, last_hash = 0, ''
+    while batch := list(hashes.filter(data_hash__gt=last_hash)[:batch_size]):
+        duplicates = defaultdict(list)
+        for task in (
+            tasks.filter(data_hash__in=batch)
+            .order_by('id')
+            .values('data_hash', 'id', 'total_annotations', 'cancelled_annotations', *storages)
+        ):
+            duplicates[task['data_hash']].append(task)
+
+        total += len(duplicates)
+        last_hash = batch[-1]
+        yield duplicates
 
-    for task in list(tasks):
-        replace_task_data_undefined_with_config_field(task['data'], project)
-        task['data'] = json.dumps(task['data'])
-        groups[task['data']].append(task)
+    logger.info(f'Found {total} groups of duplicated tasks')
 
-    # make groups of duplicated ids for info print
-    duplicates = {d: groups[d] for d in groups if len(groups[d]) > 1}
-    info = {d: [task['id'] for task in duplicates[d]] for d in duplicates}
 
-    logger.info(f'Found {len(duplicates)} duplicated tasks')
-    logger.info(f'Duplicated tasks: {info}')
+def find_duplicated_tasks_by_data(project, queryset):
+    """Find duplicated tasks by `task.data` and return them as a dict"""
+    duplicates = {}
+    for batch in iter_duplicated_tasks_by_data(project, queryset):
+        duplicates.update(batch)
     return duplicates
 
 
@@ -1,14 +1,23 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
+import base64
+import json
 import logging
 
 from asgiref.sync import async_to_sync, sync_to_async
 from core.feature_flags import flag_set
 from core.permissions import ViewClassPermission, all_permissions
+from core.redis import job_queue_available
 from core.utils.common import int_from_request, load_func
 from core.utils.params import bool_from_request
 from data_manager.actions import get_action_form, get_all_actions, perform_action
-from data_manager.functions import evaluate_predictions, get_prepare_params
+from data_manager.functions import (
+    evaluate_predictions,
+    get_prepare_params,
+    get_tasks_totals,
+    prefetch_predictions,
+    prefetch_project_predictions,
+)
 from data_manager.managers import get_fields_for_evaluation
 from data_manager.models import View
 from data_manager.prepare_params import filters_schema, ordering_schema, prepare_params_schema
@@ -19,7 +28,8 @@ from data_manager.serializers import (
     ViewSerializer,
 )
 from django.conf import settings
-from django.db.models import Sum
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, OrderBy, Q, Sum
 from django.db.models.functions import Coalesce
 from django.utils.decorators import method_decorator
 from django_filters.rest_framework import DjangoFilterBackend
@@ -273,6 +283,11 @@ class TaskPagination(PageNumberPagination):
             return self.paginate_totals_queryset(queryset, request, view)
         return self.sync_paginate_queryset(queryset, request, view)
 
+    def get_lookahead_ids(self, queryset, size):
+        """Return ids of `size` tasks following the current page"""
+        start = self.page.end_index()
+        return list(queryset.values_list('id', flat=True)[start : start + size])
+
     def get_paginated_response_schema(self, schema):
         return {
             'type': 'object',
@@ -308,6 +323,105 @@ class TaskPagination(PageNumberPagination):
         )
 
 
+class TaskCursorPagination(TaskPagination):
+    """Keyset pagination by the view ordering column and task id, enabled by `cursor` query param.
+
+    Pages are selected by `WHERE (column, id) > cursor` instead of OFFSET, and totals are cached,
+    so every page costs the same as the first one.
+    """
+
+    cursor_query_param = 'cursor'
+
+    @staticmethod
+    def get_ordering(queryset):
+        """Return (column name, descending) of the prepared queryset ordering"""
+        order_by = queryset.query.order_by
+        if not order_by:
+            return 'id', False
+        ordering = order_by[0]
+        if isinstance(ordering, str):
+            return ordering.lstrip('-'), ordering.startswith('-')
+        if isinstance(ordering, OrderBy) and isinstance(ordering.expression, F):
+            return ordering.expression.name, ordering.descending
+        raise ValidationError('Ordering is not supported by cursor pagination')
+
+    @staticmethod
+    def encode_cursor(value, task_id):
+        data = DjangoJSONEncoder().encode([value, task_id])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        try:
+            value, task_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return value, int(task_id)
+        except Exception:
+            raise ValidationError('Invalid cursor')
+
+    def get_keyset_filter(self, column, descending, value, task_id):
+        if column == 'id':
+            return Q(id__lt=task_id) if descending else Q(id__gt=task_id)
+        # nulls are the last ones in both directions
+        if value is None:
+            return Q(**{f'{column}__isnull': True, 'id__gt': task_id})
+        lookup = 'lt' if descending else 'gt'
+        return (
+            Q(**{f'{column}__{lookup}': value})
+            | Q(**{column: value, 'id__gt': task_id})
+            | Q(**{f'{column}__isnull': True})
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        column, descending = self.get_ordering(queryset)
+        if column != 'id':
+            queryset = queryset.order_by(*queryset.query.order_by[:1], 'id')
+
+        totals = get_tasks_totals(view.prepare_params, queryset, request.user)
+        self.total = totals['total']
+        self.total_annotations = totals['total_annotations']
+        self.total_predictions = totals['total_predictions']
+
+        self.ordered_queryset, self.column, self.descending = queryset, column, descending
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.get_keyset_filter(column, descending, *self.decode_cursor(cursor)))
+
+        page = list(queryset[: page_size + 1])
+        self.next_cursor = None
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(getattr(page[-1], column), page[-1].id)
+        return page
+
+    def get_lookahead_ids(self, queryset, size):
+        if not self.next_cursor:
+            return []
+        keyset = self.get_keyset_filter(self.column, self.descending, *self.decode_cursor(self.next_cursor))
+        return list(self.ordered_queryset.filter(keyset).values_list('id', flat=True)[:size])
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['next_cursor'] = {
+            'type': 'string',
+            'nullable': True,
+            'description': 'Cursor of the next page, null for the last page',
+        }
+        return response_schema
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                'total_annotations': self.total_annotations,
+                'total_predictions': self.total_predictions,
+                'total': self.total,
+                'next_cursor': self.next_cursor,
+                'tasks': data,
+            }
+        )
+
+
 class TaskListAPI(generics.ListCreateAPIView):
     task_serializer_class = DataManagerTaskSerializer
     permission_required = ViewClassPermission(
@@ -319,6 +433,13 @@ class TaskListAPI(generics.ListCreateAPIView):
     )
     pagination_class = TaskPagination
 
+    @property
+    def paginator(self):
+        # cursor pagination is opt-in: ?cursor= for the first page, then `next_cursor` from the response
+        if not hasattr(self, '_paginator') and TaskCursorPagination.cursor_query_param in self.request.GET:
+            self._paginator = TaskCursorPagination()
+        return super().paginator
+
     def get_task_serializer_context(self, request, project, queryset):
         all_fields = request.GET.get('fields', None) == 'all'  # false by default
 
@@ -364,6 +485,7 @@ class TaskListAPI(generics.ListCreateAPIView):
             return Response({'detail': 'Neither project nor view id specified'}, status=404)
         # get prepare params (from view or from payload directly)
         prepare_params = get_prepare_params(request, project)
+        self.prepare_params = prepare_params
         queryset = self.get_task_queryset(request, prepare_params)
 
         # paginated tasks
@@ -394,20 +516,28 @@ class TaskListAPI(generics.ListCreateAPIView):
 
             # retrieve ML predictions if tasks don't have them
             if not review and project.evaluate_predictions_automatically:
-                # TODO MM TODO this needs a discussion, because I'd expect
-                # people to retrieve manually instead on DM load, plus it
-                # will slow down initial DM load
-                # if project.retrieve_predictions_automatically is deprecated now and no longer used
-                tasks_for_predictions = Task.objects.filter(id__in=ids, predictions__isnull=True)
-                evaluate_predictions(tasks_for_predictions)
-                [tasks_by_ids[_id].refresh_from_db() for _id in ids]
+                if job_queue_available():
+                    # in background, they are shown on the next poll, the following page is prefetched as well
+                    lookahead_ids = self.paginator.get_lookahead_ids(
+                        queryset, settings.DATA_MANAGER_PREDICTIONS_PREFETCH_LOOKAHEAD
+                    )
+                    prefetch_predictions(project, ids + lookahead_ids)
+                else:
+                    tasks_for_predictions = Task.objects.filter(id__in=ids, predictions__isnull=True)
+                    evaluate_predictions(tasks_for_predictions)
+                    [tasks_by_ids[_id].refresh_from_db() for _id in ids]
 
             context = self.get_task_serializer_context(self.request, project, tasks)
+            if context.get('resolve_uri'):
+                context['file_upload_urls'] = Task.get_file_upload_urls(page, project)
             serializer = self.task_serializer_class(page, many=True, context=context)
             return self.get_paginated_response(serializer.data)
         # all tasks
         if project.evaluate_predictions_automatically:
-            evaluate_predictions(queryset.filter(predictions__isnull=True))
+            if job_queue_available():
+                prefetch_project_predictions(project)
+            else:
+                evaluate_predictions(queryset.filter(predictions__isnull=True))
         queryset = Task.prepared.annotate_queryset(
             queryset, fields_for_evaluation=fields_for_evaluation, all_fields=all_fields, request=request
         )
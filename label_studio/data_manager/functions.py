@@ -1,16 +1,22 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
+import hashlib
 import logging
+import time
 from collections import OrderedDict
 from typing import Any, Iterable, Tuple
 from urllib.parse import unquote
 
 import ujson as json
 from core.feature_flags import flag_set
+from core.redis import start_job_async_or_sync
 from core.utils.common import int_from_request
-from data_manager.models import View
+from data_manager.models import TaskColumns, View
 from data_manager.prepare_params import PrepareParams
 from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Sum
+from django.db.models.functions import Coalesce
 from rest_framework.generics import get_object_or_404
 from tasks.models import Task
 
@@ -332,6 +338,84 @@ def get_prepared_queryset(request, project):
     return queryset
 
 
+def calculate_tasks_totals(queryset):
+    """Count tasks, annotations and predictions of the filtered tasks in one query"""
+    return (
+        queryset.order_by()
+        .values('id')
+        .aggregate(
+            total=Count('id'),
+            total_annotations=Coalesce(Sum('total_annotations'), 0),
+            total_predictions=Coalesce(Sum('total_predictions'), 0),
+        )
+    )
+
+
+def get_tasks_totals(prepare_params, queryset, user):
+    """Cached totals for the tasks API, stale totals are returned while one of the requests refreshes them.
+
+    The task queryset can depend on the user (custom filter expressions, get_task_queryset() by role),
+    so totals are cached per user and always calculated on the queryset of the request.
+    """
+    params_json = prepare_params.model_dump_json(include={'project', 'filters', 'selectedItems'})
+    key = f'data_manager:tasks_totals:{user.id}:' + hashlib.md5(params_json.encode()).hexdigest()
+    totals = cache.get(key)
+    # only one refresh at a time for the same totals
+    if totals is None or (
+        time.time() - totals['updated_at'] > settings.TASK_API_TOTALS_CACHE_TTL
+        and cache.add(key + ':refresh', True, settings.TASK_API_TOTALS_CACHE_TTL)
+    ):
+        totals = {**calculate_tasks_totals(queryset), 'updated_at': time.time()}
+        cache.set(key, totals, settings.TASK_API_TOTALS_CACHE_STALE_TTL)
+        cache.delete(key + ':refresh')
+    return totals
+
+
+def calculate_task_columns(task_ids):
+    """Calculate materialized data manager columns with the same annotation functions the data manager uses"""
+    from data_manager.managers import MATERIALIZED_COLUMNS, get_annotations_map
+    from projects.models import Project
+
+    annotations_map = get_annotations_map()
+    rows = []
+    for project in Project.objects.filter(tasks__id__in=task_ids).distinct():
+        queryset = Task.objects.filter(project=project, id__in=task_ids)
+        queryset.project = project
+        queryset.request = None
+        for column in MATERIALIZED_COLUMNS:
+            queryset = annotations_map[column](queryset)
+        columns = [column for column in MATERIALIZED_COLUMNS if column in queryset.query.annotations]
+        for values in queryset.order_by().values('id', *columns):
+            rows.append(TaskColumns(task_id=values.pop('id'), **values))
+    return rows
+
+
+def update_task_columns(task_ids):
+    """Recalculate materialized data manager columns for tasks"""
+    from data_manager.managers import MATERIALIZED_COLUMNS
+
+    task_ids = list(task_ids)
+    for i in range(0, len(task_ids), settings.BATCH_SIZE):
+        rows = calculate_task_columns(task_ids[i : i + settings.BATCH_SIZE])
+        TaskColumns.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['task'],
+            update_fields=[*MATERIALIZED_COLUMNS, 'updated_at'],
+        )
+
+
+def rebuild_task_columns(project):
+    """Recalculate materialized data manager columns for all project tasks"""
+    task_ids = project.tasks.order_by('id').values_list('id', flat=True)
+    last_id, count = 0, 0
+    while ids := list(task_ids.filter(id__gt=last_id)[: settings.BATCH_SIZE]):
+        update_task_columns(ids)
+        last_id, count = ids[-1], count + len(ids)
+        logger.info(f'Materialized data manager columns: project_id={project.id} tasks={count}')
+    return count
+
+
 def evaluate_predictions(tasks):
     """
     Call the given ML backend to retrieve predictions with the task queryset as an input.
@@ -349,6 +433,52 @@ def evaluate_predictions(tasks):
         return backend.predict_tasks(tasks=tasks)
 
 
+def prefetch_predictions(project, task_ids):
+    """Retrieve ML predictions for tasks without them in a background job.
+
+    Every task is queued once per DATA_MANAGER_PREDICTIONS_PREFETCH_TTL, so concurrent requests for the same view
+    and repeated polls don't send the same tasks to ML backend again.
+    """
+    task_ids = Task.objects.filter(project=project, id__in=task_ids, predictions__isnull=True).values_list(
+        'id', flat=True
+    )
+    queued_ids = [
+        task_id
+        for task_id in task_ids.order_by('id').distinct()
+        if cache.add(
+            f'data_manager:predictions_prefetch:{task_id}', True, settings.DATA_MANAGER_PREDICTIONS_PREFETCH_TTL
+        )
+    ]
+    if queued_ids:
+        start_job_async_or_sync(prefetch_predictions_job, project.id, queued_ids, queue_name='low')
+    return queued_ids
+
+
+def prefetch_project_predictions(project):
+    """Retrieve ML predictions for all project tasks without them in one background job.
+
+    It's used by requests without pagination instead of sending every task id of the view to the job.
+    """
+    if not cache.add(
+        f'data_manager:predictions_prefetch:project:{project.id}', True, settings.DATA_MANAGER_PREDICTIONS_PREFETCH_TTL
+    ):
+        return False
+    start_job_async_or_sync(prefetch_predictions_job, project.id, None, queue_name='low')
+    return True
+
+
+def prefetch_predictions_job(project_id, task_ids, **kwargs):
+    """Retrieve predictions for tasks without them, task_ids=None means all project tasks"""
+    from projects.models import Project
+
+    tasks = Task.objects.filter(project_id=project_id, predictions__isnull=True)
+    if task_ids is not None:
+        tasks = tasks.filter(id__in=task_ids)
+    backend = Project.objects.get(id=project_id).ml_backend
+    if backend:
+        backend.predict_tasks(tasks=tasks.distinct())
+
+
 def filters_ordering_selected_items_exist(data):
     return data.get('filters') or data.get('ordering') or data.get('selectedItems')
 
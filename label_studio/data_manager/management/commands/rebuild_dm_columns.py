@@ -0,0 +1,24 @@
+import logging
+
+from data_manager.functions import rebuild_task_columns
+from django.core.management.base import BaseCommand
+from projects.models import Project
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized data manager columns (annotators, results, scores, completed_at) of project tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('projects', type=int, nargs='*', help='project ids, all projects if not specified')
+
+    def handle(self, *args, **options):
+        projects = Project.objects.order_by('id')
+        if options['projects']:
+            projects = projects.filter(id__in=options['projects'])
+
+        for project in projects:
+            logger.debug(f'Start rebuilding data manager columns for project {project.id}.')
+            count = rebuild_task_columns(project)
+            self.stdout.write(f'Project {project.id}: {count} tasks')
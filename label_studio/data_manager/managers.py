@@ -1,10 +1,13 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
+import hashlib
 import logging
 import re
+import threading
+from collections import OrderedDict
 from datetime import datetime
 from functools import reduce
-from typing import ClassVar
+from typing import ClassVar, Optional
 
 import ujson as json
 from core.feature_flags import flag_set
@@ -12,6 +15,8 @@ from core.utils.db import fast_first
 from data_manager.prepare_params import ConjunctionEnum
 from django.conf import settings
 from django.contrib.postgres.aggregates import ArrayAgg
+from django.contrib.postgres.fields import ArrayField
+from django.core.exceptions import FieldDoesNotExist, FieldError
 from django.db import models
 from django.db.models import (
     Aggregate,
@@ -268,12 +273,91 @@ def add_user_filter(enabled, key, _filter, filter_expressions):
         return 'continue'
 
 
-def apply_filters(queryset, filters, project, request):
-    if not filters:
-        return queryset
+# compiled filters: {(project_id, filters_hash, schema_version): (annotations, filter_lines) or None}
+_filter_plans: 'OrderedDict[tuple, Optional[tuple]]' = OrderedDict()
+_filter_plans_lock = threading.Lock()
+
 
-    # convert conjunction to orm statement
+def get_field_value_type(queryset, field_name, project):
+    """Resolve python type name of the field values from the schema, without queries to the database
+
+    Task data columns are resolved by ProjectSummary.data_column_types (columns imported before the types
+    were collected are checked on the first value), annotated columns by their output field and regular
+    fields by the model fields.
+    :return: 'list', 'str' or None if the type doesn't need special processing
+    """
+    if field_name.startswith('data__'):
+        column = field_name[len('data__') :]
+        summary = project.summary
+        data_column_types = summary.data_column_types or {}
+        if column in data_column_types or column not in (summary.all_data_columns or {}):
+            return data_column_types.get(column, 'str')
+        # tasks imported before data column types were collected
+        values = list(queryset.values_list(field_name, flat=True)[:1])
+        return type(values[0]).__name__ if values else 'str'
+
+    annotation = queryset.query.annotations.get(field_name)
+    if annotation is not None:
+        try:
+            field = annotation.output_field
+        except FieldError:
+            return None
+    else:
+        model, field = queryset.model, None
+        for part in field_name.split('__'):
+            if model is None:
+                return None
+            try:
+                field = model._meta.get_field(part)
+            except FieldDoesNotExist:
+                return None
+            model = field.related_model
+        if field.is_relation:
+            # related objects are filtered by ids
+            return None
+
+    if isinstance(field, ArrayField):
+        return 'list'
+    if isinstance(field, (models.CharField, models.TextField, models.FileField)):
+        return 'str'
+    return None
+
+
+def _filters_have_data_fields(filters):
+    for parent_filter in filters.items:
+        for _filter in (parent_filter, parent_filter.child_filter):
+            if _filter is not None and _filter.filter.startswith('filter:tasks:data.'):
+                return True
+    return False
+
+
+def _filter_plan_key(filters, project):
+    filters_hash = hashlib.md5(filters.model_dump_json().encode()).hexdigest()
+    schema_version = None
+    if _filters_have_data_fields(filters):
+        # data field names and types depend on the labeling config and imported task data
+        summary = project.summary
+        schema_version = hash(
+            (
+                project.label_config_hash,
+                json.dumps(summary.data_column_types, sort_keys=True),
+                json.dumps(summary.common_data_columns),
+            )
+        )
+    return project.id, filters_hash, schema_version
+
+
+def compile_filters(queryset, filters, project, request):
+    """Compile data manager filters to ORM expressions
+
+    :return: plan, cacheable; plan is (annotations, filter_lines) or None when no tasks can match
+    """
     custom_filter_expressions = load_func(settings.DATA_MANAGER_CUSTOM_FILTER_EXPRESSIONS)
+    preprocess_field_name = load_func(settings.PREPROCESS_FIELD_NAME)
+    preprocess_filter = load_func(settings.DATA_MANAGER_PREPROCESS_FILTER)
+    # custom expressions can depend on the request, don't share them between requests
+    cacheable = True
+    annotations = {}
 
     # combine child filters with their parent in the same filter expression
     filter_line_expressions: list[list[Q]] = []
@@ -289,11 +373,9 @@ def apply_filters(queryset, filters, project, request):
                 continue
 
             # django orm loop expression attached to column name
-            preprocess_field_name = load_func(settings.PREPROCESS_FIELD_NAME)
             field_name, _ = preprocess_field_name(_filter.filter, project)
 
             # filter pre-processing, value type conversion, etc..
-            preprocess_filter = load_func(settings.DATA_MANAGER_PREPROCESS_FILTER)
             _filter = preprocess_filter(_filter, field_name)
 
             # custom expressions for enterprise
@@ -306,6 +388,7 @@ def apply_filters(queryset, filters, project, request):
             )
             if filter_expression:
                 filter_expressions.append(filter_expression)
+                cacheable = False
                 continue
 
             # annotators
@@ -324,7 +407,7 @@ def apply_filters(queryset, filters, project, request):
             if field_name in ['annotations_results', 'predictions_results']:
                 result = add_result_filter(field_name, _filter, filter_expressions, project)
                 if result == 'exit':
-                    return queryset.none()
+                    return None, cacheable
                 elif result == 'continue':
                     continue
 
@@ -366,14 +449,8 @@ def apply_filters(queryset, filters, project, request):
             # annotate with cast to number if need
             if _filter.type == 'Number' and field_name.startswith('data__'):
                 json_field = field_name.replace('data__', '')
-                queryset = queryset.annotate(
-                    **{
-                        f'filter_{json_field.replace("$undefined$", "undefined")}': Cast(
-                            KeyTextTransform(json_field, 'data'), output_field=FloatField()
-                        )
-                    }
-                )
                 clean_field_name = f'filter_{json_field.replace("$undefined$", "undefined")}'
+                annotations[clean_field_name] = Cast(KeyTextTransform(json_field, 'data'), output_field=FloatField())
             else:
                 clean_field_name = field_name
 
@@ -386,11 +463,9 @@ def apply_filters(queryset, filters, project, request):
                 _filter.value = 0
 
             # get type of annotated field
-            value_type = 'str'
-            if queryset.exists():
-                value_type = type(queryset.values_list(field_name, flat=True)[0]).__name__
+            value_type = get_field_value_type(queryset, field_name, project)
 
-            if (value_type == 'list' or value_type == 'tuple') and 'equal' in _filter.operator:
+            if value_type == 'list' and 'equal' in _filter.operator:
                 raise ValidationError('Not supported filter type')
 
             # special case: for strings empty is "" or null=True
@@ -419,7 +494,7 @@ def apply_filters(queryset, filters, project, request):
                     re.compile(pattern=str(_filter.value))
                 except Exception as e:
                     logger.info('Incorrect regex for filter: %s: %s', _filter.value, str(e))
-                    return queryset.none()
+                    return None, cacheable
 
             # append operator
             field_name = f"{clean_field_name}{operators.get(_filter.operator, '')}"
@@ -480,6 +555,35 @@ def apply_filters(queryset, filters, project, request):
         filter_line_expressions.append(filter_expressions)
 
     resolved_filter_lines = [reduce(lambda x, y: x & y, fle) for fle in filter_line_expressions]
+    return (annotations, resolved_filter_lines), cacheable
+
+
+def apply_filters(queryset, filters, project, request):
+    if not filters:
+        return queryset
+
+    cache_size = settings.DATA_MANAGER_FILTER_PLAN_CACHE_SIZE
+    key = _filter_plan_key(filters, project) if cache_size else None
+    with _filter_plans_lock:
+        cached = key in _filter_plans
+        if cached:
+            _filter_plans.move_to_end(key)
+            plan = _filter_plans[key]
+
+    if not cached:
+        # filters are modified during compilation, keep the originals to match the cache key
+        plan, cacheable = compile_filters(queryset, filters.model_copy(deep=True), project, request)
+        if cacheable and key is not None:
+            with _filter_plans_lock:
+                _filter_plans[key] = plan
+                while len(_filter_plans) > cache_size:
+                    _filter_plans.popitem(last=False)
+
+    if plan is None:
+        return queryset.none()
+    annotations, resolved_filter_lines = plan
+    if annotations:
+        queryset = queryset.annotate(**annotations)
 
     """WARNING: Stringifying filter_expressions will evaluate the (sub)queryset.
         Do not use a log in the following manner:
@@ -777,6 +881,21 @@ settings.DATA_MANAGER_ANNOTATIONS_MAP = {
 }
 
 
+# columns stored in data_manager.TaskColumns when DATA_MANAGER_MATERIALIZED_COLUMNS is enabled,
+# predictions_score isn't stored: it depends on the current project and ML backend model versions
+MATERIALIZED_COLUMNS = (
+    'annotators',
+    'annotations_results',
+    'predictions_results',
+    'predictions_model_versions',
+    'completed_at',
+)
+
+
+def annotate_materialized_column(queryset, column):
+    return queryset.annotate(**{column: F(f'dm_columns__{column}')})
+
+
 def get_annotations_map():
     return settings.DATA_MANAGER_ANNOTATIONS_MAP
 
@@ -820,6 +939,9 @@ class PreparedTaskManager(models.Manager):
             if (field in fields_for_evaluation or all_fields) and field not in excluded_fields_for_evaluation:
                 queryset.project = project
                 queryset.request = request
+                if settings.DATA_MANAGER_MATERIALIZED_COLUMNS and field in MATERIALIZED_COLUMNS:
+                    queryset = annotate_materialized_column(queryset, field)
+                    continue
                 function = annotations_map[field]
                 queryset = function(queryset)
 
@@ -0,0 +1,95 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_manager", "0017_update_agreement_selected_to_nested_structure"),
+        ("tasks", "0060_add_allow_skip_to_task"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskColumns",
+            fields=[
+                (
+                    "task",
+                    models.OneToOneField(
+                        help_text="Task ID",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="dm_columns",
+                        serialize=False,
+                        to="tasks.task",
+                    ),
+                ),
+                (
+                    "annotators",
+                    models.JSONField(
+                        default=None,
+                        help_text="Annotator ids",
+                        null=True,
+                        verbose_name="annotators",
+                    ),
+                ),
+                (
+                    "annotations_results",
+                    models.JSONField(
+                        default=None,
+                        help_text="Results of all annotations",
+                        null=True,
+                        verbose_name="annotations results",
+                    ),
+                ),
+                (
+                    "predictions_results",
+                    models.JSONField(
+                        default=None,
+                        help_text="Results of all predictions",
+                        null=True,
+                        verbose_name="predictions results",
+                    ),
+                ),
+                (
+                    "predictions_model_versions",
+                    models.JSONField(
+                        default=None,
+                        help_text="Model versions of all predictions",
+                        null=True,
+                        verbose_name="predictions model versions",
+                    ),
+                ),
+                (
+                    "predictions_score",
+                    models.FloatField(
+                        db_index=True,
+                        default=None,
+                        help_text="Average prediction score",
+                        null=True,
+                        verbose_name="predictions score",
+                    ),
+                ),
+                (
+                    "completed_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=None,
+                        help_text="Time of the last annotation",
+                        null=True,
+                        verbose_name="completed at",
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True,
+                        help_text="Last time columns were calculated",
+                        verbose_name="updated at",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:49
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("data_manager", "0018_taskcolumns"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="taskcolumns",
+            name="predictions_score",
+        ),
+    ]
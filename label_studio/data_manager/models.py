@@ -102,3 +102,29 @@ class Filter(models.Model):
     type = models.CharField(_('type'), max_length=1024, help_text='Field type')
     operator = models.CharField(_('operator'), max_length=1024, help_text='Filter operator')
     value = models.JSONField(_('value'), default=dict, null=True, help_text='Filter value')
+
+
+class TaskColumns(models.Model):
+    """Materialized data manager columns, one row per task.
+
+    It's maintained from annotation/prediction updates when DATA_MANAGER_MATERIALIZED_COLUMNS is enabled
+    and can be rebuilt with `rebuild_dm_columns` management command.
+    """
+
+    task = models.OneToOneField(
+        'tasks.Task', primary_key=True, related_name='dm_columns', on_delete=models.CASCADE, help_text='Task ID'
+    )
+    annotators = models.JSONField(_('annotators'), null=True, default=None, help_text='Annotator ids')
+    annotations_results = models.JSONField(
+        _('annotations results'), null=True, default=None, help_text='Results of all annotations'
+    )
+    predictions_results = models.JSONField(
+        _('predictions results'), null=True, default=None, help_text='Results of all predictions'
+    )
+    predictions_model_versions = models.JSONField(
+        _('predictions model versions'), null=True, default=None, help_text='Model versions of all predictions'
+    )
+    completed_at = models.DateTimeField(
+        _('completed at'), null=True, default=None, db_index=True, help_text='Time of the last annotation'
+    )
+    updated_at = models.DateTimeField(_('updated at'), auto_now=True, help_text='Last time columns were calculated')
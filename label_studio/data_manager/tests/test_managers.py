@@ -397,3 +397,92 @@ class TestGetQuerysetParameterPassing(TestCase):
                 call_kwargs.get('excluded_fields_for_evaluation'),
                 'excluded_fields_for_evaluation should default to None',
             )
+
+
+class TestApplyFilters(TestCase):
+    """Test that data manager filters are compiled without probe queries and cached."""
+
+    @classmethod
+    def setUpTestData(cls):
+        from projects.tests.factories import ProjectFactory
+        from tasks.models import Task
+
+        cls.project = ProjectFactory()
+        tasks = [
+            Task.objects.create(project=cls.project, data={'text': 'hello', 'tags': ['a']}),
+            Task.objects.create(project=cls.project, data={'text': '', 'tags': ['b']}),
+        ]
+        cls.project.summary.update_data_columns(tasks)
+        cls.tasks = tasks
+
+    def setUp(self):
+        from data_manager import managers
+
+        managers._filter_plans.clear()
+
+    def _filters(self, column, operator, value, _type='String'):
+        from data_manager.prepare_params import Filters
+
+        return Filters(
+            conjunction='and',
+            items=[{'filter': f'filter:tasks:data.{column}', 'operator': operator, 'type': _type, 'value': value}],
+        )
+
+    def test_data_column_types(self):
+        assert self.project.summary.data_column_types == {'text': 'str', 'tags': 'list'}
+
+    def test_no_probe_queries(self):
+        from data_manager.managers import apply_filters
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from projects.models import Project
+        from tasks.models import Task
+
+        def selects(queries):
+            # summary access opens a savepoint, it's not a query
+            return [q for q in queries if 'SAVEPOINT' not in q['sql']]
+
+        project = Project.objects.select_related('summary').get(id=self.project.id)
+        with CaptureQueriesContext(connection) as queries:
+            queryset = apply_filters(Task.objects.all(), self._filters('text', 'empty', True), project, None)
+            assert selects(queries) == []
+            assert list(queryset) == [self.tasks[1]]
+        assert len(selects(queries)) == 1
+
+    def test_list_column_equal_is_not_supported(self):
+        from data_manager.managers import apply_filters
+        from rest_framework.exceptions import ValidationError
+        from tasks.models import Task
+
+        with self.assertRaises(ValidationError):
+            apply_filters(Task.objects.all(), self._filters('tags', 'equal', 'a'), self.project, None)
+
+    def test_unknown_data_column_type_is_checked_on_data(self):
+        from data_manager.managers import get_field_value_type
+        from projects.models import ProjectSummary
+        from tasks.models import Task
+
+        # project summary created before data column types were collected
+        ProjectSummary.objects.filter(project=self.project).update(data_column_types={})
+        self.project.summary.refresh_from_db()
+
+        queryset = Task.objects.filter(project=self.project).order_by('id')
+        assert get_field_value_type(queryset, 'data__tags', self.project) == 'list'
+        assert get_field_value_type(queryset, 'data__text', self.project) == 'str'
+        assert get_field_value_type(queryset, 'data__missing', self.project) == 'str'
+
+    def test_compiled_filters_are_cached(self):
+        from data_manager import managers
+        from tasks.models import Task
+
+        filters = self._filters('text', 'contains', 'hell')
+        with patch.object(managers, 'compile_filters', wraps=managers.compile_filters) as compile_filters:
+            for _ in range(2):
+                queryset = managers.apply_filters(Task.objects.all(), filters, self.project, None)
+                assert list(queryset) == [self.tasks[0]]
+        compile_filters.assert_called_once()
+
+        # new task data types change the plan
+        self.project.summary.update_data_columns([{'text': 'hello again', 'extra': 1}])
+        managers.apply_filters(Task.objects.all(), filters, self.project, None)
+        assert len(managers._filter_plans) == 2
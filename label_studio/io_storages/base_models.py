@@ -1,7 +1,9 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
 import base64
+import collections
 import concurrent.futures
+import hashlib
 import itertools
 import json
 import logging
@@ -18,12 +20,21 @@ import django_rq
 import rq
 import rq.exceptions
 from core.feature_flags import flag_set
-from core.redis import is_job_in_queue, is_job_on_worker, redis_connected, start_job_async_or_sync
+from core.local_jobs import is_local_job_active
+from core.models import LocalJob
+from core.redis import (
+    is_job_in_queue,
+    is_job_on_worker,
+    job_queue_available,
+    redis_connected,
+    start_job_async_or_sync,
+)
 from core.utils.common import load_func
 from core.utils.iterators import iterate_queryset
 from data_export.serializers import ExportDataSerializer
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
 from django.db import models, transaction
 from django.db.models import JSONField
 from django.shortcuts import reverse
@@ -32,7 +43,7 @@ from django.utils.translation import gettext_lazy as _
 from io_storages.utils import StorageObject, get_uri_via_regex, parse_bucket_uri
 from rest_framework.exceptions import ValidationError
 from rq.job import Job
-from tasks.models import Annotation, Task
+from tasks.models import Annotation, Prediction, Task
 from tasks.serializers import AnnotationSerializer, PredictionSerializer
 from webhooks.models import WebhookAction
 from webhooks.utils import emit_webhooks_for_instance
@@ -309,6 +320,14 @@ class Storage(StorageInfo):
 
 
 class ImportStorage(Storage):
+    prefetch_workers = models.PositiveSmallIntegerField(
+        _('prefetch workers'),
+        null=True,
+        blank=True,
+        help_text='Number of threads used to download and parse storage objects during sync, 1 disables prefetching. '
+        'STORAGE_IMPORT_PREFETCH_WORKERS is used if empty',
+    )
+
     def iter_objects(self) -> Iterator[Any]:
         """
         Returns:
@@ -339,6 +358,22 @@ class ImportStorage(Storage):
     def generate_http_url(self, url):
         raise NotImplementedError
 
+    def get_http_url(self, url):
+        """generate_http_url() with presigned URLs shared through cache for a half of presign_ttl,
+        so every task and request pointing to the same file doesn't sign it again
+        """
+        presign_ttl = getattr(self, 'presign_ttl', None)
+        if not (settings.PRESIGNED_URL_CACHE_ENABLED and getattr(self, 'presign', False) and presign_ttl):
+            return self.generate_http_url(url)
+
+        url_hash = hashlib.md5(url.encode()).hexdigest()
+        key = f'io_storages:presigned_url:{self.__class__.__name__}:{self.id}:{url_hash}'
+        http_url = cache.get(key)
+        if http_url is None:
+            http_url = self.generate_http_url(url)
+            cache.set(key, http_url, presign_ttl * 60 // 2)
+        return http_url
+
     def get_bytes_stream(self, uri):
         """Get file bytes from storage as a stream and content type.
 
@@ -425,7 +460,7 @@ class ImportStorage(Storage):
                         # this branch is our old approach:
                         # it generates presigned URLs if storage.presign=True;
                         # or it inserts base64 media into task data if storage.presign=False
-                        http_url = self.generate_http_url(extracted_uri)
+                        http_url = self.get_http_url(extracted_uri)
 
                 return uri.replace(extracted_uri, http_url)
             except Exception:
@@ -443,8 +478,9 @@ class ImportStorage(Storage):
 
         raise NotImplementedError
 
-    @classmethod
-    def add_task(cls, project, maximum_annotations, max_inner_id, storage, link_object: StorageObject, link_class):
+    @staticmethod
+    def _parse_link_object(link_object: StorageObject):
+        """Split StorageObject into task data, predictions, annotations and link kwargs"""
         link_kwargs = asdict(link_object)
         data = link_kwargs.pop('task_data', None)
 
@@ -474,6 +510,14 @@ class ImportStorage(Storage):
             else:
                 data.pop('data')
 
+        return data, allow_skip, predictions, annotations, cancelled_annotations, link_kwargs
+
+    @classmethod
+    def add_task(cls, project, maximum_annotations, max_inner_id, storage, link_object: StorageObject, link_class):
+        data, allow_skip, predictions, annotations, cancelled_annotations, link_kwargs = cls._parse_link_object(
+            link_object
+        )
+
         with transaction.atomic():
             # Create task without skip_fsm (it's not a model field)
             task = Task(
@@ -530,6 +574,226 @@ class ImportStorage(Storage):
         return task
         # FIXME: add_annotation_history / post_process_annotations should be here
 
+    @classmethod
+    def add_tasks(
+        cls, project, maximum_annotations, max_inner_id, storage, link_objects: list[StorageObject], link_class
+    ) -> list[Task]:
+        """Bulk version of add_task: create tasks, links, predictions and annotations
+        for a batch of storage objects in one transaction.
+
+        Inner ids are assigned as a continuous range starting from max_inner_id.
+        If any prediction or annotation in the batch is invalid, ValidationError is raised
+        and nothing from the batch is saved, so the caller can fall back to add_task
+        to report errors per task.
+        """
+        parsed = [cls._parse_link_object(link_object) for link_object in link_objects]
+
+        with transaction.atomic():
+            db_tasks = []
+            for i, (data, allow_skip, predictions, annotations, cancelled_annotations, *_rest) in enumerate(parsed):
+                db_tasks.append(
+                    Task(
+                        data=data,
+                        data_hash=Task.get_data_hash(data, project),
+                        project=project,
+                        overlap=maximum_annotations,
+                        is_labeled=len(annotations) >= maximum_annotations,
+                        total_predictions=len(predictions),
+                        total_annotations=len(annotations) - cancelled_annotations,
+                        cancelled_annotations=cancelled_annotations,
+                        inner_id=max_inner_id + i,
+                        allow_skip=(allow_skip if allow_skip is not None else True),
+                    )
+                )
+            db_tasks = Task.objects.bulk_create(db_tasks, batch_size=settings.BATCH_SIZE)
+
+            link_class.objects.bulk_create(
+                [
+                    link_class(task=task, storage=storage, object_exists=True, **link_kwargs)
+                    for task, (*_rest, link_kwargs) in zip(db_tasks, parsed)
+                ],
+                batch_size=settings.BATCH_SIZE,
+            )
+            logger.debug(f'Create {len(db_tasks)} {storage.__class__.__name__} links in bulk')
+
+            # add predictions
+            predictions, annotations = [], []
+            for task, (_data, _allow_skip, task_predictions, task_annotations, *_rest) in zip(db_tasks, parsed):
+                for prediction in task_predictions:
+                    prediction['task'] = task.id
+                    prediction['project'] = project.id
+                    predictions.append(prediction)
+                for annotation in task_annotations:
+                    annotation['task'] = task.id
+                    annotation['project'] = project.id
+                    annotations.append(annotation)
+
+            if predictions:
+                prediction_ser = PredictionSerializer(data=predictions, many=True)
+                prediction_ser.is_valid(raise_exception=True)
+                db_predictions = []
+                for item in prediction_ser.validated_data:
+                    # we need to call result normalizer here since "bulk_create" doesn't call save() method
+                    item['result'] = Prediction.prepare_prediction_result(item['result'], project)
+                    db_predictions.append(Prediction(**item))
+                Prediction.objects.bulk_create(db_predictions, batch_size=settings.BATCH_SIZE)
+                logger.debug(f'Create {len(db_predictions)} predictions in bulk')
+
+            # add annotations
+            if annotations:
+                annotation_ser = AnnotationSerializer(data=annotations, many=True)
+                annotation_ser.is_valid(raise_exception=True)
+                db_annotations = []
+                for item in annotation_ser.validated_data:
+                    annotation = Annotation(**item)
+                    # "bulk_create" doesn't call save() method, so result_count must be set here
+                    annotation.result_count = len({result.get('id') for result in (annotation.result or [])})
+                    db_annotations.append(annotation)
+                db_annotations = Annotation.objects.bulk_create(db_annotations, batch_size=settings.BATCH_SIZE)
+                logger.debug(f'Create {len(db_annotations)} annotations in bulk')
+                # post_save side effects of Annotation: tasks are new so there are no drafts to delete,
+                # FSM transitions and counters are applied below
+                cls._execute_annotation_fsm_transitions(db_annotations)
+            else:
+                db_annotations = []
+
+            # "bulk_create" bypasses post_save signals, update project summary once per batch
+            if hasattr(project, 'summary'):
+                project.summary.update_data_columns(db_tasks)
+                if db_annotations:
+                    project.summary.update_created_annotations_and_labels(db_annotations)
+            if db_annotations:
+                from ml.functions import count_annotations_for_training
+
+                count_annotations_for_training(project, len(db_annotations))
+
+        return db_tasks
+
+    @staticmethod
+    def _execute_annotation_fsm_transitions(annotations):
+        """bulk_create() bypasses FsmHistoryStateModel.save(), run the creation transitions it would run"""
+        for annotation in annotations:
+            if not annotation._should_execute_fsm():
+                return
+            for transition_name in annotation._determine_fsm_transitions(is_creating=True, changed_fields={}):
+                try:
+                    annotation._execute_fsm_transition(
+                        transition_name=transition_name, is_creating=True, changed_fields={}
+                    )
+                except Exception as e:
+                    logger.error(f'FSM transition {transition_name} failed for annotation {annotation.id}: {e}')
+
+    def _add_tasks_batch(self, link_objects, link_class, maximum_annotations, max_inner_id):
+        """Create tasks for a batch of storage objects
+
+        Returns a tuple (created tasks, validation errors). When batched sync is enabled,
+        the whole batch is written with add_tasks; if the batch contains invalid predictions
+        or annotations it is retried task by task, so errors are reported for each task separately.
+        """
+        if settings.STORAGE_IMPORT_BATCH_SIZE > 1 and len(link_objects) > 1:
+            try:
+                tasks = self.add_tasks(
+                    self.project, maximum_annotations, max_inner_id, self, link_objects, link_class=link_class
+                )
+                self._update_task_columns(tasks)
+                return tasks, []
+            except ValidationError as e:
+                logger.debug(f'Batch of {len(link_objects)} tasks failed validation, retry one by one: {e}')
+
+        tasks, validation_errors = [], []
+        for link_object in link_objects:
+            try:
+                task = self.add_task(
+                    self.project,
+                    maximum_annotations,
+                    max_inner_id + len(tasks),
+                    self,
+                    link_object,
+                    link_class=link_class,
+                )
+                tasks.append(task)
+            except ValidationError as e:
+                # Log validation errors but continue processing other tasks
+                error_message = f'Validation error for task from {link_object.key}: {e}'
+                logger.error(error_message)
+                validation_errors.append(error_message)
+        self._update_task_columns(tasks)
+        return tasks, validation_errors
+
+    @staticmethod
+    def _update_task_columns(tasks):
+        """Materialized data manager columns of new tasks, bulk_create() doesn't send signals to keep them"""
+        if settings.DATA_MANAGER_MATERIALIZED_COLUMNS and tasks:
+            from data_manager.functions import update_task_columns
+
+            update_task_columns([task.id for task in tasks])
+
+    def _get_key_data(self, key, check_file_extension=False) -> list[StorageObject]:
+        """Load storage objects for one key, the file extension is validated before reading"""
+        # Check if file should be processed as JSON based on extension
+        # Skip non-JSON files if use_blob_urls is False
+        if check_file_extension and not self.use_blob_urls:
+            _, ext = os.path.splitext(key.lower())
+            # Only process files with JSON/JSONL/PARQUET extensions
+            json_extensions = {'.json', '.jsonl', '.parquet'}
+
+            if ext and ext not in json_extensions:
+                raise UnsupportedFileFormatError(
+                    f'File "{key}" is not a JSON/JSONL/Parquet file. Only .json, .jsonl, and .parquet files can be processed.\n'
+                    f"If you're trying to import non-JSON data (images, audio, text, etc.), "
+                    f'edit storage settings and enable "Tasks" import method'
+                )
+
+        try:
+            return self.get_data(key)
+        except (UnicodeDecodeError, json.decoder.JSONDecodeError) as exc:
+            logger.debug(exc, exc_info=True)
+            raise ValueError(
+                f'Error loading JSON from file "{key}".\nIf you\'re trying to import non-JSON data '
+                f'(images, audio, text, etc.), edit storage settings and enable '
+                f'"Tasks" import method'
+            )
+
+    def _iter_keys_data(self, keys, check_file_extension=False) -> Iterator[tuple[str, list[StorageObject]]]:
+        """Yield (key, storage objects) pairs in the same order as keys
+
+        With prefetch_workers > 1 the next objects are downloaded and parsed in a thread pool
+        while the current ones are written to DB. At most prefetch_workers * 2 objects are kept in flight,
+        results and errors are returned strictly in key order.
+        """
+        workers = self.prefetch_workers or settings.STORAGE_IMPORT_PREFETCH_WORKERS
+        # blob urls don't need any network calls, there is nothing to prefetch
+        if workers <= 1 or self.use_blob_urls:
+            for key in keys:
+                yield key, self._get_key_data(key, check_file_extension)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='storage-prefetch')
+        in_flight = collections.deque()
+        keys = iter(keys)
+        try:
+            while True:
+                try:
+                    key = next(keys)
+                except StopIteration:
+                    break
+                except Exception:
+                    # listing failed: return objects that are already loading, then re-raise
+                    while in_flight:
+                        key, future = in_flight.popleft()
+                        yield key, future.result()
+                    raise
+                in_flight.append((key, executor.submit(self._get_key_data, key, check_file_extension)))
+                if len(in_flight) >= workers * 2:
+                    key, future = in_flight.popleft()
+                    yield key, future.result()
+
+            while in_flight:
+                key, future = in_flight.popleft()
+                yield key, future.result()
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
     def _scan_and_create_links(self, link_class):
         """
         TODO: deprecate this function and transform it to "pipeline" version  _scan_and_create_links_v2,
@@ -552,93 +816,82 @@ class ImportStorage(Storage):
             'fflag_root_212_reduce_importstoragelink_counts', organization=self.project.organization
         )
 
+        # batched sync mode: buffer storage objects and write them with add_tasks in one transaction per batch
+        import_batch_size = max(1, settings.STORAGE_IMPORT_BATCH_SIZE)
+        pending_link_objects = []
         tasks_for_webhook = []
-        for keys_batch in _batched(
-            self.iter_keys(), settings.STORAGE_EXISTED_COUNT_BATCH_SIZE if existed_count_flag_set else 1
-        ):
-            deduplicated_keys = list(dict.fromkeys(keys_batch))  # preserve order
-            for key in deduplicated_keys:
-                logger.debug(f'Scanning key {key}')
-
-            # w/o Dataflow
-            # pubsub.push(topic, key)
-            # -> GF.pull(topic, key) + env -> add_task()
-
-            # skip if key has already been synced
-            existing_keys = link_class.exists(deduplicated_keys, self)
-            tasks_existed += link_class.objects.filter(key__in=existing_keys, storage=self.id).count()
-            self.info_update_progress(last_sync_count=tasks_created, tasks_existed=tasks_existed)
-
-            for key in deduplicated_keys:
-                if key in existing_keys:
-                    logger.debug(f'{self.__class__.__name__} already has tasks linked to {key=}')
-                    continue
-
-                logger.debug(f'{self}: found new key {key}')
-
-                # Check if file should be processed as JSON based on extension
-                # Skip non-JSON files if use_blob_urls is False
-                if check_file_extension and not self.use_blob_urls:
-                    _, ext = os.path.splitext(key.lower())
-                    # Only process files with JSON/JSONL/PARQUET extensions
-                    json_extensions = {'.json', '.jsonl', '.parquet'}
-
-                    if ext and ext not in json_extensions:
-                        raise UnsupportedFileFormatError(
-                            f'File "{key}" is not a JSON/JSONL/Parquet file. Only .json, .jsonl, and .parquet files can be processed.\n'
-                            f"If you're trying to import non-JSON data (images, audio, text, etc.), "
-                            f'edit storage settings and enable "Tasks" import method'
-                        )
 
-                try:
-                    link_objects = self.get_data(key)
-                except (UnicodeDecodeError, json.decoder.JSONDecodeError) as exc:
-                    logger.debug(exc, exc_info=True)
-                    raise ValueError(
-                        f'Error loading JSON from file "{key}".\nIf you\'re trying to import non-JSON data '
-                        f'(images, audio, text, etc.), edit storage settings and enable '
-                        f'"Tasks" import method'
-                    )
+        def flush_pending_link_objects():
+            nonlocal max_inner_id, tasks_created, tasks_for_webhook
+            if not pending_link_objects:
+                return
+            link_objects = pending_link_objects[:]
+            pending_link_objects.clear()
+            tasks, errors = self._add_tasks_batch(link_objects, link_class, maximum_annotations, max_inner_id)
+            validation_errors.extend(errors)
+
+            # update progress counters for storage info
+            max_inner_id += len(tasks)
+            tasks_created += len(tasks)
+
+            # add tasks to webhook list
+            tasks_for_webhook.extend(task.id for task in tasks)
+
+            # settings.WEBHOOK_BATCH_SIZE
+            # `WEBHOOK_BATCH_SIZE` sets the maximum number of tasks sent in a single webhook call, ensuring manageable payload sizes.
+            # When `tasks_for_webhook` accumulates tasks equal to/exceeding `WEBHOOK_BATCH_SIZE`, they're sent in a webhook via
+            # `emit_webhooks_for_instance`, and `tasks_for_webhook` is cleared for new tasks.
+            # If tasks remain in `tasks_for_webhook` at process end (less than `WEBHOOK_BATCH_SIZE`), they're sent in a final webhook
+            # call to ensure all tasks are processed and no task is left unreported in the webhook.
+            if len(tasks_for_webhook) >= settings.WEBHOOK_BATCH_SIZE:
+                emit_webhooks_for_instance(
+                    self.project.organization, self.project, WebhookAction.TASKS_CREATED, tasks_for_webhook
+                )
+                tasks_for_webhook = []
 
-                for link_object in link_objects:
-                    # TODO: batch this loop body with add_task -> add_tasks in a single bulk write.
-                    # See DIA-2062 for prerequisites
-                    try:
-                        task = self.add_task(
-                            self.project,
-                            maximum_annotations,
-                            max_inner_id,
-                            self,
-                            link_object,
-                            link_class=link_class,
-                        )
-                        max_inner_id += 1
-
-                        # update progress counters for storage info
-                        tasks_created += 1
-
-                        # add task to webhook list
-                        tasks_for_webhook.append(task.id)
-                    except ValidationError as e:
-                        # Log validation errors but continue processing other tasks
-                        error_message = f'Validation error for task from {link_object.key}: {e}'
-                        logger.error(error_message)
-                        validation_errors.append(error_message)
+        def iter_new_keys():
+            nonlocal tasks_existed
+            for keys_batch in _batched(
+                self.iter_keys(), settings.STORAGE_EXISTED_COUNT_BATCH_SIZE if existed_count_flag_set else 1
+            ):
+                deduplicated_keys = list(dict.fromkeys(keys_batch))  # preserve order
+                for key in deduplicated_keys:
+                    logger.debug(f'Scanning key {key}')
+
+                # w/o Dataflow
+                # pubsub.push(topic, key)
+                # -> GF.pull(topic, key) + env -> add_task()
+
+                # skip if key has already been synced
+                existing_keys = link_class.exists(deduplicated_keys, self)
+                tasks_existed += link_class.objects.filter(key__in=existing_keys, storage=self.id).count()
+                self.info_update_progress(last_sync_count=tasks_created, tasks_existed=tasks_existed)
+
+                for key in deduplicated_keys:
+                    if key in existing_keys:
+                        logger.debug(f'{self.__class__.__name__} already has tasks linked to {key=}')
                         continue
 
-                    # settings.WEBHOOK_BATCH_SIZE
-                    # `WEBHOOK_BATCH_SIZE` sets the maximum number of tasks sent in a single webhook call, ensuring manageable payload sizes.
-                    # When `tasks_for_webhook` accumulates tasks equal to/exceeding `WEBHOOK_BATCH_SIZE`, they're sent in a webhook via
-                    # `emit_webhooks_for_instance`, and `tasks_for_webhook` is cleared for new tasks.
-                    # If tasks remain in `tasks_for_webhook` at process end (less than `WEBHOOK_BATCH_SIZE`), they're sent in a final webhook
-                    # call to ensure all tasks are processed and no task is left unreported in the webhook.
-                    if len(tasks_for_webhook) >= settings.WEBHOOK_BATCH_SIZE:
-                        emit_webhooks_for_instance(
-                            self.project.organization, self.project, WebhookAction.TASKS_CREATED, tasks_for_webhook
-                        )
-                        tasks_for_webhook = []
+                    logger.debug(f'{self}: found new key {key}')
+                    yield key
+
+        try:
+            for key, link_objects in self._iter_keys_data(iter_new_keys(), check_file_extension):
+                pending_link_objects.extend(link_objects)
+                if len(pending_link_objects) >= import_batch_size:
+                    flush_pending_link_objects()
 
                 self.info_update_progress(last_sync_count=tasks_created, tasks_existed=tasks_existed)
+        except Exception:
+            # save objects parsed before the error, then fail the sync with the original exception
+            try:
+                flush_pending_link_objects()
+            except Exception as e:
+                logger.error(f'Failed to save pending storage objects after sync error: {e}', exc_info=True)
+            raise
+
+        flush_pending_link_objects()
+        self.info_update_progress(last_sync_count=tasks_created, tasks_existed=tasks_existed)
 
         if tasks_for_webhook:
             emit_webhooks_for_instance(
@@ -668,13 +921,17 @@ class ImportStorage(Storage):
         self._scan_and_create_links(ImportStorageLink)
 
     def sync(self):
-        if redis_connected():
+        if job_queue_available():
             queue_name = 'low'
-            queue = django_rq.get_queue(queue_name)
             meta = {'project': self.project.id, 'storage': self.id}
-            if not is_job_in_queue(queue, 'import_sync_background', meta=meta) and not is_job_on_worker(
-                job_id=self.last_sync_job, queue_name=queue_name
-            ):
+            if redis_connected():
+                queue = django_rq.get_queue(queue_name)
+                job_is_active = is_job_in_queue(queue, 'import_sync_background', meta=meta) or is_job_on_worker(
+                    job_id=self.last_sync_job, queue_name=queue_name
+                )
+            else:
+                job_is_active = is_local_job_active('import_sync_background', meta)
+            if not job_is_active:
                 if not self.info_set_queued():
                     return
                 # Use start_job_async_or_sync to automatically capture and restore CurrentContext
@@ -748,8 +1005,8 @@ def export_sync_only_new_background(storage_class, storage_id, **kwargs):
 
 
 def storage_background_failure(*args, **kwargs):
-    # job is used in rqworker failure, extract storage id from job arguments
-    if isinstance(args[0], rq.job.Job):
+    # job is used in rqworker and local worker failure, extract storage id from job arguments
+    if isinstance(args[0], (rq.job.Job, LocalJob)):
         sync_job = args[0]
         _class = sync_job.args[0]
         storage_id = sync_job.args[1]
@@ -789,15 +1046,21 @@ class ExportStorage(Storage, ProjectStorageMixin):
     # TODO from testing, more than 8 seems to cause problems. revisit to add more parallelism.
     max_workers = min(8, (os.cpu_count() or 2) * 4)
 
-    def _get_serialized_data(self, annotation):
+    def _is_task_format(self):
         user = self.project.organization.created_by
         flag = flag_set(
             'fflag_feat_optic_650_target_storage_task_format_long', user=user, override_system_default=False
         )
-        if settings.FUTURE_SAVE_TASK_TO_STORAGE or flag:
+        return settings.FUTURE_SAVE_TASK_TO_STORAGE or flag
+
+    def _get_serialized_data(self, annotation):
+        # save_annotations serializes the whole batch at once and caches the result on annotations
+        data = getattr(annotation, '_storage_serialized_data', None)
+        if data is not None:
+            return data
+
+        if self._is_task_format():
             # export task with annotations
-            # TODO: we have to rewrite save_all_annotations, because this func will be called for each annotation
-            # TODO: instead of each task, however, we have to call it only once per task
             expand = ['annotations.reviews', 'annotations.completed_by']
             context = {'project': self.project}
             return ExportDataSerializer(annotation.task, context=context, expand=expand).data
@@ -806,6 +1069,76 @@ class ExportStorage(Storage, ProjectStorageMixin):
             # deprecated functionality - save only annotation
             return serializer_class(annotation, context={'project': self.project}).data
 
+    def _serialize_annotations_batch(self, annotations, task_format):
+        """Serialize the batch with one serializer call and cache the data on annotations.
+
+        In the task format the object key is the task id, so all annotations of a task share one object:
+        only the first annotation of each task is returned to be written, the others just need links.
+        Returns (annotations to write, annotations sharing already written objects).
+        """
+        context = {'project': self.project}
+        if not task_format:
+            serializer_class = load_func(settings.STORAGE_ANNOTATION_SERIALIZER)
+            data = serializer_class(annotations, many=True, context=context).data
+            for annotation, item in zip(annotations, data):
+                annotation._storage_serialized_data = item
+            return annotations, []
+
+        tasks = (
+            Task.objects.filter(id__in={annotation.task_id for annotation in annotations})
+            .select_related('project', 'file_upload')
+            .prefetch_related('annotations', 'annotations__completed_by', 'drafts', 'predictions')
+        )
+        expand = ['annotations.reviews', 'annotations.completed_by']
+        serialized_tasks = {
+            item['id']: item for item in ExportDataSerializer(tasks, many=True, context=context, expand=expand).data
+        }
+        to_write, shared = [], []
+        written_tasks = set()
+        for annotation in annotations:
+            if annotation.task_id in written_tasks:
+                shared.append(annotation)
+                continue
+            written_tasks.add(annotation.task_id)
+            annotation._storage_serialized_data = serialized_tasks[annotation.task_id]
+            to_write.append(annotation)
+        return to_write, shared
+
+    def _create_links(self, annotations):
+        """Create or touch export links for annotations without writing objects"""
+        if not annotations:
+            return
+        link_model = self.links.model
+        ids = [annotation.id for annotation in annotations]
+        existing = set(
+            link_model.objects.filter(storage=self, annotation_id__in=ids).values_list('annotation_id', flat=True)
+        )
+        link_model.objects.filter(storage=self, annotation_id__in=existing).update(updated_at=timezone.now())
+        new_links = [
+            link_model(annotation=annotation, storage=self)
+            for annotation in annotations
+            if annotation.id not in existing
+        ]
+        link_model.objects.bulk_create(new_links)
+
+    def _iter_annotation_batches(self, annotations, chunk_size, task_format):
+        """Batches of annotations ordered by task, a task is never split between batches in the task format"""
+        annotations = annotations.select_related('task').order_by('task_id', 'id')
+        if not task_format:
+            yield from _batched(iterate_queryset(annotations, chunk_size=chunk_size), chunk_size)
+            return
+
+        batch = []
+        for _task_id, task_annotations in itertools.groupby(
+            iterate_queryset(annotations, chunk_size=chunk_size), key=lambda annotation: annotation.task_id
+        ):
+            if len(batch) >= chunk_size:
+                yield batch
+                batch = []
+            batch.extend(task_annotations)
+        if batch:
+            yield batch
+
     def save_annotation(self, annotation):
         raise NotImplementedError
 
@@ -814,6 +1147,7 @@ class ExportStorage(Storage, ProjectStorageMixin):
         total_annotations = annotations.count()
         self.info_set_in_progress()
         self.cached_user = self.project.organization.created_by
+        task_format = self._is_task_format()
 
         # Calculate optimal batch size based on project data and worker count
         project_batch_size = self.project.get_task_batch_size()
@@ -824,21 +1158,31 @@ class ExportStorage(Storage, ProjectStorageMixin):
         )
 
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            # Batch annotations so that we update progress before having to submit every future.
-            # Updating progress in thread requires coordinating on count and db writes, so just
-            # batching to keep it simpler.
-            for annotation_batch in _batched(
-                iterate_queryset(Annotation.objects.filter(project=self.project), chunk_size=chunk_size),
-                chunk_size,
-            ):
-                futures = []
+            # Serialization runs here once per batch, threads only write objects to the storage,
+            # progress is updated once per batch
+            for annotation_batch in self._iter_annotation_batches(annotations, chunk_size, task_format):
                 for annotation in annotation_batch:
                     annotation.cached_user = self.cached_user
-                    futures.append(executor.submit(self.save_annotation, annotation))
+                to_write, shared = self._serialize_annotations_batch(annotation_batch, task_format)
 
+                futures = {executor.submit(self.save_annotation, annotation): annotation for annotation in to_write}
+                failed_tasks = set()
                 for future in concurrent.futures.as_completed(futures):
-                    annotation_exported += 1
-                    self.info_update_progress(last_sync_count=annotation_exported, total_annotations=total_annotations)
+                    annotation = futures[future]
+                    try:
+                        future.result()
+                    except Exception:
+                        failed_tasks.add(annotation.task_id)
+                        logger.error(
+                            f'Export storage {self.id}: failed to save annotation {annotation.id}', exc_info=True
+                        )
+                    else:
+                        annotation_exported += 1
+
+                shared = [annotation for annotation in shared if annotation.task_id not in failed_tasks]
+                self._create_links(shared)
+                annotation_exported += len(shared)
+                self.info_update_progress(last_sync_count=annotation_exported, total_annotations=total_annotations)
 
         self.info_set_completed(last_sync_count=annotation_exported, total_annotations=total_annotations)
 
@@ -862,14 +1206,14 @@ class ExportStorage(Storage, ProjectStorageMixin):
         else:
             export_sync_fn = export_sync_background
 
-        if redis_connected():
-            queue = django_rq.get_queue('low')
+        if job_queue_available():
             if not self.info_set_queued():
                 return
-            sync_job = queue.enqueue(
+            sync_job = start_job_async_or_sync(
                 export_sync_fn,
                 self.__class__,
                 self.id,
+                queue_name='low',
                 job_timeout=settings.RQ_LONG_JOB_TIMEOUT,
                 project_id=self.project.id,
                 organization_id=self.project.organization.id,
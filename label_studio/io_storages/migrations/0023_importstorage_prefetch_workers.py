@@ -0,0 +1,63 @@
+# Generated by Django 5.1.15 on 2026-10-18 08:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("io_storages", "0022_normalize_localfiles_paths"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="azureblobimportstorage",
+            name="prefetch_workers",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Number of threads used to download and parse storage objects during sync, 1 disables prefetching. STORAGE_IMPORT_PREFETCH_WORKERS is used if empty",
+                null=True,
+                verbose_name="prefetch workers",
+            ),
+        ),
+        migrations.AddField(
+            model_name="gcsimportstorage",
+            name="prefetch_workers",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Number of threads used to download and parse storage objects during sync, 1 disables prefetching. STORAGE_IMPORT_PREFETCH_WORKERS is used if empty",
+                null=True,
+                verbose_name="prefetch workers",
+            ),
+        ),
+        migrations.AddField(
+            model_name="localfilesimportstorage",
+            name="prefetch_workers",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Number of threads used to download and parse storage objects during sync, 1 disables prefetching. STORAGE_IMPORT_PREFETCH_WORKERS is used if empty",
+                null=True,
+                verbose_name="prefetch workers",
+            ),
+        ),
+        migrations.AddField(
+            model_name="redisimportstorage",
+            name="prefetch_workers",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Number of threads used to download and parse storage objects during sync, 1 disables prefetching. STORAGE_IMPORT_PREFETCH_WORKERS is used if empty",
+                null=True,
+                verbose_name="prefetch workers",
+            ),
+        ),
+        migrations.AddField(
+            model_name="s3importstorage",
+            name="prefetch_workers",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Number of threads used to download and parse storage objects during sync, 1 disables prefetching. STORAGE_IMPORT_PREFETCH_WORKERS is used if empty",
+                null=True,
+                verbose_name="prefetch workers",
+            ),
+        ),
+    ]
@@ -16,6 +16,7 @@ from rest_framework.views import APIView
 from tasks.models import Task
 
 from label_studio.io_storages.functions import get_storage_by_url
+from label_studio.io_storages.proxy_cache import get_chunk_cache
 from label_studio.io_storages.utils import parse_range
 
 logger = logging.getLogger(__name__)
@@ -228,6 +229,43 @@ class ResolveStorageUriAPIMixin:
 
         return response
 
+    def proxy_data_from_chunk_cache(self, request, uri, project, storage, range_header):
+        """
+        Serve a range of the file from ProxyChunkCache, missing chunks are loaded from storage.
+
+        Returns None when the cache can't serve the range (unknown size, storage without ETag, etc),
+        then the range is streamed directly from storage.
+        """
+        start, end = parse_range(range_header)
+        if start is None:
+            return None
+        # 'bytes=0-0' header probe needs one byte, it's cheaper to pass it to storage than to load a chunk
+        if start == 0 and end == 0:
+            return None
+        # 'bytes=0-' gets the first MAX_RANGE bytes like other open ranges
+        if end == '':
+            end = start + settings.RESOLVER_PROXY_MAX_RANGE_SIZE - 1
+
+        chunk_cache = get_chunk_cache()
+        result = chunk_cache.get(storage, uri, start, end)
+        if result is None:
+            return None
+        data, meta, cache_status = result
+        end = start + len(data) - 1
+
+        content_type = meta['content_type'] or 'application/octet-stream'
+        response = HttpResponse(data, content_type=content_type, status=status.HTTP_206_PARTIAL_CONTENT)
+        metadata = {
+            'ContentLength': len(data),
+            'ContentRange': f'bytes {start}-{end}/{meta["size"]}',
+            'LastModified': meta['last_modified'],
+            'ETag': meta['etag'],
+        }
+        response = self.prepare_headers(response, metadata, request, project)
+        response.headers['X-Proxy-Cache'] = cache_status
+        logger.debug(f'Proxy chunk cache {cache_status} for {uri} {range_header}: {chunk_cache.stats()}')
+        return response
+
     def proxy_data_from_storage(self, request, uri, project, storage):
         """
         Proxy the data using iter_chunks directly from storage streaming object.
@@ -240,6 +278,12 @@ class ResolveStorageUriAPIMixin:
             # Process and limit the range header for downloaded files
             range_header = self.override_range_header(request)
 
+            # Serve ranged requests from the local chunk cache when possible
+            if settings.RESOLVER_PROXY_CHUNK_CACHE_ENABLED and range_header:
+                response = self.proxy_data_from_chunk_cache(request, uri, project, storage, range_header)
+                if response is not None:
+                    return response
+
             # Use the storage-specific method to get data stream and content type
             stream, content_type, metadata = storage.get_bytes_stream(uri, range_header=range_header)
 
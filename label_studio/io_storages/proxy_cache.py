@@ -0,0 +1,293 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# log cumulative cache stats every N proxied requests
+STATS_LOG_INTERVAL = 1000
+# re-scan the directory size every N seconds to count chunks written by other workers
+SIZE_SCAN_INTERVAL = 60
+
+
+class ProxyChunkCache:
+    """Local disk LRU cache of storage objects split into aligned chunks.
+
+    Chunks are stored as files <directory>/<object hash[:2]>/<object hash>/<chunk index>,
+    the object hash includes storage, key and ETag, so a changed object never hits old chunks.
+    Object metadata (ETag, size, content type) is kept in the django cache for META_TTL seconds,
+    when it expires the next request revalidates the object with a chunk fetched from storage.
+    File mtime is used as the LRU clock, the directory can be shared by several workers:
+    each worker counts its own writes and re-scans the directory every SIZE_SCAN_INTERVAL seconds.
+    """
+
+    def __init__(self, directory, max_size, chunk_size, meta_ttl):
+        self.directory = directory
+        self.max_size = max_size
+        self.chunk_size = chunk_size
+        self.meta_ttl = meta_ttl
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bytes_from_cache = 0
+        self.bytes_from_storage = 0
+        self.evictions = 0
+        self.requests = 0
+        os.makedirs(directory, exist_ok=True)
+        self.size = self._scan_size()
+        self.scanned_at = time.monotonic()
+
+    def stats(self):
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                'requests': self.requests,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'bytes_from_cache': self.bytes_from_cache,
+                'bytes_from_storage': self.bytes_from_storage,
+                'evictions': self.evictions,
+                'size': self.size,
+            }
+
+    @staticmethod
+    def object_id(storage, uri):
+        return f'{type(storage).__name__}:{storage.id}:{uri}'
+
+    def meta_key(self, storage, uri):
+        return 'io_storages:proxy_chunk_meta:' + hashlib.sha256(self.object_id(storage, uri).encode()).hexdigest()
+
+    def chunk_path(self, storage, uri, etag, index):
+        digest = hashlib.sha256(f'{self.object_id(storage, uri)}:{etag}'.encode()).hexdigest()
+        return os.path.join(self.directory, digest[:2], digest, str(index))
+
+    def get(self, storage, uri, start, end):
+        """Return (data, meta, status) for bytes [start, end] of the object or None if cache can't serve it.
+
+        end is inclusive and may be None, it's clamped by the object size.
+        status is HIT, PARTIAL or MISS depending on how many chunks were found on disk.
+        """
+        first = start // self.chunk_size
+        chunks, cached = {}, set()
+
+        meta = cache.get(self.meta_key(storage, uri))
+        if meta is None:
+            # the first chunk revalidates the object: ETag and size come with it
+            fetched = self._fetch(storage, uri, first, first)
+            if fetched is None:
+                return None
+            meta, loaded = fetched
+            chunks.update(loaded)
+
+        end, last = self._clamp(meta, start, end)
+        if end is None:
+            return None
+        for index in range(first, last + 1):
+            if index not in chunks:
+                data = self._read_chunk(storage, uri, meta['etag'], index)
+                if data is not None:
+                    chunks[index] = data
+                    cached.add(index)
+
+        # load missing runs of chunks with one storage request per run
+        index = first
+        while index <= last:
+            if index in chunks:
+                index += 1
+                continue
+            run_end = index
+            while run_end < last and run_end + 1 not in chunks:
+                run_end += 1
+            fetched = self._fetch(storage, uri, index, run_end)
+            if fetched is None:
+                return None
+            fetched_meta, loaded = fetched
+            if fetched_meta['etag'] != meta['etag'] or index not in loaded:
+                # object was changed in the middle of the request
+                return None
+            chunks.update(loaded)
+            index = max(loaded) + 1
+
+        offset = start - first * self.chunk_size
+        data = b''.join(chunks[i] for i in range(first, last + 1))[offset : offset + end - start + 1]
+
+        total = last - first + 1
+        with self.lock:
+            self.requests += 1
+            self.hits += len(cached)
+            self.misses += total - len(cached)
+            self.bytes_from_cache += sum(len(chunks[i]) for i in cached)
+            requests = self.requests
+        if requests % STATS_LOG_INTERVAL == 0:
+            logger.info(f'Proxy chunk cache stats: {self.stats()}')
+
+        status = 'HIT' if len(cached) == total else 'PARTIAL' if cached else 'MISS'
+        return data, meta, status
+
+    def _clamp(self, meta, start, end):
+        size = meta['size']
+        if start >= size:
+            return None, None
+        end = size - 1 if end is None else min(end, size - 1)
+        return end, end // self.chunk_size
+
+    def _read_chunk(self, storage, uri, etag, index):
+        path = self.chunk_path(storage, uri, etag, index)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            # bump LRU clock
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def _fetch(self, storage, uri, first, last):
+        """Load chunks [first, last] from storage and save complete ones to disk"""
+        start = first * self.chunk_size
+        # ask for one byte more: some storages return ranges without the last byte,
+        # incomplete chunks are not saved anyway
+        end = (last + 1) * self.chunk_size
+        stream, content_type, metadata = storage.get_bytes_stream(uri, range_header=f'bytes={start}-{end}')
+        if stream is None:
+            return None
+        try:
+            received_start, size = parse_content_range(metadata)
+            if received_start != start or size is None:
+                logger.debug(f'Storage returned an unexpected range for {uri}: {metadata.get("ContentRange")}')
+                return None
+            data = b''.join(stream.iter_chunks(chunk_size=settings.RESOLVER_PROXY_BUFFER_SIZE))
+        finally:
+            try:
+                stream.close()
+            except Exception as e:
+                logger.debug(f"Couldn't close stream: {e}")
+
+        etag = (metadata.get('ETag') or '').strip('"')
+        last_modified = metadata.get('LastModified')
+        if hasattr(last_modified, 'strftime'):
+            last_modified = last_modified.strftime('%a, %d %b %Y %H:%M:%S GMT')
+        meta = {
+            'etag': etag,
+            'size': size,
+            'content_type': content_type,
+            'last_modified': last_modified,
+        }
+        cache.set(self.meta_key(storage, uri), meta, self.meta_ttl)
+
+        loaded = {}
+        for index in range(first, last + 1):
+            offset = (index - first) * self.chunk_size
+            chunk = data[offset : offset + self.chunk_size]
+            complete = len(chunk) == self.chunk_size or (chunk and start + offset + len(chunk) == size)
+            if not complete:
+                break
+            loaded[index] = chunk
+            if etag:
+                self._write_chunk(self.chunk_path(storage, uri, etag, index), chunk)
+
+        with self.lock:
+            self.bytes_from_storage += len(data)
+        return meta, loaded
+
+    def _write_chunk(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self.lock:
+            self.size += len(data)
+            scan = time.monotonic() - self.scanned_at > SIZE_SCAN_INTERVAL
+            if scan:
+                self.scanned_at = time.monotonic()
+        if scan:
+            size = self._scan_size()
+            with self.lock:
+                self.size = size
+        if self.size > self.max_size:
+            self.evict()
+
+    def evict(self):
+        """Remove least recently used chunks until the cache takes 90% of max_size"""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(f[1] for f in files)
+        target = self.max_size * 0.9
+        evicted = 0
+        for _, file_size, path in sorted(files):
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+            evicted += 1
+
+        with self.lock:
+            self.size = size
+            self.scanned_at = time.monotonic()
+            self.evictions += evicted
+        logger.debug(f'Proxy chunk cache evicted {evicted} chunks, size is {size} bytes')
+
+    def _scan_size(self):
+        size = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                try:
+                    size += os.path.getsize(os.path.join(root, name))
+                except FileNotFoundError:
+                    pass
+        return size
+
+
+def parse_content_range(metadata):
+    """Return (start, total size) from storage metadata"""
+    content_range = metadata.get('ContentRange')
+    if content_range:
+        try:
+            byte_range, size = content_range.split(' ')[1].split('/')
+            return int(byte_range.split('-')[0]), int(size)
+        except (IndexError, ValueError):
+            return None, None
+    if metadata.get('StatusCode') == 200 and metadata.get('ContentLength') is not None:
+        return 0, int(metadata['ContentLength'])
+    return None, None
+
+
+_chunk_cache = None
+_chunk_cache_lock = threading.Lock()
+
+
+def get_chunk_cache():
+    """Process-wide chunk cache configured from RESOLVER_PROXY_CHUNK_CACHE_* settings"""
+    global _chunk_cache
+    config = (
+        settings.RESOLVER_PROXY_CHUNK_CACHE_DIR,
+        settings.RESOLVER_PROXY_CHUNK_CACHE_SIZE,
+        settings.RESOLVER_PROXY_CHUNK_CACHE_CHUNK_SIZE,
+        settings.RESOLVER_PROXY_CHUNK_CACHE_META_TTL,
+    )
+    with _chunk_cache_lock:
+        if _chunk_cache is None or _chunk_cache.config != config:
+            _chunk_cache = ProxyChunkCache(*config)
+            _chunk_cache.config = config
+        return _chunk_cache
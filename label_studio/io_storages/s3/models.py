@@ -237,9 +237,9 @@ class S3ImportStorageBase(S3StorageMixin, ImportStorage):
             return [StorageObject(key=key, task_data=task)]
 
         # read task json from bucket and validate it
-        _, s3 = self.get_client_and_resource()
-        bucket = s3.Bucket(self.bucket)
-        obj = s3.Object(bucket.name, key).get()['Body'].read()
+        # boto3 clients are thread-safe unlike resources, so get_data can be used by prefetch threads
+        client = self.get_client()
+        obj = client.get_object(Bucket=self.bucket, Key=key)['Body'].read()
         return load_tasks_json(obj, key)
 
     @catch_and_reraise_from_none
@@ -45,7 +45,7 @@ class StorageTaskSerializer(TaskSerializer):
 
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ('data_hash',)
 
 
 class StorageCompletedBySerializer(serializers.ModelSerializer):
@@ -1,4 +1,6 @@
+import json
 from pathlib import Path
+from unittest import mock
 
 import pytest
 from io_storages.localfiles.models import LocalFilesExportStorage, LocalFilesExportStorageLink
@@ -88,3 +90,53 @@ def test_annotation_delete_respects_can_delete_flag(settings, tmp_path):
     assert exported_file.exists()
     # Link still cascades with the annotation deletion, but the disk artifact must remain.
     assert not LocalFilesExportStorageLink.objects.filter(storage=storage).exists()
+
+
+def _make_export_storage(settings, tmp_path, project):
+    document_root = tmp_path / 'local-root'
+    export_dir = document_root / 'exports'
+    export_dir.mkdir(parents=True)
+    settings.LOCAL_FILES_DOCUMENT_ROOT = str(document_root)
+    settings.LOCAL_FILES_SERVING_ENABLED = True
+    storage = LocalFilesExportStorage.objects.create(project=project, path=str(export_dir))
+    storage.info_set_queued()
+    return storage
+
+
+@pytest.mark.django_db
+def test_save_only_new_annotations_exports_only_new(settings, tmp_path):
+    project = ProjectFactory()
+    annotations = [AnnotationFactory(task=TaskFactory(project=project), project=project) for _ in range(3)]
+    storage = _make_export_storage(settings, tmp_path, project)
+    LocalFilesExportStorageLink.create(annotations[0], storage)
+
+    with mock.patch.object(LocalFilesExportStorage, 'save_annotation', autospec=True) as save_annotation:
+        storage.save_only_new_annotations()
+
+    assert sorted(call.args[1].id for call in save_annotation.call_args_list) == [a.id for a in annotations[1:]]
+    storage.refresh_from_db()
+    assert storage.last_sync_count == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_save_annotations_writes_each_task_once(settings, tmp_path):
+    settings.FUTURE_SAVE_TASK_TO_STORAGE = True
+    project = ProjectFactory()
+    tasks = [TaskFactory(project=project), TaskFactory(project=project)]
+    annotations = [AnnotationFactory(task=tasks[0], project=project) for _ in range(2)]
+    annotations.append(AnnotationFactory(task=tasks[1], project=project))
+    storage = _make_export_storage(settings, tmp_path, project)
+
+    with mock.patch.object(
+        LocalFilesExportStorage, 'save_annotation', autospec=True, side_effect=LocalFilesExportStorage.save_annotation
+    ) as save_annotation:
+        storage.save_all_annotations()
+
+    assert save_annotation.call_count == 2
+    assert sorted(p.name for p in Path(storage.path).iterdir()) == sorted(f'{task.id}.json' for task in tasks)
+    assert LocalFilesExportStorageLink.objects.filter(storage=storage).count() == 3
+
+    exported = json.loads((Path(storage.path) / f'{tasks[0].id}.json').read_text())
+    assert sorted(a['id'] for a in exported['annotations']) == [a.id for a in annotations[:2]]
+    storage.refresh_from_db()
+    assert storage.last_sync_count == 3
@@ -1,8 +1,10 @@
 import json
+import time
 
 import boto3
 import mock
 import pytest
+from data_manager.models import TaskColumns
 from io_storages.models import S3ImportStorage
 from io_storages.s3.models import S3ImportStorageLink
 from io_storages.tests.factories import (
@@ -191,6 +193,75 @@ def test_storagelink_fields(project, common_task_data):
         assert storage_links[1].row_group is None
 
 
+def test_batched_sync(project, common_task_data, settings):
+    settings.STORAGE_IMPORT_BATCH_SIZE = 3
+    settings.DATA_MANAGER_MATERIALIZED_COLUMNS = True
+    with mock_s3():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        bucket_name = 'pytest-s3-jsons'
+        s3.create_bucket(Bucket=bucket_name)
+        for i in range(3):
+            s3.put_object(Bucket=bucket_name, Key=f'test{i}.json', Body=json.dumps(common_task_data))
+
+        storage = S3ImportStorage(
+            project=project,
+            bucket=bucket_name,
+            aws_access_key_id='example',
+            aws_secret_access_key='example',
+            use_blob_urls=False,
+            recursive_scan=True,
+        )
+        storage.save()
+        with mock.patch('io_storages.base_models.emit_webhooks_for_instance') as emit_webhooks:
+            storage.sync()
+
+        storage.refresh_from_db()
+        assert storage.status == storage.Status.COMPLETED
+        assert storage.last_sync_count == 6
+        tasks = list(project.tasks.order_by('id'))
+        assert [t.inner_id for t in tasks] == [1, 2, 3, 4, 5, 6]
+        assert S3ImportStorageLink.objects.filter(storage=storage).count() == 6
+        assert sum(len(call.args[3]) for call in emit_webhooks.call_args_list) == 6
+        project.summary.refresh_from_db()
+        assert set(project.summary.all_data_columns) == {'image_url', 'text'}
+        # bulk created tasks get materialized data manager columns
+        assert TaskColumns.objects.filter(task__project=project).count() == 6
+
+
+def test_batched_sync_saves_parsed_objects_on_error(project, common_task_data, settings):
+    settings.STORAGE_IMPORT_BATCH_SIZE = 10
+    with mock_s3():
+        s3 = boto3.client('s3', region_name='us-east-1')
+        bucket_name = 'pytest-s3-jsons'
+        s3.create_bucket(Bucket=bucket_name)
+        for i in range(2):
+            s3.put_object(Bucket=bucket_name, Key=f'test{i}.json', Body=json.dumps(common_task_data))
+
+        storage = S3ImportStorage(
+            project=project,
+            bucket=bucket_name,
+            aws_access_key_id='example',
+            aws_secret_access_key='example',
+            use_blob_urls=False,
+            recursive_scan=True,
+        )
+        storage.save()
+
+        def iter_keys():
+            yield 'test0.json'
+            yield 'test1.json'
+            raise ConnectionError('listing failed')
+
+        with mock.patch.object(S3ImportStorage, 'iter_keys', side_effect=iter_keys):
+            storage.sync()
+
+        storage.refresh_from_db()
+        assert storage.status == storage.Status.FAILED
+        # objects parsed before the error are not lost with the unfinished batch
+        assert project.tasks.count() == 4
+        assert S3ImportStorageLink.objects.filter(storage=storage).count() == 4
+
+
 #
 # Unit tests for load_tasks_json()
 #
@@ -425,6 +496,73 @@ def test_list_jsonl_with_datetimes(storage):
     create_tasks(storage, list(output))
 
 
+def test_add_tasks_with_preds_and_annots(storage):
+    project, s3_storage = storage
+    output = list(load_tasks_json(json.dumps(annots_preds_task_list).encode(), 'test.json'))
+
+    tasks = S3ImportStorage.add_tasks(project, 1, 1, s3_storage, output, S3ImportStorageLink)
+
+    assert [t.inner_id for t in tasks] == [1, 2]
+    assert tasks[0].predictions.count() == 1
+    assert tasks[0].annotations.count() == 1
+    assert len(tasks[0].annotations.first().result) == 2
+    assert tasks[1].predictions.count() == 0
+    assert S3ImportStorageLink.objects.filter(storage=s3_storage).count() == 2
+
+
+def test_prefetch_keeps_key_order(storage):
+    _, s3_storage = storage
+    s3_storage.prefetch_workers = 4
+    keys = [f'task{i}.json' for i in range(20)]
+
+    def get_data(key):
+        # later keys finish first to check that results are returned in key order
+        time.sleep((20 - int(key[4:-5])) * 0.001)
+        if key == 'task13.json':
+            raise ValueError(key)
+        return [StorageObject(key=key, task_data={'text': key})]
+
+    with mock.patch.object(s3_storage, 'get_data', side_effect=get_data):
+        loaded = []
+        with pytest.raises(ValueError, match='task13.json'):
+            for key, link_objects in s3_storage._iter_keys_data(iter(keys)):
+                loaded.append(key)
+                assert link_objects[0].key == key
+
+    assert loaded == keys[:13]
+
+
+def test_prefetch_workers_per_storage(storage, settings):
+    _, s3_storage = storage
+    settings.STORAGE_IMPORT_PREFETCH_WORKERS = 4
+    s3_storage.prefetch_workers = 1
+    s3_storage.save()
+    s3_storage.refresh_from_db()
+
+    get_data = mock.Mock(side_effect=lambda key: [StorageObject(key=key, task_data={'text': key})])
+    with mock.patch.object(s3_storage, 'get_data', get_data), mock.patch(
+        'io_storages.base_models.ThreadPoolExecutor'
+    ) as executor:
+        assert [key for key, _ in s3_storage._iter_keys_data(iter(['a.json', 'b.json']))] == ['a.json', 'b.json']
+    # storage setting overrides the global one, 1 disables prefetching
+    executor.assert_not_called()
+
+
+def test_prefetch_is_disabled_by_default(storage):
+    from django.conf import settings
+
+    _, s3_storage = storage
+    assert settings.STORAGE_IMPORT_PREFETCH_WORKERS == 1
+    assert s3_storage.prefetch_workers is None
+
+    get_data = mock.Mock(side_effect=lambda key: [StorageObject(key=key, task_data={'text': key})])
+    with mock.patch.object(s3_storage, 'get_data', get_data), mock.patch(
+        'io_storages.base_models.ThreadPoolExecutor'
+    ) as executor:
+        assert [key for key, _ in s3_storage._iter_keys_data(iter(['a.json']))] == ['a.json']
+    executor.assert_not_called()
+
+
 def test_allow_skip_false_is_saved(storage):
     project, s3_storage = storage
     task_data = {
@@ -0,0 +1,26 @@
+from unittest.mock import patch
+
+import pytest
+from django.core.cache import cache
+from io_storages.tests.factories import S3ImportStorageFactory
+
+pytestmark = pytest.mark.django_db
+
+
+def test_presigned_urls_are_cached():
+    cache.clear()
+    storage = S3ImportStorageFactory(bucket='bucket', presign=True, presign_ttl=10)
+    with patch.object(type(storage), 'generate_http_url', side_effect=lambda url: url + '?signed') as generate:
+        assert storage.get_http_url('s3://bucket/a.jpg') == 's3://bucket/a.jpg?signed'
+        assert storage.get_http_url('s3://bucket/a.jpg') == 's3://bucket/a.jpg?signed'
+        assert storage.get_http_url('s3://bucket/b.jpg') == 's3://bucket/b.jpg?signed'
+    assert generate.call_count == 2
+
+
+def test_proxied_urls_are_not_cached():
+    cache.clear()
+    storage = S3ImportStorageFactory(bucket='bucket', presign=False)
+    with patch.object(type(storage), 'generate_http_url', return_value='data:image/jpeg;base64,') as generate:
+        storage.get_http_url('s3://bucket/a.jpg')
+        storage.get_http_url('s3://bucket/a.jpg')
+    assert generate.call_count == 2
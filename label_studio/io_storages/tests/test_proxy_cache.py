@@ -0,0 +1,137 @@
+import io
+from unittest.mock import MagicMock
+
+import pytest
+from django.core.cache import cache
+from io_storages.proxy_api import ResolveStorageUriAPIMixin
+from io_storages.proxy_cache import ProxyChunkCache
+
+CHUNK = 16
+
+
+class FakeStorage:
+    """Storage returning S3-like ranged responses of a bytes object"""
+
+    id = 1
+
+    def __init__(self, content, etag='etag1'):
+        self.content = content
+        self.etag = etag
+        self.ranges = []
+
+    def get_bytes_stream(self, uri, range_header=None):
+        start, end = range_header.split('=')[1].split('-')
+        start, end = int(start), min(int(end), len(self.content) - 1)
+        self.ranges.append((start, end))
+        stream = io.BytesIO(self.content[start : end + 1])
+        stream.iter_chunks = lambda chunk_size: iter(lambda: stream.read(chunk_size), b'')
+        metadata = {
+            'ETag': f'"{self.etag}"',
+            'ContentLength': end - start + 1,
+            'ContentRange': f'bytes {start}-{end}/{len(self.content)}',
+            'StatusCode': 206,
+        }
+        return stream, 'video/mp4', metadata
+
+
+@pytest.fixture
+def chunk_cache(tmp_path):
+    cache.clear()
+    return ProxyChunkCache(str(tmp_path), max_size=10 * CHUNK, chunk_size=CHUNK, meta_ttl=60)
+
+
+def test_overlapping_ranges_are_served_from_cache(chunk_cache):
+    content = bytes(range(100))
+    storage = FakeStorage(content)
+
+    data, meta, status = chunk_cache.get(storage, 's3://bucket/video.mp4', 10, 40)
+    assert data == content[10:41]
+    assert status == 'MISS'
+    assert meta['size'] == 100
+
+    # chunks are aligned, overlapping range doesn't touch storage
+    data, _, status = chunk_cache.get(storage, 's3://bucket/video.mp4', 20, 47)
+    assert data == content[20:48]
+    assert status == 'HIT'
+    assert storage.ranges == [(0, 16), (16, 48)]
+
+    # tail of the file is clamped by the object size
+    data, _, status = chunk_cache.get(storage, 's3://bucket/video.mp4', 90, 200)
+    assert data == content[90:]
+    assert status == 'MISS'
+    stats = chunk_cache.stats()
+    assert (stats['hits'], stats['misses']) == (2, 5)
+    assert stats['hit_rate'] == 2 / 7
+
+
+def test_changed_etag_invalidates_chunks(chunk_cache):
+    storage = FakeStorage(b'a' * 40)
+    assert chunk_cache.get(storage, 's3://bucket/file', 0, 39)[0] == b'a' * 40
+
+    storage.content, storage.etag = b'b' * 40, 'etag2'
+    # metadata expired
+    cache.clear()
+    data, meta, status = chunk_cache.get(storage, 's3://bucket/file', 0, 39)
+    assert data == b'b' * 40
+    assert meta['etag'] == 'etag2'
+    assert status == 'MISS'
+
+
+def test_lru_eviction(chunk_cache):
+    storage = FakeStorage(bytes(range(256)))
+    chunk_cache.get(storage, 's3://bucket/file', 0, 255)
+    stats = chunk_cache.stats()
+    assert stats['evictions'] > 0
+    assert stats['size'] <= 10 * CHUNK
+
+
+def test_proxy_serves_range_from_chunk_cache(chunk_cache, settings):
+    settings.RESOLVER_PROXY_CHUNK_CACHE_ENABLED = True
+    settings.RESOLVER_PROXY_CHUNK_CACHE_DIR = chunk_cache.directory
+    settings.RESOLVER_PROXY_CHUNK_CACHE_CHUNK_SIZE = CHUNK
+    content = bytes(range(100))
+    storage = FakeStorage(content)
+    request = MagicMock()
+    request.headers = {'Range': 'bytes=5-30'}
+    project = MagicMock()
+    project.has_permission.return_value = True
+
+    mixin = ResolveStorageUriAPIMixin()
+    response = mixin.proxy_data_from_storage(request, 's3://bucket/video.mp4', project, storage)
+    assert response.status_code == 206
+    assert response.content == content[5:31]
+    assert response.headers['Content-Range'] == 'bytes 5-30/100'
+    assert response.headers['X-Proxy-Cache'] == 'MISS'
+
+    response = mixin.proxy_data_from_storage(request, 's3://bucket/video.mp4', project, storage)
+    assert response.content == content[5:31]
+    assert response.headers['X-Proxy-Cache'] == 'HIT'
+
+
+def test_size_includes_chunks_of_other_workers(chunk_cache, tmp_path):
+    storage = FakeStorage(bytes(range(256)))
+    # another worker has filled the shared directory
+    other_worker = ProxyChunkCache(str(tmp_path), max_size=10 * CHUNK, chunk_size=CHUNK, meta_ttl=60)
+    other_worker.get(storage, 's3://bucket/other', 0, 9 * CHUNK - 1)
+    assert chunk_cache.size == 0
+
+    chunk_cache.scanned_at = 0
+    chunk_cache.get(storage, 's3://bucket/file', 0, 2 * CHUNK - 1)
+    # the re-scan finds chunks of both workers and evicts the least recently used ones
+    assert chunk_cache.stats()['evictions'] > 0
+    assert chunk_cache.size <= 10 * CHUNK
+
+
+def test_header_probe_bypasses_chunk_cache(chunk_cache, settings):
+    settings.RESOLVER_PROXY_CHUNK_CACHE_ENABLED = True
+    settings.RESOLVER_PROXY_CHUNK_CACHE_DIR = chunk_cache.directory
+    settings.RESOLVER_PROXY_CHUNK_CACHE_CHUNK_SIZE = CHUNK
+    storage = FakeStorage(bytes(range(100)))
+    request = MagicMock()
+    request.headers = {'Range': 'bytes=0-0'}
+    project = MagicMock()
+    project.has_permission.return_value = True
+
+    response = ResolveStorageUriAPIMixin().proxy_data_from_storage(request, 's3://bucket/video.mp4', project, storage)
+    assert 'X-Proxy-Cache' not in response.headers
+    assert storage.ranges == [(0, 0)]
@@ -0,0 +1,48 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+"""
+import logging
+
+from core.redis import redis_connected, start_job_async_or_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from ml.models import MLBackend, MLTrainingCounter
+
+logger = logging.getLogger(__name__)
+
+
+def count_annotations_for_training(project, count=1):
+    """Add created annotations to the project training counter after commit,
+    schedule ML backends training every `min_annotations_to_start_training` annotations.
+
+    The counter row is updated outside of the annotation transaction, so it's locked only for the increment
+    and concurrent annotators of the project don't wait for each other's commits.
+    """
+    # annotations can be saved without project, e.g. in old data
+    step = project and project.min_annotations_to_start_training
+    if not step or count <= 0:
+        return
+    transaction.on_commit(lambda: _increment_training_counter(project, count, step))
+
+
+def _increment_training_counter(project, count, step):
+    previous, current = MLTrainingCounter.increment(project, count)
+    if current // step > previous // step:
+        logger.debug(f'Project {project.id} reached {current} annotations, training is scheduled')
+        schedule_training(project)
+
+
+def schedule_training(project):
+    """Start training of project ML backends after ML_TRAINING_DEBOUNCE seconds,
+    triggers coming before it starts don't schedule another training.
+    Without Redis training runs immediately as there are no delayed jobs.
+    """
+    debounce = settings.ML_TRAINING_DEBOUNCE if redis_connected() else 0
+    if debounce > 0 and not cache.add(f'ml:training_scheduled:{project.id}', True, debounce):
+        return
+    start_job_async_or_sync(train_ml_backends, project.id, in_seconds=debounce)
+
+
+def train_ml_backends(project_id, **kwargs):
+    for ml_backend in MLBackend.objects.filter(project_id=project_id):
+        ml_backend.train()
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("ml", "0007_auto_20240314_1957"),
+        ("projects", "0035_projectsummarycounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MLTrainingCounter",
+            fields=[
+                (
+                    "project",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="ml_training_counter",
+                        serialize=False,
+                        to="projects.project",
+                    ),
+                ),
+                (
+                    "annotations",
+                    models.BigIntegerField(
+                        default=0,
+                        help_text="Number of created annotations",
+                        verbose_name="annotations",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -3,16 +3,16 @@
 import logging
 from typing import Dict, List
 
-from core.utils.common import conditional_atomic, db_is_not_sqlite, load_func
+from core.utils.common import load_func
 from django.conf import settings
-from django.db import models, transaction
-from django.db.models import Count, JSONField, Q
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, JSONField, Q
 from django.db.models.signals import post_save, pre_delete
 from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 from ml.api_connector import PREDICT_URL, TIMEOUT_PREDICT, MLApi
 from projects.models import Project
-from tasks.serializers import PredictionSerializer, TaskSimpleSerializer
+from tasks.serializers import TaskSimpleSerializer
 from webhooks.serializers import Webhook, WebhookSerializer
 
 logger = logging.getLogger(__name__)
@@ -134,6 +134,8 @@ class MLBackend(models.Model):
     def __init__(self, *args, **kwargs):
         super(MLBackend, self).__init__(*args, **kwargs)
         self.__original_title = self.title
+        # set when ML backend answers a batch with a single result, see _get_predictions_from_ml_backend_one_by_one
+        self.batch_unsupported = False
 
     def save(self, *args, **kwargs):
         """
@@ -259,7 +261,7 @@ class MLBackend(models.Model):
         }
 
     def _get_predictions_from_ml_backend_one_by_one(
-        self, serialized_tasks: List[Dict], current_responses: List[Dict]
+        self, serialized_tasks: List[Dict], current_responses: List[Dict], api: MLApi = None
     ) -> List[Dict]:
         """
         This is helper method to get predictions from ML backend one by one
@@ -274,10 +276,11 @@ class MLBackend(models.Model):
                 f"'ML backend '{self.title}' doesn't support batch processing of tasks, "
                 f'switched to one-by-one task retrieval'
             )
+            self.batch_unsupported = True
             predictions = []
             for serialized_task in serialized_tasks:
                 # get predictions per task
-                predictions.extend(self._get_predictions_from_ml_backend([serialized_task]))
+                predictions.extend(self._get_predictions_from_ml_backend([serialized_task], api=api))
 
             return predictions
         else:
@@ -289,8 +292,8 @@ class MLBackend(models.Model):
             )
             return []
 
-    def _get_predictions_from_ml_backend(self, serialized_tasks: List[Dict]) -> List[Dict]:
-        result = self.api.make_predictions(serialized_tasks, self.project)
+    def _get_predictions_from_ml_backend(self, serialized_tasks: List[Dict], api: MLApi = None) -> List[Dict]:
+        result = (api or self.api).make_predictions(serialized_tasks, self.project)
 
         # response validation
         if result.is_error:
@@ -312,7 +315,7 @@ class MLBackend(models.Model):
             # Number of tasks and responses are not equal
             # It can happen if ML backend doesn't support batch processing but only process one task at a time
             # In the future versions, we may better consider this as an error and deprecate this code branch
-            return self._get_predictions_from_ml_backend_one_by_one(serialized_tasks, responses)
+            return self._get_predictions_from_ml_backend_one_by_one(serialized_tasks, responses, api=api)
 
         # ML backend supports batch processing
         for task, response in zip(serialized_tasks, responses):
@@ -357,13 +360,10 @@ class MLBackend(models.Model):
         if not tasks.exists():
             logger.debug(f'All tasks already have prediction from model version={self.model_version}')
             return model_version
-        tasks_ser = TaskSimpleSerializer(tasks, many=True).data
-        predictions = self._get_predictions_from_ml_backend(tasks_ser)
-        with conditional_atomic(predicate=db_is_not_sqlite):
-            prediction_ser = PredictionSerializer(data=predictions, many=True)
-            prediction_ser.is_valid(raise_exception=True)
-            instances = prediction_ser.save()
-        return instances
+
+        from ml.runner import PredictionRunner
+
+        return PredictionRunner(self).run(tasks)
 
     def interactive_annotating(self, task, context=None, user=None):
         result = {}
@@ -479,6 +479,33 @@ class MLBackendTrainJob(models.Model):
         return status['job_status'] in ('queued', 'started')
 
 
+class MLTrainingCounter(models.Model):
+    """Monotonic number of created project annotations, it drives `min_annotations_to_start_training` triggers"""
+
+    project = models.OneToOneField(
+        Project, primary_key=True, on_delete=models.CASCADE, related_name='ml_training_counter'
+    )
+    annotations = models.BigIntegerField(_('annotations'), default=0, help_text='Number of created annotations')
+
+    @classmethod
+    def increment(cls, project, count):
+        """Add count of created annotations, return (previous, current) counter values"""
+        with transaction.atomic():
+            if not cls.objects.filter(project=project).update(annotations=F('annotations') + count):
+                try:
+                    with transaction.atomic():
+                        # first use: start from existing annotations, the created ones are already there
+                        current = project.annotations.count()
+                        cls.objects.create(project=project, annotations=current)
+                        return current - count, current
+                except IntegrityError:
+                    # created concurrently
+                    cls.objects.filter(project=project).update(annotations=F('annotations') + count)
+            # the row is locked by the update until commit, so nobody else changed it
+            current = cls.objects.filter(project=project).values_list('annotations', flat=True).get()
+        return current - count, current
+
+
 def _validate_ml_api_result(ml_api_result, tasks, curr_logger):
     if ml_api_result.is_error:
         curr_logger.info(ml_api_result.error_message)
@@ -0,0 +1,146 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+"""
+import hashlib
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from core.utils.common import conditional_atomic, db_is_not_sqlite
+from django.conf import settings
+from django.core.cache import cache
+from tasks.functions import update_tasks_counters
+from tasks.models import Prediction, Task
+from tasks.serializers import PredictionSerializer, TaskSimpleSerializer
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_TTL = 24 * 60 * 60
+
+
+class PredictionRunner:
+    """Retrieve predictions for many tasks from ML backend.
+
+    Tasks are streamed by id in batches of `batch_size`, up to `concurrency` /predict requests are in flight
+    over a shared session, and the next batch isn't read until a slot is free. Predictions are bulk-inserted
+    per batch in task order, the last saved task id is checkpointed, so a restarted run continues after it.
+    """
+
+    def __init__(self, ml_backend, batch_size=None, concurrency=None):
+        self.ml_backend = ml_backend
+        # loaded here, so worker threads don't query it
+        self.project = ml_backend.project
+        self.batch_size = batch_size or settings.ML_PREDICT_BATCH_SIZE
+        self.concurrency = concurrency or settings.ML_PREDICT_CONCURRENCY
+        self.stats = {'tasks': 0, 'predictions': 0, 'batches': 0, 'failed_batches': 0, 'invalid_predictions': 0}
+        self.latencies = []
+        # one API client per run, so concurrent requests share the connection pool of its session
+        self.api = ml_backend.api
+
+    def get_checkpoint_key(self, tasks):
+        query_hash = hashlib.md5(str(tasks.query).encode()).hexdigest()
+        return f'ml_backend:{self.ml_backend.id}:predict:{self.ml_backend.model_version}:{query_hash}'
+
+    def get_batch(self, tasks, last_id):
+        batch_ids = list(tasks.order_by('id').filter(id__gt=last_id).values_list('id', flat=True)[: self.batch_size])
+        return list(
+            Task.objects.filter(id__in=batch_ids)
+            .order_by('id')
+            .select_related('project')
+            .prefetch_related('annotations', 'predictions')
+        )
+
+    def predict(self, serialized_tasks):
+        start = time.monotonic()
+        predictions = self.ml_backend._get_predictions_from_ml_backend(serialized_tasks, api=self.api)
+        return predictions, time.monotonic() - start
+
+    def save(self, task_ids, predictions):
+        """Validate predictions one by one, invalid ones are skipped, and bulk-insert the rest"""
+        project = self.project
+        objs = []
+        for prediction in predictions:
+            serializer = PredictionSerializer(data=prediction)
+            if not serializer.is_valid():
+                logger.warning(
+                    f'ML backend {self.ml_backend}: invalid prediction for task {prediction.get("task")}: '
+                    f'{serializer.errors}'
+                )
+                self.stats['invalid_predictions'] += 1
+                continue
+            obj = Prediction(**serializer.validated_data)
+            obj.result = Prediction.prepare_prediction_result(obj.result, project)
+            objs.append(obj)
+
+        with conditional_atomic(predicate=db_is_not_sqlite):
+            created = Prediction.objects.bulk_create(objs, batch_size=settings.BATCH_SIZE)
+            update_tasks_counters(Task.objects.filter(id__in=task_ids))
+        return created
+
+    def run(self, tasks):
+        """Retrieve and save predictions for tasks queryset, return created predictions"""
+        checkpoint_key = self.get_checkpoint_key(tasks)
+        checkpoint = cache.get(checkpoint_key, 0)
+        if checkpoint:
+            logger.info(f'ML backend {self.ml_backend}: resuming predictions after task {checkpoint}')
+
+        start = time.monotonic()
+        created = []
+        in_flight = deque()
+
+        def drain(keep):
+            while len(in_flight) > keep:
+                task_ids, future = in_flight.popleft()
+                try:
+                    predictions, latency = future.result()
+                    created.extend(self.save(task_ids, predictions))
+                except Exception as exc:
+                    logger.error(f'ML backend {self.ml_backend}: batch of {len(task_ids)} tasks failed: {exc}')
+                    self.stats['failed_batches'] += 1
+                    continue
+                self.latencies.append(latency)
+                self.stats['batches'] += 1
+                self.stats['tasks'] += len(task_ids)
+                # failed tasks must be retried by the next run, so the checkpoint stops before them
+                if not self.stats['failed_batches']:
+                    cache.set(checkpoint_key, task_ids[-1], CHECKPOINT_TTL)
+
+        last_id, first_batch = checkpoint, True
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            while True:
+                # backpressure: don't read next batch until there is a free request slot
+                drain(self.concurrency - 1)
+                batch = self.get_batch(tasks, last_id)
+                if not batch:
+                    break
+                last_id = batch[-1].id
+                serialized_tasks = TaskSimpleSerializer(batch, many=True).data
+                in_flight.append(([task.id for task in batch], executor.submit(self.predict, serialized_tasks)))
+                if first_batch:
+                    # batch support is detected by the first response, before other batches are sent
+                    first_batch = False
+                    drain(0)
+                    if self.ml_backend.batch_unsupported:
+                        # ML backend without batch support: send single tasks concurrently instead of a serial loop
+                        self.batch_size = 1
+            drain(0)
+
+        if not self.stats['failed_batches']:
+            cache.delete(checkpoint_key)
+        self.stats['predictions'] = len(created)
+        self.stats.update(self.get_timing_stats(time.monotonic() - start))
+        logger.info(f'ML backend {self.ml_backend}: predictions retrieved {self.stats}')
+        return created
+
+    def get_timing_stats(self, duration):
+        latencies = sorted(self.latencies)
+        stats = {'duration': round(duration, 3), 'tasks_per_second': round(self.stats['tasks'] / duration, 2)}
+        if latencies:
+            stats.update(
+                {
+                    'latency_avg': round(sum(latencies) / len(latencies), 3),
+                    'latency_p95': round(latencies[int(0.95 * (len(latencies) - 1))], 3),
+                    'latency_max': round(latencies[-1], 3),
+                }
+            )
+        return stats
@@ -1,8 +1,6 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license."""
 
 import logging
-import os
-import pathlib
 
 from core.feature_flags import flag_set
 from core.filters import ListFilter
@@ -13,14 +11,15 @@ from core.redis import start_job_async_or_sync
 from core.utils.common import paginator, paginator_help, temporary_disconnect_all_signals
 from core.utils.exceptions import LabelStudioDatabaseException, ProjectExistException
 from core.utils.filterset_to_openapi_params import filterset_to_openapi_params
-from core.utils.io import find_dir, find_file, read_yaml
 from core.utils.serializer_to_openapi_params import serializer_to_openapi_params
 from data_manager.functions import filters_ordering_selected_items_exist, get_prepared_queryset
 from django.conf import settings
 from django.db import IntegrityError
 from django.db.models import F
 from django.http import Http404
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import method_decorator
+from django.utils.http import quote_etag
 from django_filters import CharFilter, FilterSet
 from django_filters.rest_framework import DjangoFilterBackend
 from drf_spectacular.types import OpenApiTypes
@@ -42,6 +41,7 @@ from projects.serializers import (
     ProjectSerializer,
     ProjectSummarySerializer,
 )
+from projects.template_catalog import sample_task_cache, template_catalog
 from rest_framework import filters, generics, status
 from rest_framework.exceptions import NotFound
 from rest_framework.exceptions import ValidationError as RestValidationError
@@ -568,6 +568,11 @@ class ProjectSummaryAPI(generics.RetrieveAPIView):
     permission_required = all_permissions.projects_view
     queryset = ProjectSummary.objects.all()
 
+    def get_object(self):
+        summary = super(ProjectSummaryAPI, self).get_object()
+        summary.fold_counters()
+        return summary
+
     @extend_schema(exclude=True)
     def get(self, *args, **kwargs):
         return super(ProjectSummaryAPI, self).get(*args, **kwargs)
@@ -764,40 +769,17 @@ class ProjectTaskListAPI(GetParentObjectMixin, generics.ListCreateAPIView, gener
         return instance
 
 
-def read_templates_and_groups():
-    annotation_templates_dir = find_dir('annotation_templates')
-    configs = []
-    for config_file in pathlib.Path(annotation_templates_dir).glob('**/*.yml'):
-        config = read_yaml(config_file)
-
-        if settings.VERSION_EDITION != 'Community':
-            if config.get('group', '').lower() == 'community contributions':
-                continue
-
-        if config.get('image', '').startswith('/static') and settings.HOSTNAME:
-            # if hostname set manually, create full image urls
-            config['image'] = settings.HOSTNAME + config['image']
-        configs.append(config)
-    template_groups_file = find_file(os.path.join('annotation_templates', 'groups.txt'))
-    with open(template_groups_file, encoding='utf-8') as f:
-        groups = f.read().splitlines()
-
-    if settings.VERSION_EDITION != 'Community':
-        groups = [group for group in groups if group.lower() != 'community contributions']
-
-    logger.debug(f'{len(configs)} templates found.')
-    return {'templates': configs, 'groups': groups}
-
-
 @extend_schema(exclude=True)
 class TemplateListAPI(generics.ListAPIView):
     parser_classes = (JSONParser, FormParser, MultiPartParser)
     permission_required = all_permissions.projects_view
-    # load this once in memory for performance
-    templates_and_groups = read_templates_and_groups()
 
     def list(self, request, *args, **kwargs):
-        return Response(self.templates_and_groups)
+        templates_and_groups, etag = template_catalog.get()
+        etag = quote_etag(etag)
+        response = get_conditional_response(request, etag=etag) or Response(templates_and_groups)
+        response['ETag'] = etag
+        return response
 
 
 @extend_schema(exclude=True)
@@ -816,24 +798,41 @@ class ProjectSampleTask(generics.RetrieveAPIView):
 
         project = self.get_object()
 
+        key = sample_task_cache.key(label_config, include_annotation_and_prediction)
+        sample_task = sample_task_cache.get(key)
+        if sample_task is None:
+            sample_task, cacheable = self.generate_sample_task(
+                project, label_config, include_annotation_and_prediction
+            )
+            if cacheable and sample_task is not None:
+                sample_task_cache.set(key, sample_task)
+
+        if include_annotation_and_prediction and sample_task:
+            # set the annotation's user id to the current user instead of -1
+            user_id = request.user.id
+            for annotation in sample_task.get('annotations') or []:
+                annotation['completed_by'] = user_id
+
+        response = Response({'sample_task': sample_task}, status=200)
+        response['ETag'] = quote_etag(f'{key}:{request.user.id}')
+        return response
+
+    @staticmethod
+    def generate_sample_task(project, label_config, include_annotation_and_prediction):
+        """Return (sample task, cacheable), fallback results are not cached"""
         if include_annotation_and_prediction:
             try:
                 label_interface = LabelInterface(label_config)
-                complete_task = label_interface.generate_complete_sample_task(raise_on_failure=True)
-                # set the annotation's user id to the current user instead of -1
-                user_id = request.user.id
-                for annotation in complete_task['annotations']:
-                    annotation['completed_by'] = user_id
-                return Response({'sample_task': complete_task}, status=200)
+                return label_interface.generate_complete_sample_task(raise_on_failure=True), True
             except Exception as e:
                 logger.error(
                     f'Error generating enhanced sample task, falling back to original method: {str(e)}. Label config: {label_config}'
                 )
                 # Fallback to project.get_sample_task if LabelInterface.generate_complete_sample_task failed
-                return Response({'sample_task': project.get_sample_task(label_config)}, status=200)
+                return project.get_sample_task(label_config), False
         else:
             # Use the simple sample task generation method
-            return Response({'sample_task': project.get_sample_task(label_config)}, status=200)
+            return project.get_sample_task(label_config), True
 
 
 @extend_schema(exclude=True)
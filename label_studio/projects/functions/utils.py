@@ -96,9 +96,11 @@ def recalculate_created_annotations_and_labels_from_scratch(
     logger.info(f'Reset cache started for project {project.id} and organization {organization_id}')
     logger.info(f'recalculate_created_annotations_and_labels_from_scratch project_id={project.id}')
     summary.all_data_columns = {}
+    summary.data_column_types = {}
     summary.common_data_columns = []
     summary.update_data_columns(project.tasks.only('data'))
 
+    project.summary_counters.all().delete()
     summary.created_labels, summary.created_annotations = {}, {}
     summary.update_created_annotations_and_labels(project.annotations.all())
 
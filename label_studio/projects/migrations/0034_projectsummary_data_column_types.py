@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0033_projects_soft_delete_indexes_async"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="projectsummary",
+            name="data_column_types",
+            field=models.JSONField(
+                default=dict,
+                help_text="Value types of data columns found in imported tasks",
+                null=True,
+                verbose_name="data column types",
+            ),
+        ),
+    ]
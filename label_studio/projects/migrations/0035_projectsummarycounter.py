@@ -0,0 +1,75 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("projects", "0034_projectsummary_data_column_types"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProjectSummaryCounter",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        help_text="ProjectSummary field the counter belongs to",
+                        max_length=32,
+                        verbose_name="field",
+                    ),
+                ),
+                (
+                    "from_name",
+                    models.TextField(
+                        blank=True,
+                        default="",
+                        help_text="Control tag name for labels",
+                        verbose_name="from name",
+                    ),
+                ),
+                (
+                    "key",
+                    models.TextField(
+                        blank=True,
+                        default="",
+                        help_text="Annotation tuple or label",
+                        verbose_name="key",
+                    ),
+                ),
+                (
+                    "shard",
+                    models.PositiveSmallIntegerField(default=0, verbose_name="shard"),
+                ),
+                ("count", models.IntegerField(default=0, verbose_name="count")),
+                (
+                    "project",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="summary_counters",
+                        to="projects.project",
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("project", "field", "from_name", "key", "shard"),
+                        name="unique_project_summary_counter",
+                    )
+                ],
+            },
+        ),
+    ]
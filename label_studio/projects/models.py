@@ -2,6 +2,8 @@
 """
 import json
 import logging
+import random
+from collections import Counter
 from typing import Any, Mapping, Optional
 
 from annoying.fields import AutoOneToOneField
@@ -29,9 +31,10 @@ from core.utils.db import batch_update_with_retry, fast_first, has_column_cached
 from django.conf import settings
 from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MaxLengthValidator, MinLengthValidator
-from django.db import connection, models, transaction
-from django.db.models import Avg, BooleanField, Case, Count, GeneratedField, JSONField, Max, Q, Sum, Value, When
+from django.db import IntegrityError, connection, models, transaction
+from django.db.models import Avg, BooleanField, Case, Count, F, GeneratedField, JSONField, Max, Q, Sum, Value, When
 from django.db.models.expressions import RawSQL
+from django.db.models.functions import Collate
 from django.utils.functional import cached_property
 from django.utils.translation import gettext_lazy as _
 from fsm.models import FsmHistoryStateModel
@@ -655,6 +658,8 @@ class Project(ProjectMixin, FsmHistoryStateModel):
                 summary.reset(tasks_data_based=False)
                 return
 
+            self.summary.fold_counters()
+
         # validate annotations consistency
         annotations_from_config = set(get_all_control_tag_tuples(config_string))
         if not annotations_from_config:
@@ -836,6 +841,7 @@ class Project(ProjectMixin, FsmHistoryStateModel):
             f'Label config has changed: {label_config_has_changed}, original: {self.__original_label_config}, new: {self.label_config}'
         )
 
+        previous_data_key = next(iter(self.data_types or {}), None)
         if label_config_has_changed or project_with_config_just_created:
             self.data_types = extract_data_types(self.label_config)
             self.parsed_label_config = parse_config(self.label_config)
@@ -859,6 +865,9 @@ class Project(ProjectMixin, FsmHistoryStateModel):
         if label_config_has_changed:
             # save the new label config for future comparison
             self.__original_label_config = self.label_config
+            # $undefined$ data key is hashed as the first data key of the config, see Task.get_data_hash()
+            if exists and previous_data_key != next(iter(self.data_types or {}), None):
+                self.tasks.filter(data__has_key=settings.DATA_UNDEFINED_NAME).update(data_hash=None)
             # if tasks are already imported, emit signal that project is configured and ready for labeling
             if self.num_tasks > 0:
                 logger.debug(f'Sending post_label_config_and_import_tasks signal for project {self.id}')
@@ -1156,7 +1165,7 @@ class Project(ProjectMixin, FsmHistoryStateModel):
 
         if storage:
             return {
-                'url': storage.generate_http_url(url),
+                'url': storage.get_http_url(url),
                 'presign_ttl': storage.presign_ttl,
             }
 
@@ -1388,6 +1397,13 @@ class ProjectSummary(models.Model):
     all_data_columns = JSONField(
         _('all data columns'), null=True, default=dict, help_text='All data columns found in imported tasks'
     )
+    # { col1: 'str', col2: 'list' }, python type of the first non-null value of each column
+    data_column_types = JSONField(
+        _('data column types'),
+        null=True,
+        default=dict,
+        help_text='Value types of data columns found in imported tasks',
+    )
     # [col1, col2]
     common_data_columns = JSONField(
         _('common data columns'), null=True, default=list, help_text='Common data columns found across imported tasks'
@@ -1412,15 +1428,18 @@ class ProjectSummary(models.Model):
     def reset(self, tasks_data_based=True):
         if tasks_data_based:
             self.all_data_columns = {}
+            self.data_column_types = {}
             self.common_data_columns = []
         self.created_annotations = {}
         self.created_labels = {}
         self.created_labels_drafts = {}
         self.save()
+        ProjectSummaryCounter.objects.filter(project_id=self.project_id).delete()
 
     def update_data_columns(self, tasks):
         common_data_columns = set()
         all_data_columns = dict(self.all_data_columns)
+        data_column_types = dict(self.data_column_types or {})
         for task in tasks:
             try:
                 task_data = get_attr_or_item(task, 'data')
@@ -1429,17 +1448,20 @@ class ProjectSummary(models.Model):
             task_data_keys = task_data.keys()
             for column in task_data_keys:
                 all_data_columns[column] = all_data_columns.get(column, 0) + 1
+                if data_column_types.get(column, 'NoneType') == 'NoneType':
+                    data_column_types[column] = type(task_data[column]).__name__
             if not common_data_columns:
                 common_data_columns = set(task_data_keys)
             else:
                 common_data_columns &= set(task_data_keys)
 
         self.all_data_columns = all_data_columns
+        self.data_column_types = data_column_types
         if not self.common_data_columns:
             self.common_data_columns = list(sorted(common_data_columns))
         else:
             self.common_data_columns = list(sorted(set(self.common_data_columns) & common_data_columns))
-        self.save(update_fields=['all_data_columns', 'common_data_columns'])
+        self.save(update_fields=['all_data_columns', 'data_column_types', 'common_data_columns'])
 
     def remove_data_columns(self, tasks):
         all_data_columns = dict(self.all_data_columns)
@@ -1457,13 +1479,17 @@ class ProjectSummary(models.Model):
 
         if keys_to_remove:
             common_data_columns = list(self.common_data_columns)
+            data_column_types = dict(self.data_column_types or {})
             for key in keys_to_remove:
                 if key in common_data_columns:
                     common_data_columns.remove(key)
+                data_column_types.pop(key, None)
             self.common_data_columns = common_data_columns
+            self.data_column_types = data_column_types
         self.save(
             update_fields=[
                 'all_data_columns',
+                'data_column_types',
                 'common_data_columns',
             ]
         )
@@ -1533,6 +1559,11 @@ class ProjectSummary(models.Model):
     def remove_created_annotations_and_labels(self, annotations):
         # we are going to remove all annotations, so we'll reset the corresponding fields on the summary
         remove_all_annotations = self.project.annotations.count() == len(annotations)
+        if remove_all_annotations:
+            ProjectSummaryCounter.objects.filter(project_id=self.project_id).delete()
+        else:
+            # counters of removed annotations can be still pending
+            self.fold_counters()
         created_annotations, created_labels = (
             ({}, {}) if remove_all_annotations else (dict(self.created_annotations), dict(self.created_labels))
         )
@@ -1570,6 +1601,83 @@ class ProjectSummary(models.Model):
         self.created_labels = created_labels
         self.save(update_fields=['created_annotations', 'created_labels'])
 
+    def add_created_annotations_and_labels(self, annotations, sign=1):
+        """Add (sign=1) or subtract (sign=-1) annotations to created_annotations and created_labels.
+
+        With PROJECT_SUMMARY_COUNTER_SHARDS the changes are written as increments of ProjectSummaryCounter rows,
+        so concurrent annotation saves don't lock and rewrite the summary row, see fold_counters().
+        """
+        if not settings.PROJECT_SUMMARY_COUNTER_SHARDS:
+            if sign > 0:
+                self.update_created_annotations_and_labels(annotations)
+            else:
+                self.remove_created_annotations_and_labels(annotations)
+            return
+
+        deltas = Counter()
+        for annotation in annotations:
+            results = get_attr_or_item(annotation, 'result') or []
+            if not isinstance(results, list):
+                continue
+
+            for result in results:
+                key = self._get_annotation_key(result)
+                if not key:
+                    continue
+                from_name = result['from_name']
+                deltas[(ProjectSummaryCounter.CREATED_ANNOTATIONS, '', key)] += sign
+                # from_name without label: keeps empty labels dict like update_created_annotations_and_labels does
+                deltas[(ProjectSummaryCounter.CREATED_LABELS, from_name, '')] += sign
+                for label in self._get_labels(result):
+                    deltas[(ProjectSummaryCounter.CREATED_LABELS, from_name, label)] += sign
+
+        ProjectSummaryCounter.increment(self.project_id, deltas)
+
+    def fold_counters(self):
+        """Move pending ProjectSummaryCounter increments into created_annotations and created_labels"""
+        counters = ProjectSummaryCounter.objects.filter(project_id=self.project_id)
+        if not counters.exists():
+            return
+
+        with transaction.atomic():
+            summary = (
+                ProjectSummary.objects.select_for_update()
+                .only('created_annotations', 'created_labels')
+                .get(project_id=self.project_id)
+            )
+            # locked rows can't be incremented until they are deleted, so no increment is lost;
+            # rows are locked in the key order of ProjectSummaryCounter.increment() to avoid deadlocks
+            folded = list(counters.select_for_update().order_by(*ProjectSummaryCounter.lock_order()))
+            totals = Counter()
+            for counter in folded:
+                totals[(counter.field, counter.from_name, counter.key)] += counter.count
+
+            created_annotations = dict(summary.created_annotations or {})
+            created_labels = {from_name: dict(labels) for from_name, labels in (summary.created_labels or {}).items()}
+            for (field, from_name, key), count in totals.items():
+                if field == ProjectSummaryCounter.CREATED_ANNOTATIONS:
+                    value = created_annotations.pop(key, 0) + count
+                    if value > 0:
+                        created_annotations[key] = value
+                elif key and (count > 0 or from_name in created_labels):
+                    labels = created_labels.setdefault(from_name, {})
+                    value = labels.pop(key, 0) + count
+                    if value > 0:
+                        labels[key] = value
+            # apply from_name markers after labels, removed from_name disappears when it has no labels left
+            for (field, from_name, key), count in totals.items():
+                if field == ProjectSummaryCounter.CREATED_LABELS and not key:
+                    if count > 0:
+                        created_labels.setdefault(from_name, {})
+                    elif not created_labels.get(from_name, True):
+                        created_labels.pop(from_name)
+
+            self.created_annotations = created_annotations
+            self.created_labels = created_labels
+            self.save(update_fields=['created_annotations', 'created_labels'])
+            ProjectSummaryCounter.objects.filter(id__in=[counter.id for counter in folded]).delete()
+        logger.debug(f'Folded {len(folded)} summary counters for project {self.project_id}')
+
     def update_created_labels_drafts(self, drafts):
         labels = dict(self.created_labels_drafts)
         for draft in drafts:
@@ -1622,6 +1730,58 @@ class ProjectSummary(models.Model):
         self.save(update_fields=['created_labels_drafts'])
 
 
+class ProjectSummaryCounter(models.Model):
+    """Pending increments of ProjectSummary.created_annotations and created_labels.
+
+    Every key is spread over PROJECT_SUMMARY_COUNTER_SHARDS rows, so annotators of one project
+    rarely wait for the same row lock. ProjectSummary.fold_counters() moves them into the summary.
+    """
+
+    CREATED_ANNOTATIONS = 'created_annotations'
+    CREATED_LABELS = 'created_labels'
+
+    project = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='summary_counters')
+    field = models.CharField(_('field'), max_length=32, help_text='ProjectSummary field the counter belongs to')
+    from_name = models.TextField(_('from name'), blank=True, default='', help_text='Control tag name for labels')
+    key = models.TextField(_('key'), blank=True, default='', help_text='Annotation tuple or label')
+    shard = models.PositiveSmallIntegerField(_('shard'), default=0)
+    count = models.IntegerField(_('count'), default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['project', 'field', 'from_name', 'key', 'shard'], name='unique_project_summary_counter'
+            )
+        ]
+
+    @classmethod
+    def increment(cls, project_id, deltas):
+        """Atomically add {(field, from_name, key): delta} to the counters of a random shard.
+
+        Rows are updated in sorted key order, so concurrent transactions take their locks in the same order.
+        """
+        shard = random.randrange(settings.PROJECT_SUMMARY_COUNTER_SHARDS)
+        for (field, from_name, key), delta in sorted(deltas.items()):
+            if not delta:
+                continue
+            lookup = dict(project_id=project_id, field=field, from_name=from_name, key=key, shard=shard)
+            if cls.objects.filter(**lookup).update(count=F('count') + delta):
+                continue
+            try:
+                with transaction.atomic():
+                    cls.objects.create(count=delta, **lookup)
+            except IntegrityError:
+                # created concurrently
+                cls.objects.filter(**lookup).update(count=F('count') + delta)
+
+    @staticmethod
+    def lock_order():
+        """Row order matching sorted() of (field, from_name, key) tuples: text is compared by code points"""
+        if connection.vendor == 'postgresql':
+            return [Collate('field', 'C'), Collate('from_name', 'C'), Collate('key', 'C'), 'shard']
+        return ['field', 'from_name', 'key', 'shard']
+
+
 class ProjectImport(models.Model):
     class Status(models.TextChoices):
         CREATED = 'created', _('Created')
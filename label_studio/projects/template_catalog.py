@@ -0,0 +1,185 @@
+"""This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
+
+Catalog of labeling config templates from label_studio/annotation_templates
+and in-memory cache of sample tasks generated for labeling configs.
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import pathlib
+import threading
+import uuid
+from collections import OrderedDict
+
+from core.utils.io import find_dir, read_yaml
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+GROUPS_FILE = 'groups.txt'
+SAMPLE_TASKS_CACHE_SIZE = 256
+
+
+class TemplateCatalog:
+    """Templates and groups loaded on first access instead of URLconf import.
+
+    Parsed YAML files are stored in a JSON manifest together with mtimes of the source files.
+    The manifest is generated next to the templates at build time (`manage.py build_templates_manifest`),
+    when any template is added, removed or changed it's considered stale and templates are parsed again.
+    The running server doesn't write to the templates directory, which is often read-only,
+    the parsed templates are saved to TEMPLATES_MANIFEST_CACHE_PATH instead.
+    """
+
+    def __init__(self, directory=None, manifest_path=None, cache_path=None):
+        self._directory = directory
+        self._manifest_path = manifest_path
+        self._cache_path = cache_path
+        self._lock = threading.Lock()
+        self._payload = None
+        self._etag = None
+
+    @property
+    def directory(self):
+        if self._directory is None:
+            self._directory = find_dir('annotation_templates')
+        return self._directory
+
+    @property
+    def manifest_path(self):
+        return self._manifest_path or os.path.join(self.directory, MANIFEST_NAME)
+
+    @property
+    def cache_path(self):
+        return self._cache_path or settings.TEMPLATES_MANIFEST_CACHE_PATH
+
+    def get(self):
+        """Return ({'templates': [...], 'groups': [...]}, etag) for the current edition"""
+        with self._lock:
+            if self._payload is None:
+                self._payload = self._filter(self.load_manifest())
+                content = json.dumps(self._payload, sort_keys=True, default=str).encode()
+                self._etag = hashlib.sha256(content).hexdigest()
+                logger.debug(f'{len(self._payload["templates"])} templates found.')
+            return self._payload, self._etag
+
+    def reset(self):
+        with self._lock:
+            self._payload = self._etag = None
+
+    def source_files(self):
+        """Relative paths of template files and groups.txt with their mtimes"""
+        directory = pathlib.Path(self.directory)
+        paths = list(directory.glob('**/*.yml')) + [directory / GROUPS_FILE]
+        return {path.relative_to(directory).as_posix(): path.stat().st_mtime_ns for path in sorted(paths)}
+
+    def load_manifest(self):
+        """Read the build time or cached manifest if it's up to date,
+        otherwise parse templates and try to save them to the cache
+        """
+        sources = self.source_files()
+        for path in (self.manifest_path, self.cache_path):
+            manifest = self.read_manifest(path)
+            if manifest is not None and manifest.get('sources') == sources:
+                return manifest
+            if manifest is not None:
+                logger.debug(f'Templates manifest {path} is stale')
+
+        manifest = self.build_manifest(sources)
+        try:
+            self.write_manifest(manifest, self.cache_path)
+        except OSError as e:
+            # templates will be parsed once per process
+            logger.debug(f"Can't write templates manifest {self.cache_path}: {e}")
+        return manifest
+
+    @staticmethod
+    def read_manifest(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.debug(f"Can't read templates manifest {path}: {e}")
+            return None
+        return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+    def build_manifest(self, sources=None):
+        sources = sources or self.source_files()
+        directory = pathlib.Path(self.directory)
+        templates = [read_yaml(str(directory / path)) for path in sources if path != GROUPS_FILE]
+        with open(directory / GROUPS_FILE, encoding='utf-8') as f:
+            groups = f.read().splitlines()
+        return {'version': MANIFEST_VERSION, 'sources': sources, 'templates': templates, 'groups': groups}
+
+    def write_manifest(self, manifest, path=None):
+        """Save manifest, next to the templates by default"""
+        path = path or self.manifest_path
+        tmp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, default=str)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @staticmethod
+    def _filter(manifest):
+        """Edition and hostname specific part is applied on top of the manifest"""
+        community = settings.VERSION_EDITION == 'Community'
+        configs = []
+        for config in manifest['templates']:
+            if not community and config.get('group', '').lower() == 'community contributions':
+                continue
+            if config.get('image', '').startswith('/static') and settings.HOSTNAME:
+                # if hostname set manually, create full image urls
+                config = dict(config, image=settings.HOSTNAME + config['image'])
+            configs.append(config)
+
+        groups = manifest['groups']
+        if not community:
+            groups = [group for group in groups if group.lower() != 'community contributions']
+        return {'templates': configs, 'groups': groups}
+
+
+class SampleTaskCache:
+    """LRU cache of sample tasks by labeling config, sample tasks don't depend on the project"""
+
+    def __init__(self, max_size=SAMPLE_TASKS_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._tasks = OrderedDict()
+
+    @staticmethod
+    def key(label_config, include_annotation_and_prediction):
+        digest = hashlib.sha256(label_config.encode()).hexdigest()
+        return f'{digest}:{int(bool(include_annotation_and_prediction))}'
+
+    def get(self, key):
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None:
+                return None
+            self._tasks.move_to_end(key)
+        # callers modify tasks, e.g. set annotation authors
+        return copy.deepcopy(task)
+
+    def set(self, key, task):
+        with self._lock:
+            self._tasks[key] = copy.deepcopy(task)
+            self._tasks.move_to_end(key)
+            while len(self._tasks) > self.max_size:
+                self._tasks.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._tasks.clear()
+
+
+template_catalog = TemplateCatalog()
+sample_task_cache = SampleTaskCache()
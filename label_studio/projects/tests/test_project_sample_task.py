@@ -5,6 +5,7 @@ import projects.api
 import pytest
 from django.test import TestCase
 from django.urls import reverse
+from projects.template_catalog import sample_task_cache
 from projects.tests.factories import ProjectFactory
 from rest_framework.test import APIClient
 
@@ -15,6 +16,9 @@ class TestProjectSampleTask(TestCase):
     def setUpTestData(cls):
         cls.project = ProjectFactory()
 
+    def setUp(self):
+        sample_task_cache.clear()
+
     @property
     def url(self):
         return reverse('projects:api:project-sample-task', kwargs={'pk': self.project.id})
@@ -212,3 +216,23 @@ class TestProjectSampleTask(TestCase):
 
             mock_get_sample_task.assert_called_once()
             mock_generate_complete.assert_not_called()
+
+    def test_sample_task_is_cached_by_label_config(self):
+        """Test that sample task for the same label config is generated once"""
+        client = APIClient()
+        client.force_authenticate(user=self.project.created_by)
+        label_config = "<View><Text name='text' value='$text'/></View>"
+        sample_task = {'id': 1, 'data': {'text': 'Sample'}}
+
+        with patch('projects.api.Project.get_sample_task', return_value=sample_task) as mock_get_sample_task:
+            for _ in range(2):
+                response = client.post(
+                    self.url,
+                    data=json.dumps({'label_config': label_config}),
+                    content_type='application/json',
+                )
+                assert response.status_code == 200
+                assert response.json()['sample_task'] == sample_task
+                assert response['ETag']
+
+            mock_get_sample_task.assert_called_once()
@@ -0,0 +1,67 @@
+import pytest
+from projects.models import ProjectSummary, ProjectSummaryCounter
+from projects.tests.factories import ProjectFactory
+from rest_framework.test import APIClient
+from tasks.models import Annotation, Task
+
+pytestmark = pytest.mark.django_db
+
+
+def _result(*labels, from_name='label'):
+    return [{'from_name': from_name, 'to_name': 'text', 'type': 'labels', 'value': {'labels': list(labels)}}]
+
+
+def _annotate(project):
+    task = Task.objects.create(project=project, data={'text': 'text'})
+    user = project.created_by
+    cat = Annotation.objects.create(task=task, project=project, completed_by=user, result=_result('Cat'))
+    Annotation.objects.create(task=task, project=project, completed_by=user, result=_result('Cat', 'Dog'))
+    other = Annotation.objects.create(task=task, project=project, completed_by=user, result=_result(from_name='other'))
+    cat.result = _result('Mouse')
+    cat.save()
+    other.delete()
+
+
+def test_summary_counters(settings):
+    settings.PROJECT_SUMMARY_COUNTER_SHARDS = 4
+    project = ProjectFactory()
+    _annotate(project)
+
+    # annotation saves don't touch the summary row
+    assert ProjectSummary.objects.get(project=project).created_labels == {}
+    assert ProjectSummaryCounter.objects.filter(project=project).exists()
+    summary = ProjectSummary.objects.get(project=project)
+    summary.fold_counters()
+
+    assert not ProjectSummaryCounter.objects.filter(project=project).exists()
+    summary.refresh_from_db()
+    assert summary.created_annotations == {'label|text|labels': 2}
+    assert summary.created_labels == {'label': {'Cat': 1, 'Dog': 1, 'Mouse': 1}}
+
+
+def test_summary_api_folds_counters(settings):
+    settings.PROJECT_SUMMARY_COUNTER_SHARDS = 4
+    project = ProjectFactory()
+    _annotate(project)
+
+    client = APIClient()
+    client.force_authenticate(user=project.created_by)
+    response = client.get(f'/api/projects/{project.id}/summary/')
+    assert response.status_code == 200
+    assert response.json()['created_labels'] == {'label': {'Cat': 1, 'Dog': 1, 'Mouse': 1}}
+
+
+def test_counters_are_locked_in_key_order(settings):
+    settings.PROJECT_SUMMARY_COUNTER_SHARDS = 1
+    project = ProjectFactory()
+    deltas = {
+        (ProjectSummaryCounter.CREATED_LABELS, 'label', 'b'): 1,
+        (ProjectSummaryCounter.CREATED_LABELS, 'label', 'a'): 1,
+        (ProjectSummaryCounter.CREATED_ANNOTATIONS, '', 'label|text|labels'): 1,
+    }
+    ProjectSummaryCounter.increment(project.id, deltas)
+
+    # increment() updates rows in sorted key order, fold_counters() locks them in the same order
+    locked = ProjectSummaryCounter.objects.filter(project=project).order_by(*ProjectSummaryCounter.lock_order())
+    assert [(c.field, c.from_name, c.key) for c in locked] == sorted(deltas)
+    assert list(locked.order_by('id').values_list('key', flat=True)) == [key for _, _, key in sorted(deltas)]
@@ -0,0 +1,97 @@
+import io
+import os
+from unittest.mock import patch
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from projects.template_catalog import TemplateCatalog, template_catalog
+from projects.tests.factories import ProjectFactory
+from rest_framework.test import APIClient
+
+TEMPLATE = """title: {title}
+type: community
+group: {group}
+image: /static/templates/{title}.png
+config: |
+  <View><Text name="text" value="$text"/></View>
+"""
+
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    (tmp_path / 'nlp').mkdir()
+    (tmp_path / 'nlp' / 'text.yml').write_text(TEMPLATE.format(title='text', group='NLP'))
+    (tmp_path / 'community.yml').write_text(TEMPLATE.format(title='community', group='Community Contributions'))
+    (tmp_path / 'groups.txt').write_text('NLP\nCommunity Contributions\n')
+    return tmp_path
+
+
+@pytest.fixture
+def cache_path(tmp_path_factory, settings):
+    settings.TEMPLATES_MANIFEST_CACHE_PATH = str(tmp_path_factory.mktemp('cache') / 'templates_manifest.json')
+    return settings.TEMPLATES_MANIFEST_CACHE_PATH
+
+
+def test_catalog_manifest_is_reused_until_templates_change(templates_dir, cache_path, settings):
+    settings.VERSION_EDITION = 'Community'
+    settings.HOSTNAME = ''
+    payload, etag = TemplateCatalog(str(templates_dir)).get()
+    assert sorted(t['title'] for t in payload['templates']) == ['community', 'text']
+    assert payload['groups'] == ['NLP', 'Community Contributions']
+    # the server doesn't write to the templates directory
+    assert not (templates_dir / 'manifest.json').exists()
+    assert os.path.exists(cache_path)
+
+    # fresh process reads the cached manifest, YAML files aren't parsed
+    with patch('projects.template_catalog.read_yaml') as read_yaml:
+        assert TemplateCatalog(str(templates_dir)).get() == (payload, etag)
+        read_yaml.assert_not_called()
+
+    path = templates_dir / 'nlp' / 'text.yml'
+    path.write_text(TEMPLATE.format(title='text2', group='NLP'))
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    payload, new_etag = TemplateCatalog(str(templates_dir)).get()
+    assert new_etag != etag
+    assert sorted(t['title'] for t in payload['templates']) == ['community', 'text2']
+
+
+def test_catalog_uses_build_time_manifest(templates_dir, cache_path):
+    with patch.object(TemplateCatalog, 'directory', str(templates_dir)):
+        call_command('build_templates_manifest', stdout=io.StringIO())
+    assert (templates_dir / 'manifest.json').exists()
+
+    with patch('projects.template_catalog.read_yaml') as read_yaml:
+        payload, _ = TemplateCatalog(str(templates_dir)).get()
+        read_yaml.assert_not_called()
+    assert len(payload['templates']) == 2
+    assert not os.path.exists(cache_path)
+
+
+def test_catalog_filters_community_templates_for_enterprise(templates_dir, settings):
+    settings.VERSION_EDITION = 'Enterprise'
+    settings.HOSTNAME = 'https://ls.example.com'
+    payload, _ = TemplateCatalog(str(templates_dir)).get()
+    assert [t['title'] for t in payload['templates']] == ['text']
+    assert payload['templates'][0]['image'] == 'https://ls.example.com/static/templates/text.png'
+    assert payload['groups'] == ['NLP']
+
+
+@pytest.mark.django_db
+def test_template_list_api_etag(templates_dir, cache_path):
+    project = ProjectFactory()
+    client = APIClient()
+    client.force_authenticate(user=project.created_by)
+    url = reverse('projects:api-templates:template-list')
+
+    with patch.object(template_catalog, '_directory', str(templates_dir)):
+        template_catalog.reset()
+        response = client.get(url)
+        assert response.status_code == 200
+        assert len(response.json()['templates']) == 2
+        etag = response['ETag']
+
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+    template_catalog.reset()
@@ -1,6 +1,9 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
+import contextlib
 import getpass
+import hashlib
+import importlib.util
 import io
 import json
 import logging
@@ -27,6 +30,7 @@ logger = logging.getLogger(__name__)
 
 LS_PATH = str(pathlib.Path(__file__).parent.absolute())
 DEFAULT_USERNAME = 'default_user@localhost'
+MIGRATIONS_STATE_FILE = 'migrations_state.json'
 
 
 def _setup_env():
@@ -47,12 +51,89 @@ def _set_sqlite_fix_pragma(sender, connection, **kwargs):
         cursor.execute('PRAGMA journal_mode=wal;')
 
 
+def _get_migration_files_hash():
+    """Hash of migration files of all installed apps, it changes when any migration is added or changed"""
+    from django.apps import apps
+    from django.db.migrations.loader import MigrationLoader
+
+    sha = hashlib.sha256()
+    for app_config in sorted(apps.get_app_configs(), key=lambda app_config: app_config.label):
+        module_name, _ = MigrationLoader.migrations_module(app_config.label)
+        try:
+            spec = module_name and importlib.util.find_spec(module_name)
+        except ImportError:
+            spec = None
+        if not spec or not spec.submodule_search_locations:
+            continue
+        for location in spec.submodule_search_locations:
+            for path in sorted(pathlib.Path(location).glob('*.py')):
+                sha.update(f'{app_config.label}/{path.name}'.encode())
+                sha.update(path.read_bytes())
+    return sha.hexdigest()
+
+
+def _get_migrations_state(connection):
+    """Migration files hash and number of applied migrations, None if migrations were never applied"""
+    from django.db.migrations.recorder import MigrationRecorder
+
+    recorder = MigrationRecorder(connection)
+    if not recorder.has_table():
+        return None
+    return {'hash': _get_migration_files_hash(), 'applied': recorder.migration_qs.count()}
+
+
+def _get_migrations_state_path():
+    from django.conf import settings
+
+    return os.path.join(settings.BASE_DATA_DIR, MIGRATIONS_STATE_FILE)
+
+
+def _read_migrations_states():
+    try:
+        with open(_get_migrations_state_path(), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_migrations_state(database):
+    """Remember that the database is synchronized with the current migration files"""
+    connection = connections[database]
+    state = _get_migrations_state(connection)
+    if state is None:
+        return
+    states = _read_migrations_states()
+    states[_get_database_key(connection)] = state
+    try:
+        with open(_get_migrations_state_path(), 'w', encoding='utf-8') as f:
+            json.dump(states, f)
+    except OSError as e:
+        logger.debug(f"Can't save migrations state: {e}")
+
+
+def _get_database_key(connection):
+    settings_dict = connection.settings_dict
+    return ':'.join(str(settings_dict.get(key) or '') for key in ('ENGINE', 'HOST', 'PORT', 'NAME'))
+
+
 def is_database_synchronized(database):
+    """Check for unapplied migrations.
+
+    Building the migration graph imports all migration modules, so the result is cached
+    by migration files hash and number of applied migrations in BASE_DATA_DIR.
+    """
     connection = connections[database]
     connection.prepare_database()
+    state = _get_migrations_state(connection)
+    if state is not None and _read_migrations_states().get(_get_database_key(connection)) == state:
+        return True
+
     executor = MigrationExecutor(connection)
     targets = executor.loader.graph.leaf_nodes()
-    return not executor.migration_plan(targets)
+    synchronized = not executor.migration_plan(targets)
+    if synchronized:
+        _save_migrations_state(database)
+    return synchronized
 
 
 def _apply_database_migrations():
@@ -60,6 +141,7 @@ def _apply_database_migrations():
     if not is_database_synchronized(DEFAULT_DB_ALIAS):
         print('Initializing database..')
         call_command('migrate', '--no-color', verbosity=0)
+        _save_migrations_state(DEFAULT_DB_ALIAS)
 
 
 def _get_config(config_path):
@@ -273,6 +355,10 @@ def _project_exists(project_name):
     return Project.objects.filter(title=project_name).exists()
 
 
+def _profile_stage(profiler, name):
+    return profiler.stage(name) if profiler is not None else contextlib.nullcontext()
+
+
 def main():
     input_args = parse_input_args(sys.argv[1:])
 
@@ -295,12 +381,26 @@ def main():
     if not get_env('HOST'):
         os.environ.setdefault('HOST', host)  # it will be passed to settings.HOSTNAME as env var
 
-    _setup_env()
-    _apply_database_migrations()
+    profiler = None
+    if input_args.profile_startup:
+        from label_studio.core.utils.startup_profiler import StartupProfiler
+
+        profiler = StartupProfiler()
+        profiler.start()
+
+    with _profile_stage(profiler, 'django setup'):
+        _setup_env()
+    with _profile_stage(profiler, 'database migrations check'):
+        _apply_database_migrations()
 
     from label_studio.core.utils.common import collect_versions
 
-    versions = collect_versions()
+    with _profile_stage(profiler, 'collect versions'):
+        versions = collect_versions()
+
+    if profiler is not None:
+        profiler.stop()
+        print(profiler.report())
 
     if input_args.command == 'reset_password':
         _reset_password(input_args)
@@ -310,6 +410,10 @@ def main():
         call_command('shell_plus')
         return
 
+    if input_args.command == 'worker':
+        call_command('local_worker', *input_args.queues, concurrency=input_args.concurrency, burst=input_args.burst)
+        return
+
     if input_args.command == 'calculate_stats_all_orgs':
         from tasks.functions import calculate_stats_all_orgs
 
@@ -192,6 +192,12 @@ def update_tasks_counters(queryset, from_scratch=True):
     if isinstance(queryset, TaskQuerySet) and queryset.exists() and isinstance(queryset[0], int):
         queryset = Task.objects.filter(id__in=queryset)
 
+    if settings.DATA_MANAGER_MATERIALIZED_COLUMNS:
+        # counters are updated after bulk operations with annotations and predictions
+        from data_manager.functions import update_task_columns
+
+        update_task_columns(queryset.order_by().values_list('id', flat=True))
+
     if not from_scratch:
         queryset = queryset.exclude(
             Q(total_annotations__gt=0) | Q(cancelled_annotations__gt=0) | Q(total_predictions__gt=0)
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0060_add_allow_skip_to_task"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="data_hash",
+            field=models.CharField(
+                default=None,
+                help_text="SHA-256 of task data, it is used to find duplicated tasks",
+                max_length=64,
+                null=True,
+                verbose_name="data hash",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+from core.migration_helpers import make_sql_migration
+from django.db import migrations
+
+sql_forwards = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS task_proj_data_hash_idx '
+    'ON task (project_id, data_hash);'
+)
+sql_backwards = (
+    'DROP INDEX CONCURRENTLY IF EXISTS task_proj_data_hash_idx;'
+)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ("tasks", "0061_task_data_hash"),
+    ]
+    operations = [
+        migrations.RunPython(
+            *make_sql_migration(
+                sql_forwards,
+                sql_backwards,
+                apply_on_sqlite=False,
+                execute_immediately=False,
+                migration_name=__name__,
+            )
+        ),
+    ]
@@ -2,6 +2,7 @@
 """
 import base64
 import datetime
+import hashlib
 import logging
 import numbers
 import os
@@ -174,6 +175,13 @@ class Task(TaskMixin, FsmHistoryStateModel):
         db_index=True,
         help_text='When the last comment was updated',
     )
+    data_hash = models.CharField(
+        _('data hash'),
+        max_length=64,
+        default=None,
+        null=True,
+        help_text='SHA-256 of task data, it is used to find duplicated tasks',
+    )
 
     objects = TaskManager()  # task manager by default
     prepared = PreparedTaskManager()  # task manager with filters, ordering, etc for data_manager app
@@ -438,11 +446,33 @@ class Task(TaskMixin, FsmHistoryStateModel):
 
         if storage:
             return {
-                'url': storage.generate_http_url(url),
+                'url': storage.get_http_url(url),
                 'presign_ttl': storage.presign_ttl,
             }
 
-    def resolve_uri(self, task_data, project):
+    @classmethod
+    def get_file_upload_urls(cls, tasks, project):
+        """Resolve uploaded files referenced by data of many tasks with one query, see resolve_uri()"""
+        if not settings.CLOUD_FILE_STORAGE_ENABLED:
+            return {}
+        filenames = set()
+        for task in tasks:
+            for value in task.data.values():
+                filename = cls.prepare_filename(value)
+                if cls.is_upload_file(filename):
+                    filenames.add(filename)
+        if not filenames:
+            return {}
+        return {
+            file_upload.file.name: file_upload.url
+            for file_upload in FileUpload.objects.filter(project=project, file__in=filenames)
+        }
+
+    def resolve_uri(self, task_data, project, file_upload_urls=None):
+        """Replace storage and uploaded file links in task data with URLs available for users
+
+        :param file_upload_urls: result of get_file_upload_urls() for a list of tasks to avoid a query per task
+        """
         from io_storages.functions import get_storage_by_url
 
         if project.task_data_login and project.task_data_password:
@@ -466,9 +496,13 @@ class Task(TaskMixin, FsmHistoryStateModel):
                 prepared_filename = self.prepare_filename(task_data[field])
                 if settings.CLOUD_FILE_STORAGE_ENABLED and self.is_upload_file(prepared_filename):
                     # permission check: resolve uploaded files to the project only
-                    file_upload = fast_first(FileUpload.objects.filter(project=project, file=prepared_filename))
-                    if file_upload is not None:
-                        task_data[field] = file_upload.url
+                    if file_upload_urls is not None:
+                        file_upload_url = file_upload_urls.get(prepared_filename)
+                    else:
+                        file_upload = fast_first(FileUpload.objects.filter(project=project, file=prepared_filename))
+                        file_upload_url = file_upload.url if file_upload is not None else None
+                    if file_upload_url is not None:
+                        task_data[field] = file_upload_url
                     # it's very rare case, e.g. user tried to reimport exported file from another project
                     # or user wrote his django storage path manually
                     else:
@@ -529,7 +563,20 @@ class Task(TaskMixin, FsmHistoryStateModel):
     def ensure_unique_groundtruth(self, annotation_id):
         self.annotations.exclude(id=annotation_id).update(ground_truth=False)
 
+    @staticmethod
+    def get_data_hash(data, project):
+        """Hash of task data with undefined key replaced by the first data key of the project config"""
+        if project is not None and settings.DATA_UNDEFINED_NAME in data and project.data_types:
+            data = dict(data)
+            data[next(iter(project.data_types))] = data.pop(settings.DATA_UNDEFINED_NAME)
+        return hashlib.sha256(json.dumps(data, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
     def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or 'data' in update_fields:
+            self.data_hash = self.get_data_hash(self.data, self.project)
+            if update_fields is not None:
+                update_fields = {'data_hash'}.union(update_fields)
+
         if self.inner_id == 0:
             task = Task.objects.filter(project=self.project).order_by('-inner_id').first()
             max_inner_id = 1
@@ -765,13 +812,13 @@ class Annotation(AnnotationMixin, FsmHistoryStateModel):
         if hasattr(self.project, 'summary'):
             logger.debug(f'Increase project.summary counters from {self}')
             summary = self.project.summary
-            summary.update_created_annotations_and_labels([self])
+            summary.add_created_annotations_and_labels([self])
 
     def decrease_project_summary_counters(self):
         if hasattr(self.project, 'summary'):
             logger.debug(f'Decrease project.summary counters from {self}')
             summary = self.project.summary
-            summary.remove_created_annotations_and_labels([self])
+            summary.add_created_annotations_and_labels([self], sign=-1)
 
     def update_task(self):
         update_fields = ['updated_at']
@@ -1422,6 +1469,20 @@ def save_predictions_to_project(sender, instance, **kwargs):
 # =========== END OF PROJECT SUMMARY UPDATES ===========
 
 
+@receiver(post_save, sender=Annotation)
+@receiver(post_delete, sender=Annotation)
+@receiver(post_save, sender=Prediction)
+@receiver(post_delete, sender=Prediction)
+def update_data_manager_columns(sender, instance, **kwargs):
+    """Recalculate materialized data manager columns of the task after commit"""
+    if not settings.DATA_MANAGER_MATERIALIZED_COLUMNS:
+        return
+    from data_manager.functions import update_task_columns
+
+    task_id = instance.task_id
+    transaction.on_commit(lambda: update_task_columns([task_id]))
+
+
 @receiver(post_save, sender=Annotation)
 def delete_draft(sender, instance, **kwargs):
     task = instance.task
@@ -1440,19 +1501,14 @@ def delete_draft(sender, instance, **kwargs):
 
 
 @receiver(post_save, sender=Annotation)
-def update_ml_backend(sender, instance, **kwargs):
-    if instance.ground_truth:
+def update_ml_backend(sender, instance, created, **kwargs):
+    if not created or instance.ground_truth:
         return
 
-    project = instance.project
-
-    if hasattr(project, 'ml_backends') and project.min_annotations_to_start_training:
-        annotation_count = Annotation.objects.filter(project=project).count()
+    from ml.functions import count_annotations_for_training
 
-        # start training every N annotation
-        if annotation_count % project.min_annotations_to_start_training == 0:
-            for ml_backend in project.ml_backends.all():
-                ml_backend.train()
+    # start training every N annotation
+    count_annotations_for_training(instance.project)
 
 
 def update_task_stats(task, stats=('is_labeled',), save=True):
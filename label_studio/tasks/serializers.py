@@ -213,7 +213,7 @@ class TaskSimpleSerializer(ModelSerializer):
 
     class Meta:
         model = Task
-        exclude = ('precomputed_agreement',)
+        exclude = ('precomputed_agreement', 'data_hash')
 
 
 class BaseTaskSerializer(FlexFieldsModelSerializer):
@@ -260,7 +260,9 @@ class BaseTaskSerializer(FlexFieldsModelSerializer):
         if project:
             # resolve uri for storage (s3/gcs/etc)
             if self.context.get('resolve_uri', False):
-                instance.data = instance.resolve_uri(instance.data, project)
+                instance.data = instance.resolve_uri(
+                    instance.data, project, file_upload_urls=self.context.get('file_upload_urls')
+                )
 
             # resolve $undefined$ key in task data
             data = instance.data
@@ -275,7 +277,7 @@ class BaseTaskSerializer(FlexFieldsModelSerializer):
 
     class Meta:
         model = Task
-        exclude = ('precomputed_agreement',)
+        exclude = ('precomputed_agreement', 'data_hash')
 
 
 class BaseTaskSerializerBulk(serializers.ListSerializer):
@@ -480,6 +482,10 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
                 raise ValidationError({'predictions': prediction_errors})
 
         self.post_process_annotations(user, db_annotations, 'imported')
+        if db_annotations:
+            from ml.functions import count_annotations_for_training
+
+            count_annotations_for_training(self.project, len(db_annotations))
         self.post_process_tasks(self.project.id, [t.id for t in self.db_tasks])
         self.post_process_custom_callback(self.project.id, user)
 
@@ -675,6 +681,7 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
             t = Task(
                 project=self.project,
                 data=task['data'],
+                data_hash=Task.get_data_hash(task['data'], self.project),
                 meta=task.get('meta', {}),
                 overlap=max_overlap,
                 is_labeled=current_overlap >= max_overlap,
@@ -743,7 +750,7 @@ class BaseTaskSerializerBulk(serializers.ListSerializer):
 
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ('data_hash',)
 
 
 TaskSerializer = load_func(settings.TASK_SERIALIZER)
@@ -760,7 +767,7 @@ class TaskWithAnnotationsSerializer(TaskSerializer):
         model = Task
         list_serializer_class = load_func(settings.TASK_SERIALIZER_BULK)
 
-        exclude = ()
+        exclude = ('data_hash',)
 
 
 class AnnotationDraftSerializer(ModelSerializer):
@@ -0,0 +1,99 @@
+import os
+from unittest import mock
+
+import pytest
+from data_import.csghub_cache import CSGHubSnapshotCache
+from data_import.models import FileUpload
+from data_import.uploader import csghub_file_uploads_from_url
+from lockfile import LockTimeout
+from projects.tests.factories import ProjectFactory
+from users.tests.factories import UserFactory
+
+
+def write_snapshot(target_dir, size=10):
+    with open(os.path.join(target_dir, 'tasks.json'), 'w') as f:
+        f.write('[{"text": "%s"}]' % ('x' * size))
+
+
+class TestCSGHubSnapshotCache:
+    def test_download_only_once(self, tmp_path):
+        cache = CSGHubSnapshotCache(root=str(tmp_path), quota=10**6, lock_timeout=5)
+        download = mock.Mock(side_effect=write_snapshot)
+        key = cache.make_key('http://hub', 'ns/ds', 'main', 'sha1')
+
+        for _ in range(3):
+            with cache.snapshot(key, download) as folder:
+                assert os.listdir(folder) == ['tasks.json']
+
+        assert download.call_count == 1
+        stats = cache.get_stats()
+        assert (stats['misses'], stats['hits']) == (1, 2)
+        assert stats['downloaded_bytes'] == os.path.getsize(os.path.join(folder, 'tasks.json'))
+
+    def test_new_commit_is_new_entry(self):
+        assert CSGHubSnapshotCache.make_key('http://hub', 'ns/ds', 'main', 'sha1') != CSGHubSnapshotCache.make_key(
+            'http://hub', 'ns/ds', 'main', 'sha2'
+        )
+
+    def test_failed_download_is_not_cached(self, tmp_path):
+        cache = CSGHubSnapshotCache(root=str(tmp_path), quota=10**6, lock_timeout=5)
+        with pytest.raises(RuntimeError):
+            with cache.snapshot('key', mock.Mock(side_effect=RuntimeError)):
+                pass
+        assert cache.entries() == []
+
+    def test_lru_eviction(self, tmp_path):
+        cache = CSGHubSnapshotCache(root=str(tmp_path), quota=250, lock_timeout=5)
+        download = lambda target_dir: write_snapshot(target_dir, size=100)  # noqa: E731
+
+        for i, key in enumerate(['a', 'b', 'a', 'c']):
+            with cache.snapshot(key, download):
+                pass
+            # make access times distinguishable
+            marker = os.path.join(str(tmp_path), key, '.complete')
+            os.utime(marker, (i, i))
+
+        # "b" is the least recently used entry
+        assert sorted(key for key, _, _ in cache.entries()) == ['a', 'c']
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_live_lock_is_not_broken(self, tmp_path):
+        cache = CSGHubSnapshotCache(root=str(tmp_path), quota=10**6, lock_timeout=0.2)
+        owner = cache._lock('key')
+        owner.acquire(timeout=0)
+
+        with pytest.raises(LockTimeout):
+            with cache.snapshot('key', write_snapshot):
+                pass
+        assert owner.i_am_locking()
+
+        # the owner process dies: the OS releases its lock without break_lock()
+        os.close(owner._fd)
+        with cache.snapshot('key', write_snapshot) as folder:
+            assert os.listdir(folder) == ['tasks.json']
+
+
+@pytest.mark.django_db
+def test_csghub_import_uses_snapshot_cache(settings, tmp_path):
+    settings.CSGHUB_SNAPSHOT_CACHE_DIR = str(tmp_path)
+    settings.CSGHUB_SNAPSHOT_CACHE_ENABLED = True
+    user = UserFactory()
+    projects = [ProjectFactory(created_by=user), ProjectFactory(created_by=user)]
+
+    def fake_snapshot_download(dataset, cache_dir, **kwargs):
+        write_snapshot(cache_dir)
+
+    with mock.patch(
+        'pycsghub.snapshot_download.snapshot_download', side_effect=fake_snapshot_download
+    ) as snapshot_download, mock.patch('pycsghub.utils.dataset_info', return_value=mock.Mock(sha='abc')):
+        for project in projects:
+            file_upload_ids, _ = csghub_file_uploads_from_url(
+                [], project, user, 'dataset=ns/ds&datasetBranches=main', False
+            )
+            file_upload = FileUpload.objects.get(id=file_upload_ids[0])
+            assert file_upload.project == project
+            assert file_upload.read_tasks() == [{'data': {'text': 'x' * 10}}]
+
+    assert snapshot_download.call_count == 1
+    # the branch may move after its commit is resolved, the cached snapshot must match the commit
+    assert snapshot_download.call_args.kwargs['revision'] == 'abc'
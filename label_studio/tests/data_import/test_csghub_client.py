@@ -0,0 +1,83 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pytest
+import requests
+from data_import.csghub_client import CSGHubClient
+
+
+def make_response(data):
+    response = mock.Mock()
+    response.json.return_value = data
+    return response
+
+
+def make_client(**kwargs):
+    params = dict(timeout=5, pool_size=2, page_size=2, max_pages=10, ttl=60, stale_ttl=60, max_entries=100)
+    params.update(kwargs)
+    return CSGHubClient('http://hub/', **params)
+
+
+def test_all_pages_are_merged():
+    client = make_client()
+    pages = {1: [{'path': 'u/a'}, {'path': 'u/b'}], 2: [{'path': 'u/c'}, {'path': ''}], 3: [{'path': 'u/d'}]}
+
+    def get(url, params=None, **kwargs):
+        assert url == 'http://hub/api/v1/user/u/datasets'
+        return make_response({'data': pages[params['page']], 'total': 5})
+
+    with mock.patch.object(client.session, 'get', side_effect=get) as session_get:
+        assert client.user_datasets('u', 'token') == ['u/a', 'u/b', 'u/c', 'u/d']
+    assert session_get.call_count == 3
+
+
+def test_cache_is_per_user():
+    client = make_client()
+    with mock.patch.object(client.session, 'get', return_value=make_response({'data': [{'name': 'main'}]})) as get:
+        assert client.dataset_branches('ns/ds', 'token-1') == ['main']
+        assert client.dataset_branches('ns/ds', 'token-1') == ['main']
+        assert get.call_count == 1
+        client.dataset_branches('ns/ds', 'token-2')
+        assert get.call_count == 2
+    assert client.stats['hits'] == 1
+
+
+def test_stale_value_is_served_while_refreshing():
+    client = make_client(ttl=0.01)
+    responses = [make_response({'data': [{'name': 'v1'}]}), make_response({'data': [{'name': 'v2'}]})]
+    with mock.patch.object(client.session, 'get', side_effect=responses):
+        assert client.dataset_branches('ns/ds', 'token') == ['v1']
+        time.sleep(0.02)
+        assert client.dataset_branches('ns/ds', 'token') == ['v1']
+        client._refresh_executor.shutdown(wait=True)
+        assert client._cache[next(iter(client._cache))][1] == ['v2']
+    assert client.stats['stale_hits'] == 1
+
+
+def test_concurrent_requests_are_coalesced():
+    client = make_client()
+    release = threading.Event()
+
+    def get(*args, **kwargs):
+        release.wait(5)
+        return make_response({'data': {'username': 'u'}})
+
+    with mock.patch.object(client.session, 'get', side_effect=get) as session_get:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(client.user_info, 'u', 'token') for _ in range(4)]
+            time.sleep(0.1)
+            release.set()
+            assert [f.result() for f in futures] == [{'username': 'u'}] * 4
+    assert session_get.call_count == 1
+
+
+def test_errors_are_not_cached():
+    client = make_client()
+    error = mock.Mock()
+    error.raise_for_status.side_effect = requests.HTTPError('boom')
+    with mock.patch.object(client.session, 'get', side_effect=[error, make_response({'data': []})]):
+        with pytest.raises(requests.HTTPError):
+            client.dataset_branches('ns/ds', 'token')
+        assert client.dataset_branches('ns/ds', 'token') == []
@@ -1,6 +1,8 @@
+import os
 from unittest.mock import patch
 
 import pytest
+from data_import import uploader
 from data_import.functions import _async_import_background_streaming
 from data_import.models import FileUpload
 from data_import.uploader import load_tasks_for_async_import_streaming
@@ -167,6 +169,31 @@ class TestLoadTasksForAsyncImportStreaming:
         sizes = [len(b[0]) for b in batches]
         assert sizes == [2, 1]
 
+    def test_from_csghub_dataset(self, user, project, settings):
+        settings.IMPORT_BATCH_SIZE = 2
+        settings.CSGHUB_SNAPSHOT_CACHE_ENABLED = False
+
+        def fake_snapshot_download(dataset, cache_dir, **kwargs):
+            os.makedirs(os.path.join(cache_dir, 'data'), exist_ok=True)
+            with open(os.path.join(cache_dir, 'data', 'part.json'), 'w') as f:
+                f.write('[{"text":"C1"},{"text":"C2"},{"text":"C3"}]')
+            with open(os.path.join(cache_dir, 'README.md'), 'w') as f:
+                f.write('skipped')
+
+        pimport = ProjectImport.objects.create(project=project, url='dataset=ns/ds&datasetBranches=main')
+        with patch('pycsghub.snapshot_download.snapshot_download', side_effect=fake_snapshot_download):
+            batches = list(load_tasks_for_async_import_streaming(pimport, user, batch_size=2))
+
+        assert [len(b[0]) for b in batches] == [2, 1]
+        file_upload = FileUpload.objects.get(id=batches[0][1][0])
+        assert file_upload.file_name.endswith('data_part.json')
+        # downloaded file is moved to the upload dir, nothing is left in the download folder
+        assert os.path.exists(file_upload.file.path)
+        download_folder = os.path.join(os.path.dirname(uploader.__file__), 'Downloads', str(project.id))
+        assert os.listdir(download_folder) == []
+        project.refresh_from_db()
+        assert (project.dataset, project.datasetBranches) == ('ns/ds', 'main')
+
 
 class TestAsyncImportBackgroundStreaming:
     @patch('data_import.functions.flag_set', return_value=False)
@@ -225,6 +225,77 @@ def test_action_remove_duplicates_with_annotations(business_client, project_id):
     assert task2.annotations.filter(was_cancelled=True).count() == 1, 'was_cancelled counter wrong'
 
 
+@pytest.mark.django_db
+def test_action_remove_duplicates_by_data_hash(business_client, project_id, settings):
+    """Tasks without stored data hash get it backfilled, duplicates are processed in batches of hashes"""
+    from tasks.models import Task
+
+    settings.BATCH_SIZE = 1
+    project = Project.objects.get(pk=project_id)
+    task1 = make_task({'data': {'text': 'a'}}, project)
+    make_task({'data': {settings.DATA_UNDEFINED_NAME: 'a'}}, project)
+    task3 = make_task({'data': {'text': 'b'}}, project)
+    make_task({'data': {'text': 'b'}}, project)
+    task5 = make_task({'data': {'text': 'c'}}, project)
+    assert Task.objects.filter(project=project, data_hash__isnull=True).count() == 0
+    # tasks created before data hashes were stored
+    project.tasks.update(data_hash=None)
+
+    response = business_client.post(
+        f'/api/dm/actions?project={project_id}&id=remove_duplicates',
+        json={'selectedItems': {'all': True, 'excluded': []}},
+    )
+
+    assert response.status_code == 200
+    assert list(project.tasks.order_by('id').values_list('id', flat=True)) == [task1.id, task3.id, task5.id]
+    assert project.tasks.get(id=task1.id).data_hash == Task.get_data_hash({'text': 'a'}, project)
+
+
+@pytest.mark.django_db
+def test_action_remove_duplicates_after_cache_labels(business_client, project_id):
+    """Tasks with equal data become different after cache_labels, remove_duplicates must keep both"""
+    project = Project.objects.get(pk=project_id)
+    task1 = make_task({'data': {'text': 'a'}}, project)
+    task2 = make_task({'data': {'text': 'a'}}, project)
+    make_annotation(
+        {'result': [{'from_name': 'label1', 'to_name': 'text', 'type': 'labels', 'value': {'labels': ['Car']}}]},
+        task1.id,
+    )
+
+    response = business_client.post(
+        f'/api/dm/actions?project={project_id}&id=cache_labels',
+        json={'selectedItems': {'all': True, 'excluded': []}, 'control_tag': 'label1', 'with_counters': 'no'},
+    )
+    assert response.status_code == 200
+
+    response = business_client.post(
+        f'/api/dm/actions?project={project_id}&id=remove_duplicates',
+        json={'selectedItems': {'all': True, 'excluded': []}},
+    )
+
+    assert response.status_code == 200
+    assert list(project.tasks.order_by('id').values_list('id', flat=True)) == [task1.id, task2.id]
+
+
+@pytest.mark.django_db
+def test_data_hash_is_reset_on_label_config_change(business_client, project_id, settings):
+    """Undefined data key is hashed as the first config data key, hashes are reset when this key changes"""
+    from tasks.models import Task
+
+    project = Project.objects.get(pk=project_id)
+    task1 = make_task({'data': {settings.DATA_UNDEFINED_NAME: 'a'}}, project)
+    task2 = make_task({'data': {'text': 'b'}}, project)
+
+    project.label_config = '<View><Text name="text" value="$text"/></View>'
+    project.save()
+    assert Task.objects.get(id=task1.id).data_hash is not None
+
+    project.label_config = '<View><Text name="text" value="$body"/></View>'
+    project.save()
+    assert Task.objects.get(id=task1.id).data_hash is None
+    assert Task.objects.get(id=task2.id).data_hash == Task.get_data_hash({'text': 'b'}, project)
+
+
 @pytest.mark.django_db
 def test_action_cache_labels(business_client, project_id):
     """This test checks that the "cache_labels" action works correctly
@@ -1,9 +1,15 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
 import json
+from unittest import mock
 
 import pytest
+from data_manager.functions import get_tasks_totals, prefetch_predictions_job, prefetch_project_predictions
+from data_manager.prepare_params import PrepareParams
+from django.core.cache import cache
 from projects.models import Project
+from tasks.models import Task
+from users.tests.factories import UserFactory
 
 from ..utils import make_annotation, make_prediction, make_task, project_id  # noqa
 
@@ -128,3 +134,149 @@ def test_views_total_counters(tasks_count, annotations_count, predictions_count,
     assert response_data['total'] == tasks_count, response_data
     assert response_data['total_annotations'] == tasks_count * annotations_count, response_data
     assert response_data['total_predictions'] == tasks_count * predictions_count, response_data
+
+
+@pytest.mark.parametrize('ordering', [[], ['-tasks:total_annotations'], ['tasks:data.group']])
+@pytest.mark.django_db
+def test_tasks_cursor_pagination(ordering, business_client, project_id):
+    cache.clear()
+    project = Project.objects.get(pk=project_id)
+    for i in range(7):
+        task_id = make_task({'data': {'group': i % 3} if i != 4 else {}}, project).id
+        for _ in range(i % 2):
+            make_annotation({'result': []}, task_id)
+
+    query = json.dumps({'ordering': ordering})
+    response = business_client.get(f'/api/tasks?project={project_id}&query={query}&page_size=100')
+    expected = [task['id'] for task in response.json()['tasks']]
+
+    ids, cursor = [], ''
+    while cursor is not None:
+        response = business_client.get(f'/api/tasks?project={project_id}&query={query}&page_size=3&cursor={cursor}')
+        assert response.status_code == 200, response.content
+        response_data = response.json()
+        assert response_data['total'] == 7
+        assert response_data['total_annotations'] == 3
+        ids += [task['id'] for task in response_data['tasks']]
+        cursor = response_data['next_cursor']
+    assert ids == expected
+
+    # totals are cached until they expire
+    make_task({'data': {'group': 0}}, project)
+    response = business_client.get(f'/api/tasks?project={project_id}&query={query}&cursor=')
+    assert response.json()['total'] == 7
+
+
+@pytest.mark.django_db
+def test_tasks_totals_are_cached_per_user(business_client, project_id):
+    cache.clear()
+    project = Project.objects.get(pk=project_id)
+    make_task({'data': {}}, project)
+    prepare_params = PrepareParams(project=project_id)
+    other_user = UserFactory()
+
+    assert get_tasks_totals(prepare_params, Task.objects.filter(project=project), business_client.user)['total'] == 1
+    # the queryset can be different for another user, e.g. by role
+    totals = get_tasks_totals(prepare_params, Task.objects.none(), other_user)
+    assert totals['total'] == 0
+    assert get_tasks_totals(prepare_params, Task.objects.filter(project=project), business_client.user)['total'] == 1
+
+
+@pytest.mark.django_db
+def test_tasks_cursor_pagination_invalid_cursor(business_client, project_id):
+    response = business_client.get(f'/api/tasks?project={project_id}&cursor=broken')
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize('cursor', [None, ''])
+@pytest.mark.django_db
+def test_tasks_predictions_prefetch(cursor, business_client, project_id, settings):
+    cache.clear()
+    settings.DATA_MANAGER_PREDICTIONS_PREFETCH_LOOKAHEAD = 2
+    project = Project.objects.get(pk=project_id)
+    project.evaluate_predictions_automatically = True
+    project.save()
+    task_ids = [make_task({'data': {}}, project).id for _ in range(6)]
+    make_prediction({'result': []}, task_ids[1])
+
+    url = f'/api/tasks?project={project_id}&page_size=2'
+    if cursor is not None:
+        url += f'&cursor={cursor}'
+    with mock.patch('data_manager.api.job_queue_available', return_value=True), mock.patch(
+        'data_manager.functions.start_job_async_or_sync'
+    ) as start_job:
+        response = business_client.get(url)
+        assert response.status_code == 200, response.content
+        # current page and look-ahead tasks without predictions are queued, the request doesn't wait for them
+        start_job.assert_called_once_with(
+            prefetch_predictions_job, project.id, [task_ids[0], task_ids[2], task_ids[3]], queue_name='low'
+        )
+
+        # already queued tasks are skipped by the next requests
+        business_client.get(url)
+        start_job.assert_called_once()
+
+
+@pytest.mark.django_db
+def test_tasks_predictions_without_job_queue(business_client, project_id, settings):
+    """Without a job queue only the current page is predicted inside the request, as before prefetching"""
+    settings.LOCAL_JOB_QUEUE_ENABLED = False
+    project = Project.objects.get(pk=project_id)
+    project.evaluate_predictions_automatically = True
+    project.save()
+    task_ids = [make_task({'data': {}}, project).id for _ in range(4)]
+
+    with mock.patch('data_manager.api.job_queue_available', return_value=False), mock.patch(
+        'data_manager.api.evaluate_predictions'
+    ) as evaluate, mock.patch('data_manager.functions.start_job_async_or_sync') as start_job:
+        response = business_client.get(f'/api/tasks?project={project_id}&page_size=2')
+        assert response.status_code == 200, response.content
+        assert sorted(evaluate.call_args.args[0].values_list('id', flat=True)) == task_ids[:2]
+
+        response = business_client.get(f'/api/tasks?project={project_id}&page_size=-1')
+        assert response.status_code == 200, response.content
+        assert sorted(evaluate.call_args.args[0].values_list('id', flat=True)) == task_ids
+    start_job.assert_not_called()
+
+
+@pytest.mark.django_db
+def test_project_predictions_prefetch(business_client, project_id):
+    cache.clear()
+    project = Project.objects.get(pk=project_id)
+    task_ids = [make_task({'data': {}}, project).id for _ in range(3)]
+    make_prediction({'result': []}, task_ids[1])
+
+    with mock.patch('data_manager.functions.start_job_async_or_sync') as start_job:
+        # one job for the whole project, task ids aren't passed to it
+        assert prefetch_project_predictions(project) is True
+        assert prefetch_project_predictions(project) is False
+    start_job.assert_called_once_with(prefetch_predictions_job, project.id, None, queue_name='low')
+
+    backend = mock.Mock()
+    with mock.patch.object(Project, 'ml_backend', new_callable=mock.PropertyMock, return_value=backend):
+        prefetch_predictions_job(project.id, None)
+    tasks = backend.predict_tasks.call_args.kwargs['tasks']
+    assert sorted(tasks.values_list('id', flat=True)) == [task_ids[0], task_ids[2]]
+
+
+@pytest.mark.django_db
+def test_tasks_uploaded_files_resolved_in_one_query(business_client, project_id, settings):
+    from data_import.models import FileUpload
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    settings.CLOUD_FILE_STORAGE_ENABLED = True
+    project = Project.objects.get(pk=project_id)
+    for i in range(3):
+        FileUpload.objects.create(user=business_client.user, project=project, file=f'upload/{project_id}/{i}.jpg')
+        make_task({'data': {'image': f'/data/upload/{project_id}/{i}.jpg'}}, project)
+    make_task({'data': {'image': f'/data/upload/{project_id}/missing.jpg'}}, project)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = business_client.get(f'/api/tasks?project={project_id}')
+    assert response.status_code == 200
+    images = [task['data']['image'] for task in response.json()['tasks']]
+    assert images == [f'/data/upload/{project_id}/{i}.jpg' for i in range(3)] + [
+        f'/data/upload/{project_id}/missing.jpg?not_uploaded_project_file'
+    ]
+    assert len([q for q in queries if 'data_import_fileupload' in q['sql']]) == 1
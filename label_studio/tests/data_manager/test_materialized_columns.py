@@ -0,0 +1,52 @@
+import json
+
+import pytest
+from data_manager.models import TaskColumns
+from django.core.management import call_command
+from projects.models import Project
+
+from ..utils import make_annotation, make_prediction, make_task, project_id  # noqa
+
+
+@pytest.mark.django_db
+def test_materialized_columns(settings, business_client, project_id, django_capture_on_commit_callbacks):
+    settings.DATA_MANAGER_MATERIALIZED_COLUMNS = True
+    project = Project.objects.get(pk=project_id)
+    project.model_version = 'v1'
+    project.save(update_fields=['model_version'])
+    user = project.created_by
+
+    with django_capture_on_commit_callbacks(execute=True):
+        tasks = [make_task({'data': {'text': str(i)}}, project) for i in range(3)]
+        for task, score in zip(tasks, [0.5, 0.9, 0.1]):
+            make_prediction({'result': [], 'score': score, 'model_version': 'v1'}, task.id)
+        annotation = make_annotation({'result': [], 'completed_by': user}, tasks[0].id)
+
+    columns = TaskColumns.objects.get(task=tasks[0])
+    assert 'v1' in str(columns.predictions_model_versions)
+    assert columns.completed_at is not None
+    assert str(user.id) in str(columns.annotators)
+
+    # ordering and filtering read materialized columns
+    query = json.dumps({'ordering': ['-tasks:completed_at']})
+    response = business_client.get(f'/api/tasks?project={project_id}&query={query}')
+    assert response.json()['tasks'][0]['id'] == tasks[0].id
+
+    # predictions score isn't materialized, it follows the project model version
+    query = json.dumps({'ordering': ['-tasks:predictions_score']})
+    response = business_client.get(f'/api/tasks?project={project_id}&query={query}')
+    assert [task['id'] for task in response.json()['tasks']] == [tasks[1].id, tasks[0].id, tasks[2].id]
+    project.model_version = 'v2'
+    project.save(update_fields=['model_version'])
+    response = business_client.get(f'/api/tasks?project={project_id}&query={query}')
+    assert response.json()['tasks'][0]['predictions_score'] is None
+
+    with django_capture_on_commit_callbacks(execute=True):
+        annotation.delete()
+    assert TaskColumns.objects.get(task=tasks[0]).completed_at is None
+
+    # rebuild from scratch
+    TaskColumns.objects.all().delete()
+    call_command('rebuild_dm_columns', project.id)
+    assert TaskColumns.objects.filter(task__project=project).count() == 3
+    assert 'v1' in str(TaskColumns.objects.get(task=tasks[2]).predictions_model_versions)
@@ -1,4 +1,5 @@
 import json
+from unittest import mock
 
 import pytest
 from projects.models import Task
@@ -305,3 +306,46 @@ def test_ml_backend_predict_test_api_post_random_true(business_client):
     r = response.json()
     assert r['url'] == 'http://localhost:8999/predict'
     assert r['status'] == 200
+
+
+@pytest.mark.django_db
+def test_training_triggered_every_n_annotations(business_client, settings, django_capture_on_commit_callbacks):
+    from django.core.cache import cache
+    from ml.functions import count_annotations_for_training, train_ml_backends
+    from ml.models import MLTrainingCounter
+    from tasks.models import Annotation
+
+    cache.clear()
+    project = make_project({'title': 'training', 'label_config': PROJECT_CONFIG}, business_client.user)
+    project.min_annotations_to_start_training = 2
+    project.save()
+    task = Task.objects.create(project=project, data={'image_url': 'image.jpg'})
+
+    def annotate(n):
+        # the counter is incremented after commit
+        for _ in range(n):
+            with django_capture_on_commit_callbacks(execute=True):
+                Annotation.objects.create(task=task, project=project, result=[], completed_by=business_client.user)
+
+    with mock.patch('ml.functions.start_job_async_or_sync') as start_job:
+        settings.ML_TRAINING_DEBOUNCE = 0
+        annotate(5)
+        assert start_job.call_count == 2
+        # updates don't count
+        with django_capture_on_commit_callbacks(execute=True):
+            Annotation.objects.filter(project=project).first().save()
+        assert start_job.call_count == 2
+
+        # bulk paths add many annotations at once, one training for one crossing
+        with django_capture_on_commit_callbacks(execute=True):
+            count_annotations_for_training(project, 3)
+            assert start_job.call_count == 2
+        assert start_job.call_count == 3
+        assert MLTrainingCounter.objects.get(project=project).annotations == 8
+
+        # training scheduled with a delay absorbs the following triggers
+        settings.ML_TRAINING_DEBOUNCE = 60
+        with mock.patch('ml.functions.redis_connected', return_value=True):
+            annotate(4)
+        start_job.assert_called_with(train_ml_backends, project.id, in_seconds=60)
+        assert start_job.call_count == 4
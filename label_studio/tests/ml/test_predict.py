@@ -1,8 +1,9 @@
 import json
+from unittest import mock
 
 import pytest
 
-from label_studio.tests.utils import make_project, make_task
+from label_studio.tests.utils import make_project, make_task, register_ml_backend_mock
 
 
 @pytest.mark.django_db
@@ -89,3 +90,130 @@ def test_get_multiple_predictions_on_task(business_client, ml_backend_for_test_p
     assert payload['predictions'][0]['model_version'] == 'ModelA'
     assert payload['predictions'][1]['result'][0]['value']['choices'][0] == 'label_B'
     assert payload['predictions'][1]['model_version'] == 'ModelB'
+
+
+def _predict_callback(request, context):
+    return {
+        'results': [
+            {
+                'model_version': 'ModelBatch',
+                'score': 0.5,
+                'result': [
+                    {'from_name': 'label', 'to_name': 'text', 'type': 'choices', 'value': {'choices': ['label_A']}}
+                ],
+            }
+            for _ in request.json()['tasks']
+        ]
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('batch_support', [True, False])
+def test_predict_tasks_in_concurrent_batches(business_client, ml_backend, settings, batch_support):
+    from ml.models import MLBackend
+    from ml.runner import PredictionRunner
+    from tasks.models import Prediction
+
+    project = make_project(
+        config=dict(
+            label_config="""
+                <View>
+                  <Text name="text" value="$text"></Text>
+                  <Choices name="label" choice="single" toName="text">
+                    <Choice value="label_A"></Choice>
+                  </Choices>
+                </View>""",
+            title='test_predict_tasks_in_concurrent_batches',
+        ),
+        user=business_client.user,
+        use_ml_backend=False,
+    )
+    tasks = [make_task({'data': {'text': f'test {i}'}}, project) for i in range(9)]
+
+    url = 'http://test.ml.backend.batch.com:9094'
+    register_ml_backend_mock(ml_backend, url=url, setup_model_version='ModelBatch')
+    if batch_support:
+        ml_backend.post(f'{url}/predict', json=_predict_callback)
+    else:
+        # ML backend returns a single result for any number of tasks
+        ml_backend.post(
+            f'{url}/predict',
+            json=lambda request, context: {'results': _predict_callback(request, context)['results'][:1]},
+        )
+    ml = MLBackend.objects.create(project=project, url=url, title='ModelBatch')
+
+    settings.ML_PREDICT_BATCH_SIZE = 3
+    settings.ML_PREDICT_CONCURRENCY = 2
+    runner = PredictionRunner(ml)
+    instances = runner.run(project.tasks.all())
+
+    assert len(instances) == 9
+    predicted_task_ids = Prediction.objects.filter(project=project).values_list('task_id', flat=True)
+    assert sorted(predicted_task_ids) == [t.id for t in tasks]
+    assert runner.stats['tasks'] == runner.stats['predictions'] == 9
+    assert runner.stats['failed_batches'] == 0
+    project.refresh_from_db()
+    for task in project.tasks.all():
+        assert task.total_predictions == 1
+    # without batch support the first batch is retrieved one by one, then single tasks are sent concurrently
+    assert runner.batch_size == (3 if batch_support else 1)
+    assert runner.stats['batches'] == (3 if batch_support else 7)
+    predict_calls = [r for r in ml_backend.request_history if r.path == '/predict']
+    assert len(predict_calls) == (3 if batch_support else 1 + 3 + 6)
+
+    # tasks with predictions from the current model version are skipped
+    assert ml.predict_tasks(project.tasks.all()) == 'ModelBatch'
+    assert [r for r in ml_backend.request_history if r.path == '/predict'] == predict_calls
+
+
+@pytest.mark.django_db
+def test_predict_tasks_skips_invalid_predictions_and_failed_batches(business_client, ml_backend, settings):
+    from ml.models import MLBackend
+    from ml.runner import PredictionRunner
+    from tasks.models import Prediction
+
+    project = make_project(
+        config=dict(
+            label_config="""
+                <View>
+                  <Text name="text" value="$text"></Text>
+                  <Choices name="label" choice="single" toName="text">
+                    <Choice value="label_A"></Choice>
+                  </Choices>
+                </View>""",
+            title='test_predict_tasks_skips_invalid_predictions',
+        ),
+        user=business_client.user,
+        use_ml_backend=False,
+    )
+    tasks = [make_task({'data': {'text': f'test {i}'}}, project) for i in range(6)]
+
+    def predict_callback(request, context):
+        response = _predict_callback(request, context)
+        if request.json()['tasks'][0]['id'] == tasks[0].id:
+            response['results'][0]['score'] = 'not a number'
+        return response
+
+    url = 'http://test.ml.backend.invalid.com:9095'
+    register_ml_backend_mock(ml_backend, url=url, setup_model_version='ModelBatch')
+    ml_backend.post(f'{url}/predict', json=predict_callback)
+    ml = MLBackend.objects.create(project=project, url=url, title='ModelBatch')
+
+    settings.ML_PREDICT_BATCH_SIZE = 2
+    settings.ML_PREDICT_CONCURRENCY = 1
+    runner = PredictionRunner(ml)
+    bulk_create = Prediction.objects.bulk_create
+
+    def failing_bulk_create(objs, **kwargs):
+        if objs and objs[0].task_id == tasks[2].id:
+            raise RuntimeError('database is gone')
+        return bulk_create(objs, **kwargs)
+
+    with mock.patch.object(Prediction.objects, 'bulk_create', side_effect=failing_bulk_create):
+        instances = runner.run(project.tasks.all())
+
+    # the invalid prediction and the batch that failed to save are skipped, the run continues
+    assert sorted(prediction.task_id for prediction in instances) == [tasks[1].id, tasks[4].id, tasks[5].id]
+    assert runner.stats['invalid_predictions'] == 1
+    assert runner.stats['failed_batches'] == 1
+    assert runner.stats['batches'] == 2
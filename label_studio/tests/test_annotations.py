@@ -79,7 +79,9 @@ def test_create_annotation(
 
 
 @pytest.mark.django_db
-def test_create_annotation_with_ground_truth(caplog, any_client, configured_project_min_annotations_1):
+def test_create_annotation_with_ground_truth(
+    caplog, any_client, configured_project_min_annotations_1, django_capture_on_commit_callbacks
+):
 
     task = Task.objects.first()
     client_is_annotator = _client_is_annotator(any_client)
@@ -111,8 +113,9 @@ def test_create_annotation_with_ground_truth(caplog, any_client, configured_proj
         assert r.status_code == 201
         assert m.called == webhook_called
 
-        # real annotation triggers uploading to ML backend and recalculating accuracy
-        r = any_client.post('/api/tasks/{}/annotations/'.format(task.id), data=annotation)
+        # real annotation triggers uploading to ML backend and recalculating accuracy, training starts after commit
+        with django_capture_on_commit_callbacks(execute=True):
+            r = any_client.post('/api/tasks/{}/annotations/'.format(task.id), data=annotation)
         assert r.status_code == 201
         assert m.called
         task = Task.objects.get(id=task.id)
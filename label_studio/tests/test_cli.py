@@ -1,10 +1,15 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
+import sys
+from unittest.mock import patch
+
 import pytest
-from server import _create_user
+from django.db import DEFAULT_DB_ALIAS
+from server import _create_user, is_database_synchronized
 from tests.utils import make_annotation, make_project, make_task
 
 from label_studio.core.argparser import parse_input_args
+from label_studio.core.utils.startup_profiler import StartupProfiler
 
 
 @pytest.mark.django_db
@@ -47,3 +52,42 @@ def test_user_active_organization_counters():
 
     assert user.active_organization_annotations().count() == 9
     assert user.active_organization_contributed_project_number() == 3
+
+
+@pytest.mark.django_db
+def test_database_synchronized_check_is_cached(settings, tmp_path):
+    settings.BASE_DATA_DIR = str(tmp_path)
+    assert is_database_synchronized(DEFAULT_DB_ALIAS)
+
+    # migration graph isn't built when migration files and applied migrations are the same
+    with patch('server.MigrationExecutor') as executor:
+        assert is_database_synchronized(DEFAULT_DB_ALIAS)
+        executor.assert_not_called()
+
+    with patch('server._get_migration_files_hash', return_value='new migration'), patch(
+        'server.MigrationExecutor'
+    ) as executor:
+        executor.return_value.migration_plan.return_value = [('migration', False)]
+        assert not is_database_synchronized(DEFAULT_DB_ALIAS)
+
+
+def test_startup_profiler(tmp_path, monkeypatch):
+    (tmp_path / 'profiled_module.py').write_text('import time\ntime.sleep(0.01)\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'profiled_module', raising=False)
+
+    profiler = StartupProfiler()
+    profiler.start()
+    try:
+        with profiler.stage('imports'):
+            import profiled_module  # noqa: F401
+    finally:
+        profiler.stop()
+        sys.modules.pop('profiled_module', None)
+
+    total, self_time = profiler.timings['modules']['profiled_module']
+    assert total >= self_time >= 0.01
+    assert profiler.timings['stages']['imports'] >= total
+    report = profiler.report()
+    assert 'profiled_module' in report
+    assert 'imports' in report
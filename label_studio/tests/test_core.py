@@ -1,5 +1,6 @@
 """This file and its contents are licensed under the Apache License 2.0. Please see the included NOTICE for copyright information and LICENSE for a copy of the license.
 """
+import json
 import types
 
 import pytest
@@ -87,6 +88,20 @@ def test_user_info(business_client):
     assert user is not None
 
 
+@pytest.mark.django_db
+def test_database_pool_stats_are_shown_to_superusers_only(client, business_client, settings, mocker):
+    settings.POSTGRE_POOL_ENABLED = True
+    mocker.patch('core.views.get_connection_pool_stats', return_value={'default': {'in_use': 1}})
+
+    assert json.loads(client.get('/health/').content) == {'status': 'UP'}
+    assert client.get('/metrics/').content == b''
+    assert business_client.get('/metrics/').content == b''
+
+    business_client.user.is_superuser = True
+    business_client.user.save(update_fields=['is_superuser'])
+    assert business_client.get('/metrics/').json() == {'database_pool': {'default': {'in_use': 1}}}
+
+
 @pytest.mark.parametrize(
     'command_line, result',
     [
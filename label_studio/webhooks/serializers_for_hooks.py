@@ -42,7 +42,7 @@ class TaskWebhookSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Task
-        fields = '__all__'
+        exclude = ('data_hash',)
 
 
 class AnnotationWebhookSerializer(serializers.ModelSerializer):